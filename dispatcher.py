@@ -5,8 +5,45 @@ I this program given a filename with an -f argument it processes the given file.
 If program called without a filename it monitors the given file directory and
 respond to files created in that directory.
 
-If called with -d aurgument the given directory will be monitored, otherwise the
-the default utils.FILE_PATH directory will be monitored.
+If called with -d aurgument the given directory will be monitored (and its files
+processed, claimed & archived there), otherwise the the default utils.FILE_PATH
+directory will be monitored.
+
+Successfully processed files are journaled by content (see app_modules/
+job_journal) so the same file sent again gets the cached results rather than
+being processed again, unless called with -r argument.
+
+Wall time, CPU and peak memory of every job run are appended, with the
+client, file type, input size and records created, to a metrics file in the
+data root (see app_modules/job_metrics).
+
+Throughput counters and histograms (files seen, jobs per program, results,
+queue wait, job duration, records and bytes in/out) are written to a
+Prometheus text file for node_exporter's textfile collector (see -m argument
+and app_modules/textfile_metrics).
+
+If called with -b argument every file in the given directory (or matching the
+given glob pattern) is processed by a pool of worker processes (one per CPU
+unless -w given), printing a summary of the results.  Batch files are always
+processed (not looked up in the journal) and left in place, and the exit
+status is non-zero if any file failed.
+
+If called with -s argument the watch directory may be shared with dispatchers
+on other hosts: each file is claimed (atomically moved into this dispatcher's
+work directory) before being processed, so only one dispatcher processes,
+deletes or archives it (see app_modules/file_claims).
+
+If called with -w argument files are processed by a pool of that many warm
+worker processes (programs already imported) rather than starting a new
+Python interpreter for each file.  Jobs run at the same time (in the pool or
+as -j child processes) each use only their share of the CPUs for their own
+worker processes (see app_modules/worker_pool.cpu_share).
+
+When watching, created files are held until they have been completely
+written (see app_modules/file_readiness) and then put on a bounded job queue
+(see -j argument for number of executors) so files for different clients are
+processed at the same time while files for the same client are processed in
+order.
 
 
 Based on https://pypi.org/project/watchdog/ and
@@ -16,38 +53,146 @@ http://brunorocha.org/python/watching-a-directory-for-file-changes-with-python.h
 
 import argparse
 import contextlib
+import glob
 import os
 from pathlib import Path
-import subprocess
 import sys
+import tempfile
+import threading
 import time
+from datetime import datetime
 
 from watchdog.observers import Observer
 from watchdog.events import PatternMatchingEventHandler
 
+import app_modules.job_metrics as metrics
 import app_modules.utilities as utils
+from app_modules.file_claims import FileClaims
+from app_modules.file_readiness import ReadinessTracker
+from app_modules.job_journal import JobJournal, output_names
+from app_modules.job_queue import JobQueue
+from app_modules.textfile_metrics import METRICS_FILE, Registry, TextfileExporter
+from app_modules.worker_pool import ROW_WORKERS_ENV, WorkerPool, cpu_share
 
 
 WATCH_ME = utils.FILE_PATH
+POOL = None  # WorkerPool when dispatching to warm worker processes
+EXECUTORS = 4  # concurrent jobs when watching directory
+JOURNAL = None  # JobJournal of processed files, unless reprocessing
+CLAIMS = None  # FileClaims when sharing watch directory with other dispatchers
+
+STATS = Registry()  # throughput metrics exported for Prometheus
+FILES_SEEN = STATS.counter('fm_dispatcher_files_seen_total', 'Files taken by the dispatcher.')
+JOBS = STATS.counter(
+    'fm_dispatcher_jobs_total', 'Jobs dispatched by program.', ('program',))
+RESULTS = STATS.counter(
+    'fm_dispatcher_files_total', 'Files deleted after success or archived.', ('result',))
+QUEUE_WAIT = STATS.histogram(
+    'fm_dispatcher_queue_wait_seconds', 'Time files waited on the job queue.',
+    (0.1, 0.5, 1, 5, 15, 60, 300, 900))
+DURATION = STATS.histogram(
+    'fm_dispatcher_job_duration_seconds', 'Wall time of jobs by client.',
+    (0.5, 1, 2.5, 5, 10, 30, 60, 300), ('client',))
+RECORDS = STATS.counter(
+    'fm_dispatcher_records_total', 'Records created by client.', ('client',))
+BYTES_IN = STATS.counter(
+    'fm_dispatcher_input_bytes_total', 'Size of files processed by client.', ('client',))
+BYTES_OUT = STATS.counter(
+    'fm_dispatcher_output_bytes_total', 'Size of results created by client.', ('client',))
 
 
 #-----------------Setup------------------
 
 class MyHandler(PatternMatchingEventHandler):
-    """Capture created file in directory & process it."""
+    """Capture created file in directory & queue it once completely written."""
+    def __init__(self, jobs):
+        super().__init__(ignore_directories=True)
+        self.jobs = jobs
+        self.readiness = ReadinessTracker(self.queue_file)
+        self.lock = threading.Lock()
+        self.caught_up = set()  # files queued by catch up (their created events ignored)
+
+    @staticmethod
+    def ignored(event):
+        """Check if file is one the dispatcher should leave alone."""
+        return [x for x in utils.IGNORE if x in event.src_path]
+
     def on_created(self, event):
-        """Process created file."""
-        if [x for x in utils.IGNORE if x in event.src_path]:
-            return
-        dispatch_file(event.src_path)
+        """Start waiting for created file to be completely written."""
+        if not self.ignored(event):
+            with self.lock:
+                if event.src_path not in self.caught_up:
+                    self.readiness.created(event.src_path)
+
+    def on_modified(self, event):
+        """Created file still being written."""
+        if not self.ignored(event):
+            self.readiness.modified(event.src_path)
+
+    def on_closed(self, event):
+        """Writer finished with file (only reported by inotify observers)."""
+        if not self.ignored(event):
+            self.readiness.closed(event.src_path)
+
+    def queue_file(self, path):
+        """Queue completely written file, without waiting for it to be processed."""
+        cname = utils.parse_filename_new(path)[0]
+        self.jobs.put(cname, path)
+
+    def catch_up_file(self, path):
+        """Queue file found catching up, unless its created event already seen."""
+        with self.lock:
+            if self.readiness.tracking(path):  # queued when complete
+                return
+            self.caught_up.add(path)
+        self.queue_file(path)
+
+    def caught_up_on(self):
+        """Catch up finished, files of its created events are new arrivals again."""
+        with self.lock:
+            self.caught_up.clear()
+
+
+def modified_time(path):
+    """File's mtime (None if it has gone, eg claimed by another dispatcher)."""
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def catch_up(directory, handler):
+    """Process files that arrived while dispatcher was not running."""
+    start = time.perf_counter()
+    backlog = sorted(
+        (mtime, str(path)) for path in Path(directory).iterdir()
+        if path.is_file() and not [x for x in utils.IGNORE if x in str(path)]
+        and (mtime := modified_time(path)) is not None)
+    if not backlog:
+        return
+    utils.logger.info('Catching up on %d files', len(backlog))
+    for mtime, path in backlog:
+        if time.time() - mtime < handler.readiness.quiet:
+            handler.readiness.created(path)  # may still be being written
+        else:
+            handler.catch_up_file(path)
+    handler.jobs.join()
+    handler.caught_up_on()
+    utils.logger.info(
+        'Caught up on %d files in %.1f seconds', len(backlog), time.perf_counter() - start)
 
 
 def watch_directory(directory=WATCH_ME):
     """Watch directory for file changes."""
+    jobs = JobQueue(dispatch_file, executors=EXECUTORS, on_wait=QUEUE_WAIT.observe)
+    handler = MyHandler(jobs)
     observer = Observer()
-    observer.schedule(MyHandler(), path=directory, recursive=False)
-    observer.start()
-    utils.logger.info('Watching "%s"', WATCH_ME)
+    observer.schedule(handler, path=directory, recursive=False)
+    observer.start()  # before catch up so new arrivals aren't missed
+    if CLAIMS:
+        CLAIMS.on_recovered = handler.queue_file
+    catch_up(directory, handler)
+    utils.logger.info('Watching "%s" with %d executors', directory, EXECUTORS)
     try:
         while True:
             time.sleep(1)
@@ -73,17 +218,19 @@ def build_command(program: str, cname: str, ftype: str, fname: str, watch_dir: s
     return cmd
 
 
-def handle_processed_file(fname: str, prob: bool, watch_dir: str) -> None:
+def handle_processed_file(
+        fname: str, prob: bool, watch_dir: str, archive_root: str | None = None) -> None:
     """Delete the file if processed successfully (prob=False), or archive it one
-    directory above watch_dir if there was a problem (prob=True).
+    directory above archive_root (default watch_dir) if there was a problem (prob=True).
     Missing files are silently ignored.
     """
     watch_path = Path(watch_dir)
     src = watch_path / fname
+    RESULTS.inc('archived' if prob else 'deleted')
     with contextlib.suppress(FileNotFoundError):
         if prob:
             utils.logger.info('Archiving "%s" for analysis.', fname)
-            archive_dir = watch_path.parent / "archive"
+            archive_dir = Path(archive_root or watch_dir).parent / "archive"
             archive_dir.mkdir(exist_ok=True)
             src.rename(archive_dir / fname)
         else:
@@ -99,19 +246,86 @@ def log_dispatch_msg(fname: str, cname: str, ftype: str) -> None:
     utils.logger.info('IDed as %s "%s" file of type "%s"', prep, cname, ftype)
 
 
-def rename_file(old: str, new: str) -> bool:
-    """Rename file for easier processing."""
-    time.sleep(5)
+def rename_file(old: str, new: str, file_path: str | None = None) -> bool:
+    """Rename file in file_path (default WATCH_ME) for easier processing (file already
+    completely written).
+    """
+    file_path = file_path or WATCH_ME
     try:
-        utils.logger.info('Renaming "%s" to "%s" in "%s"', old, new, WATCH_ME)
-        os.rename(f'{WATCH_ME}{old}', f'{WATCH_ME}{new}')
+        utils.logger.info('Renaming "%s" to "%s" in "%s"', old, new, file_path)
+        os.rename(f'{file_path}{old}', f'{file_path}{new}')
         return True
-    except PermissionError:
-        utils.logger.info('Error renaming "%s" to "%s" in "%s"', old, new, WATCH_ME)
+    except (PermissionError, FileNotFoundError):  # or renamed by another dispatcher
+        utils.logger.info('Error renaming "%s" to "%s" in "%s"', old, new, file_path)
         utils.logger.info('%s', sys.exc_info())
         return False
 
 
+def file_size(abs_fname: str) -> int:
+    """Size of file (0 if missing)."""
+    with contextlib.suppress(OSError):
+        return os.path.getsize(abs_fname)
+    return 0
+
+
+def records_tempfile() -> str:
+    """Create temp file for job to report records created in."""
+    handle, records_file = tempfile.mkstemp(prefix='fm_records_')
+    os.close(handle)
+    return records_file
+
+
+def child_env(records_file: str) -> dict:
+    """Environment of program run as child process, with its records file.
+
+    Programs run at the same time (see -j argument) share the CPUs, each
+    using its share for its own worker processes.
+    """
+    env = {**os.environ, metrics.RECORDS_ENV: records_file}
+    if EXECUTORS > 1:
+        env.setdefault(ROW_WORKERS_ENV, str(cpu_share(EXECUTORS)))
+    return env
+
+
+def run_program(program: str, cname: str, ftype: str, fname: str, file_path: str) -> int:
+    """Run program on file, recording its resource usage & returning its exit status."""
+    input_bytes = file_size(f'{file_path}{fname}')
+    records_file = records_tempfile()
+    if POOL:
+        utils.logger.debug('Running "%s" in worker pool', program)
+        status, usage = POOL.run(program, cname, ftype, fname, file_path, records_file)
+    else:
+        command = build_command(program, cname, ftype, fname, file_path)
+        utils.logger.debug('Invoking: %s', ' '.join(command))
+        status, usage = metrics.run_child(command, child_env(records_file))
+    record_job(program, cname, ftype, fname, file_path, input_bytes, status, usage, records_file)
+    return status
+
+
+def record_job(  # pylint: disable=R0913:too-many-arguments,R0917:too-many-positional-arguments
+        program, cname, ftype, fname, file_path, input_bytes, status, usage, records_file) -> int:
+    """Record metrics of finished job, returning number of records it created."""
+    records = metrics.read_records(records_file)
+    metrics.record(metrics.JobMetrics(
+        datetime.now().isoformat(timespec='seconds'), cname, program, ftype, input_bytes,
+        records, status, usage.wall, usage.user, usage.system, usage.max_rss))
+    JOBS.inc(program)
+    DURATION.observe(usage.wall, cname)
+    RECORDS.inc(cname, amount=records)
+    BYTES_IN.inc(cname, amount=input_bytes)
+    BYTES_OUT.inc(cname, amount=output_bytes(program, cname, ftype, fname, file_path))
+    return records
+
+
+def output_bytes(program: str, cname: str, ftype: str, fname: str, file_path: str) -> int:
+    """Size of results program created for file (0 if not known)."""
+    total = 0
+    for out_name in output_names(program, cname, fname, ftype) or []:
+        with contextlib.suppress(OSError):
+            total += os.path.getsize(f'{file_path}{out_name}')
+    return total
+
+
 def select_program(cname: str, fname: str, ftype: str) -> str:
     """Select which program to call based on filename."""
     if cname == 'hlap':  # specialized hlap programs
@@ -123,21 +337,99 @@ def select_program(cname: str, fname: str, ftype: str) -> str:
 
 
 #-----------------------Dispatcher for auto processing--------------------
+def process_file(cname: str, fname: str, ftype: str, file_path: str) -> int:
+    """Process file (or restore results of same file processed before)."""
+    program = select_program(cname, fname, ftype)
+    key = JOURNAL.key(program, cname, fname, ftype, file_path) if JOURNAL else None
+    if key and JOURNAL.restore(key, file_path):
+        utils.logger.info('Same "%s" file already processed, restored results', cname)
+        return 0
+    prob = run_program(program, cname, ftype, fname, file_path)
+    if key and not prob:
+        JOURNAL.record(key, program, fname, file_path)
+    return prob
+
+
 def dispatch_file(filename: str):
     """When new file added to watch directory, decide what to do with it."""
     cname, fname, ftype, nname, _ = utils.parse_filename_new(filename)
+    FILES_SEEN.inc()
     log_dispatch_msg(fname, cname, ftype)
+    claim = None
     if fname == nname:
-        program = select_program(cname, fname, ftype)
-        command = build_command(program, cname, ftype, fname, WATCH_ME)
-        utils.logger.debug('Invoking: %s', ' '.join(command))
-        result = subprocess.run(command, check=False)
-        prob = result.returncode
+        if CLAIMS and not (claim := CLAIMS.claim(fname)):
+            utils.logger.info('"%s" already claimed by another dispatcher', fname)
+            return
+        prob = process_file(cname, fname, ftype, claim.file_path if claim else WATCH_ME)
     else:
         success = rename_file(fname, nname)
         prob = not success
 
-    handle_processed_file(fname, prob, WATCH_ME)
+    handle_processed_file(fname, prob, claim.file_path if claim else WATCH_ME, WATCH_ME)
+    if claim:
+        claim.release()
+
+
+#-----------------------Batch processing of many files--------------------
+def batch_files(pattern: str) -> list[Path]:
+    """Files in directory or matching glob pattern (dispatcher results ignored)."""
+    paths = Path(pattern).iterdir() if Path(pattern).is_dir() else map(Path, glob.glob(pattern))
+    return sorted(
+        path for path in paths
+        if path.is_file() and not path.name.startswith('.')
+        and not [x for x in utils.IGNORE if x in path.name])
+
+
+def print_batch_summary(results: list[tuple]) -> None:
+    """Print table of batch results (file, program, status, records, seconds)."""
+    width = max([len(x[0]) for x in results] + [4])
+    print(f'{"File":<{width}}  {"Program":<31}  {"Status":<6}  {"Records":>8}  {"Seconds":>8}')
+    for fname, program, status, records, wall in results:
+        print(f'{fname:<{width}}  {program:<31}  {"ok" if not status else "FAILED":<6}'
+              f'  {records:>8}  {wall:>8.1f}')
+    failed = sum(1 for x in results if x[2])
+    print(f'{len(results)} files, {failed} failed, {sum(x[3] for x in results)} records,'
+          f' {sum(x[4] for x in results):.1f} job seconds')
+
+
+def dispatch_batch(pattern: str) -> int:
+    """Process directory or glob of files in worker pool, returning exit status.
+
+    Files whose names need simplifying are renamed first (as dispatch_file
+    does) and processed by their new name.
+    """
+    files = batch_files(pattern)
+    if not files:
+        utils.logger.info('No files found using "%s"', pattern)
+        return 1
+    pool = POOL or WorkerPool(os.cpu_count())
+    utils.logger.info('Batch processing %d files', len(files))
+    jobs = []
+    for path in files:
+        cname, fname, ftype, nname, file_path = utils.parse_filename_new(path.as_posix())
+        if fname != nname:
+            if not rename_file(fname, nname, file_path):
+                jobs.append(('rename', cname, ftype, fname, file_path, 0, None, None))
+                continue
+            cname, fname, ftype, _, file_path = utils.parse_filename_new(f'{file_path}{nname}')
+        program = select_program(cname, fname, ftype)
+        records_file = records_tempfile()
+        jobs.append((
+            program, cname, ftype, fname, file_path, file_size(f'{file_path}{fname}'),
+            records_file, pool.submit(program, cname, ftype, fname, file_path, records_file)))
+    results = []
+    for program, cname, ftype, fname, file_path, input_bytes, records_file, future in jobs:
+        if future is None:  # rename failed
+            results.append((fname, program, 1, 0, 0.0))
+            continue
+        status, usage = future.result()
+        records = record_job(
+            program, cname, ftype, fname, file_path, input_bytes, status, usage, records_file)
+        results.append((fname, program, status, records, usage.wall))
+    if pool is not POOL:
+        pool.shutdown()
+    print_batch_summary(results)
+    return 1 if any(x[2] for x in results) else 0
 
 
 #-----------------Single file request for testing----------------
@@ -152,12 +444,51 @@ def parse_user_input(desc='Dispatch files to be processed to the appropriate pro
     parser.add_argument(
         '-d', action='store', dest='watch_dir', default='',
         help='path to directory to be monitored.')
+    parser.add_argument(
+        '-w', action='store', dest='workers', type=int, default=0,
+        help='number of warm worker processes (default=new interpreter per file).')
+    parser.add_argument(
+        '-j', action='store', dest='executors', type=int, default=EXECUTORS,
+        help=f'number of files processed at the same time (default={EXECUTORS}).')
+    parser.add_argument(
+        '-r', action='store_true', dest='reprocess', default=False,
+        help='process files even if the same file was processed before.')
+    parser.add_argument(
+        '-b', action='store', dest='batch', default='',
+        help='directory or glob of files to process with all CPUs (files not deleted).')
+    parser.add_argument(
+        '-s', action='store_true', dest='shared', default=False,
+        help='claim files before processing so other dispatchers can share watch directory.')
+    parser.add_argument(
+        '-m', action='store', dest='metrics_file', default=METRICS_FILE,
+        help=f'Prometheus text file for metrics (default="{METRICS_FILE}").')
     return parser
 
 
 if __name__ == '__main__':
     options = parse_user_input().parse_args()
-    if options.file_name:  # dispatch given file
-        dispatch_file(options.file_name)
-    else:  # watch given directory or default directory
-        watch_directory(options.watch_dir or utils.FILE_PATH)
+    EXECUTORS = 1 if options.file_name else options.executors  # -f is one file
+    if options.watch_dir:
+        WATCH_ME = os.path.join(options.watch_dir, '')
+    if not options.reprocess:
+        JOURNAL = JobJournal()
+    if options.workers:
+        POOL = WorkerPool(options.workers)
+    if options.shared:
+        CLAIMS = FileClaims(WATCH_ME)
+    exporter = TextfileExporter(STATS, options.metrics_file)
+    exit_status = 0
+    try:
+        if options.batch:  # process many files at once
+            exit_status = dispatch_batch(options.batch)
+        elif options.file_name:  # dispatch given file
+            dispatch_file(options.file_name)
+        else:  # watch given directory or default directory
+            watch_directory(WATCH_ME)
+    finally:
+        exporter.stop()
+        if CLAIMS:
+            CLAIMS.stop()
+    if POOL:
+        POOL.shutdown()
+    sys.exit(exit_status)
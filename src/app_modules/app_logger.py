@@ -25,6 +25,17 @@ FILE_PATH = file_locations.FILE_PATH
 LOG_FILE = file_locations.LOG_FILE
 
 
+def set_caller(record):
+    """Set program & line logger called from on record (unless already set, eg in worker)."""
+    if hasattr(record, 'caller_name'):
+        return
+    for caller in inspect.stack():
+        if 'utils.logger' in caller.code_context[0]:  # find appropriate stack item
+            record.caller_name = Path(caller.filename).stem
+            record.caller_lineno = caller.lineno
+            break
+
+
 def singleton(cls):
     """Make decorated class a singleton."""
     instances = {}
@@ -43,11 +54,7 @@ class AppLogger:
     class CustomFormatter(logging.Formatter):
         """Custom formatter that injects custom attributes into log records."""
         def format(self, record):
-            for caller in inspect.stack():
-                if 'utils.logger' in caller.code_context[0]:  # find appropriate stack item
-                    record.caller_name = Path(caller.filename).stem
-                    record.caller_lineno = caller.lineno
-                    break
+            set_caller(record)
             return super().format(record)
 
     def __init__(self):
@@ -73,6 +80,10 @@ class AppLogger:
         """Logs a message with the custom username attribute."""
         self.logger.log(level, message)
 
+    def handle(self, record):
+        """Log record made elsewhere (eg by worker process)."""
+        self.logger.handle(record)
+
     def debug(self, message, *args, exc_info=False):
         """Handle DEBUG call."""
         self.logger.debug(message, *args, exc_info=exc_info)
@@ -0,0 +1,126 @@
+"""
+Per column operations on CSV rows compiled into a one pass function.
+
+CSV clients (eg Eagle Mountain) blank unused columns, blank zero readings
+and amounts and normalize numbers column by column.  Doing each as its own
+list comprehension over the row, with `i in COLUMNS` tuple tests, walks every
+column several times.  compile_plan takes the operations wanted for each
+column and generates, once per row length, a function building the output
+row in one list display, eg
+
+    def plan(row):
+        return [row[0], '', ..., _integer(row[113]), ('' if (v := _integer(row[114])) == '0' else v), ...]
+
+Operations (applied in the order given for a column):
+
+- BLANK: always blank (unused column)
+- ZERO_TO_BLANK: blank if '0' (eg zero meter reads)
+- INTEGER: whole number of numeric text, '12.0' -> '12' ('' stays blank)
+- MONEY: amount with two decimals, '12.5' -> '12.50' (see money.to_cents)
+
+blank_values (eg '0.00' amounts) are blanked in any column after the
+column's own operations.  Rows of any length can be given, columns beyond
+the row's length are ignored.
+"""
+
+
+from functools import cache
+
+from app_modules.money import format_cents, to_cents
+
+
+BLANK = 'blank'
+ZERO_TO_BLANK = 'zero_to_blank'
+INTEGER = 'integer'
+MONEY = 'money'
+
+
+def _integer(value):
+    """Whole number text of numeric value ('' stays blank)."""
+    return f'{int(float(value)):d}' if value else value
+
+
+def _money(value):
+    """Two decimal amount text of value ('' stays blank)."""
+    if not value:
+        return value
+    cents = to_cents(value)
+    return ('-' if cents < 0 else '') + format_cents(abs(cents), '', pad=False)
+
+
+OPERATIONS = {  # expression of operation on value v
+    BLANK: "''",
+    ZERO_TO_BLANK: "('' if {v} == '0' else {v})",
+    INTEGER: '_integer({v})',
+    MONEY: '_money({v})',
+}
+
+
+def _checked(operation):
+    """Operation if known, otherwise ValueError."""
+    if operation not in OPERATIONS:
+        raise ValueError(f'Unknown column operation "{operation}", use one of {list(OPERATIONS)}')
+    return operation
+
+
+def merge_operations(*groups):
+    """Column operations of (columns, operation) groups, in group order if a column is in several."""
+    operations = {}
+    for columns, operation in groups:
+        for idx in columns:
+            operations[idx] = operations.get(idx, ()) + (_checked(operation),)
+    return operations
+
+
+def _apply(expression, step):
+    """Step (expression using {v}) applied to expression, evaluated once."""
+    if step.count('{v}') > 1 and not (expression.startswith('row[') or expression == 'v'):
+        return step.replace('{v}', f'(v := {expression})', 1).replace('{v}', 'v')
+    return step.replace('{v}', expression)
+
+
+def _column_expression(idx, operations, blank_values):
+    """Expression giving output value of column idx."""
+    expression = f'row[{idx}]'
+    for operation in operations:
+        if operation == BLANK:
+            return "''"
+        expression = _apply(expression, OPERATIONS[operation])
+    if blank_values:
+        expression = _apply(expression, f"('' if {{v}} in {blank_values!r} else {{v}})")
+    return expression
+
+
+@cache
+def _compile(col_count, operations, blank_values):
+    """Function applying operations to rows of col_count columns."""
+    operations = dict(operations)
+    items = [
+        _column_expression(idx, operations.get(idx, ()), blank_values)
+        for idx in range(col_count)
+        ]
+    source = f'def plan(row):\n    return [{", ".join(items)}]\n'
+    namespace = {'_integer': _integer, '_money': _money}
+    exec(compile(source, '<plan>', 'exec'), namespace)  # pylint: disable=W0122:exec-used
+    return namespace['plan']
+
+
+def compile_plan(operations, blank_values=()):
+    """Function giving row with operations (column index: operation(s)) applied.
+
+    The row's list display is compiled once for each row length (usually
+    one per file).
+    """
+    key = tuple(sorted(
+        (idx, tuple(_checked(x) for x in ((ops,) if isinstance(ops, str) else ops)))
+        for idx, ops in operations.items()
+        ))
+    blank_values = tuple(blank_values)
+    compiled = {}  # row length: function
+
+    def plan(row):
+        function = compiled.get(len(row))
+        if function is None:
+            function = compiled[len(row)] = _compile(len(row), key, blank_values)
+        return function(row)
+    return plan
@@ -0,0 +1,91 @@
+"""
+Zip members compressed in one process and added to a zip file in another.
+
+Worker processes write transformed data through a DeflatedWriter, which
+deflates it as it is written (exactly as ZipFile would) and keeps the CRC and
+size.  The compressed payload is much smaller to send back to the parent
+process, which adds it to the zip file with append_deflated without
+compressing it again.
+
+ZipFile has no public method for adding already compressed data, so
+append_deflated does what ZipFile.open(..., 'w') does with the data it
+compresses (using ZipFile internals, checked against Python 3.13 & 3.14).
+With other Python versions, or if the internals are not there, the payload
+is decompressed and added with writestr (compressed again, slower but safe).
+"""
+
+
+import io
+import sys
+import zipfile
+import zlib
+from dataclasses import dataclass
+
+
+INTERNALS_CHECKED = ((3, 13), (3, 14))  # Python versions append_deflated checked against
+ZIP_INTERNALS = ('_lock', '_writing', '_writecheck', '_seekable', '_didModify', 'start_dir')
+
+
+@dataclass
+class DeflatedMember:
+    """Compressed zip member data ready to be added to zip file."""
+    payload: bytes
+    crc: int
+    file_size: int
+
+
+class DeflatedWriter(io.RawIOBase):
+    """Binary stream deflating data written to it."""
+
+    def __init__(self, level=zlib.Z_DEFAULT_COMPRESSION):
+        super().__init__()
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, -15)  # raw deflate like zip
+        self.chunks = []
+        self.crc = 0
+        self.file_size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):  # pylint: disable=W0221:arguments-renamed
+        self.crc = zlib.crc32(data, self.crc)
+        self.file_size += len(data)
+        self.chunks.append(self.compressor.compress(data))
+        return len(data)
+
+    def member(self):
+        """Finish compression returning member data."""
+        self.chunks.append(self.compressor.flush())
+        return DeflatedMember(b''.join(self.chunks), self.crc, self.file_size)
+
+
+def internals_checked(out_zip):
+    """Check ZipFile internals used by append_deflated are those checked."""
+    return sys.version_info[:2] in INTERNALS_CHECKED \
+        and all(hasattr(out_zip, x) for x in ZIP_INTERNALS)
+
+
+def append_deflated(out_zip, zinfo, member):
+    """Add already deflated member data to zip file opened for writing."""
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    if not internals_checked(out_zip):
+        out_zip.writestr(zinfo, zlib.decompress(member.payload, -15))
+        return
+    zinfo.CRC = member.crc
+    zinfo.file_size = member.file_size
+    zinfo.compress_size = len(member.payload)
+    zip64 = max(zinfo.file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT
+    # pylint: disable=W0212:protected-access
+    with out_zip._lock:
+        if out_zip._writing:
+            raise ValueError("Can't write to the ZIP file while there is another write handle open")
+        out_zip._writecheck(zinfo)
+        if out_zip._seekable:
+            out_zip.fp.seek(out_zip.start_dir)
+        zinfo.header_offset = out_zip.fp.tell()
+        out_zip._didModify = True
+        out_zip.fp.write(zinfo.FileHeader(zip64))
+        out_zip.fp.write(member.payload)
+        out_zip.start_dir = out_zip.fp.tell()
+        out_zip.filelist.append(zinfo)
+        out_zip.NameToInfo[zinfo.filename] = zinfo
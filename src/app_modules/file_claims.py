@@ -0,0 +1,170 @@
+"""
+Claim files in a watch directory shared by several dispatchers.
+
+Dispatchers on one or more hosts can watch the same directory.  Before
+processing a file a dispatcher claims it by renaming it into its own work
+directory:
+
+    <watch dir>/.claims/<host>-<pid>/<file name>/<file name>
+
+A rename is atomic, so only one dispatcher's claim succeeds and the others
+find the file gone and leave it alone.  The job runs in the claim
+directory, then the results are moved back into the watch directory and the
+claim removed.  Only the claiming dispatcher deletes or archives the file.
+
+Each dispatcher keeps a lease on its claims by touching a lease file every
+few seconds.  A dispatcher that stops without releasing its claims (crash,
+power cut) leaves a stale lease.  After LEASE seconds another dispatcher
+takes over the stale work directory (again by rename, so only one does),
+moves the claimed files back into the watch directory to be processed again
+and discards any partial results.  Claims of a dead process on the same host
+are recovered straight away.
+
+Renames are only atomic within one file system, so hosts must share the
+watch directory through a file system that keeps them atomic (eg network
+share) or accept that Dropbox resolves simultaneous claims as a conflict.
+"""
+
+
+import contextlib
+import os
+import shutil
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import app_modules.utilities as utils
+
+
+CLAIMS_DIR = '.claims'
+LEASE_FILE = '.lease'
+RECOVERING = '.recovering-'  # work directory being recovered by another dispatcher
+LEASE = 300  # seconds without lease renewal before claims are recovered
+
+
+def instance_name():
+    """Name identifying this dispatcher among those sharing the directory."""
+    return f'{socket.gethostname()}-{os.getpid()}'
+
+
+def is_dead(instance):
+    """Check if dispatcher instance was a process on this host that has ended."""
+    host, _, pid = instance.split(RECOVERING)[0].rpartition('-')
+    if os.name != 'posix' or host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass  # process exists but belongs to someone else
+    return False
+
+
+def lease_age(directory, now):
+    """Seconds since lease of work directory was renewed."""
+    for path in (directory / LEASE_FILE, directory):
+        with contextlib.suppress(OSError):
+            return now - path.stat().st_mtime
+    return 0
+
+
+@dataclass
+class Claim:
+    """File claimed for processing by this dispatcher."""
+    fname: str
+    directory: Path  # claim directory holding file & results
+    watch_dir: Path
+
+    @property
+    def file_path(self):
+        """Claim directory as file path given to programs."""
+        return f'{self.directory.as_posix()}/'
+
+    def release(self):
+        """Move results into watch directory and remove claim."""
+        for path in self.directory.iterdir():
+            os.replace(path, self.watch_dir / path.name)
+        with contextlib.suppress(OSError):
+            self.directory.rmdir()
+
+
+class FileClaims:
+    """Claims of this dispatcher in a shared watch directory."""
+
+    def __init__(self, watch_dir, lease=LEASE, on_recovered=None, name=None):
+        self.watch_dir = Path(watch_dir)
+        self.lease = lease
+        self.on_recovered = on_recovered  # called with path of each recovered file
+        self.root = self.watch_dir / CLAIMS_DIR
+        self.instance = self.root / (name or instance_name())
+        self.instance.mkdir(parents=True, exist_ok=True)
+        (self.instance / LEASE_FILE).touch()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._renew, name='claims', daemon=True)
+        self.thread.start()
+
+    def claim(self, fname):
+        """Claim file in watch directory (None if another dispatcher has it)."""
+        directory = self.instance / fname
+        directory.mkdir(exist_ok=True)
+        try:
+            os.rename(self.watch_dir / fname, directory / fname)
+        except FileNotFoundError:
+            directory.rmdir()
+            return None
+        return Claim(fname, directory, self.watch_dir)
+
+    def recover_stale(self):
+        """Return files of dispatchers with stale leases to the watch directory."""
+        now = time.time()
+        for directory in self.root.iterdir():
+            if directory == self.instance or not directory.is_dir():
+                continue
+            if lease_age(directory, now) >= self.lease or is_dead(directory.name):
+                try:
+                    self._recover(directory)
+                except OSError:
+                    utils.logger.info('Error recovering "%s"', directory.name, exc_info=True)
+
+    def stop(self):
+        """Stop renewing lease and remove work directory (if no claims left)."""
+        self.stopped.set()
+        self.thread.join()
+        with contextlib.suppress(OSError):
+            (self.instance / LEASE_FILE).unlink()
+            self.instance.rmdir()
+
+    def _recover(self, directory):
+        """Take over stale work directory and return its claimed files."""
+        taken = self.root / f'{directory.name.split(RECOVERING)[0]}{RECOVERING}{self.instance.name}'
+        try:
+            os.rename(directory, taken)
+        except OSError:
+            return  # another dispatcher got there first
+        with contextlib.suppress(OSError):
+            os.utime(taken / LEASE_FILE)  # so it isn't taken from us
+        recovered = []
+        for claim_dir in taken.iterdir():
+            claimed = claim_dir / claim_dir.name
+            if claim_dir.is_dir() and claimed.exists():
+                os.replace(claimed, self.watch_dir / claim_dir.name)
+                recovered.append(self.watch_dir / claim_dir.name)
+                utils.logger.info(
+                    'Recovered "%s" claimed by "%s"', claim_dir.name, directory.name)
+        shutil.rmtree(taken)  # including partial results
+        for path in recovered:
+            if self.on_recovered:
+                self.on_recovered(str(path))
+
+    def _renew(self):
+        """Lease thread loop renewing lease & recovering stale claims."""
+        while True:
+            with contextlib.suppress(OSError):
+                os.utime(self.instance / LEASE_FILE)
+            with contextlib.suppress(OSError):
+                self.recover_stale()
+            if self.stopped.wait(self.lease / 10):
+                return
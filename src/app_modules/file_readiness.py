@@ -0,0 +1,137 @@
+"""
+Detect when files dropped into the watch directory have finished being written.
+
+The watchdog created event fires as soon as a file appears, often before
+Dropbox has finished writing a large zip or PDF.  ReadinessTracker holds
+created files until they are complete, then passes each one on once:
+
+- a close-write event (inotify observers only) means the writer is done
+- otherwise size/mtime are polled until they stop changing for QUIET seconds,
+  backing off polling (up to MAX_POLL) while a file keeps changing
+
+Repeated created/modified events for a pending file are coalesced.
+"""
+
+
+import os
+import threading
+import time
+
+import app_modules.utilities as utils
+
+
+QUIET = 1.0  # seconds size & mtime must be unchanged
+MAX_POLL = 8.0  # longest wait between polls of a file still being written
+
+
+def file_state(path):
+    """Return (size, mtime) of file or None if it no longer exists."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class Pending:  # pylint: disable=R0903:too-few-public-methods
+    """Polling state of a file that is still being written."""
+
+    def __init__(self, now, quiet):
+        self.quiet = quiet
+        self.state = None
+        self.stable_since = now
+        self.interval = quiet
+        self.next_check = now
+
+    def check(self, path, now):
+        """Poll file, returning True when it is ready (None if it vanished)."""
+        state = file_state(path)
+        if state is None:
+            return None
+        if state != self.state:  # still being written, back off polling
+            if self.state:
+                self.interval = min(self.interval * 2, MAX_POLL)
+            self.state, self.stable_since = state, now
+            self.next_check = now + self.interval
+        elif now - self.stable_since >= self.quiet:
+            return True
+        else:  # wait out rest of quiet period
+            self.next_check = self.stable_since + self.quiet
+        return False
+
+
+class ReadinessTracker:
+    """Call on_ready(path) once for each created file when it is complete."""
+
+    def __init__(self, on_ready, quiet=QUIET):
+        self.on_ready = on_ready
+        self.quiet = quiet
+        self.pending = {}  # path: Pending
+        self.cond = threading.Condition()
+        self.stopping = False
+        self.thread = threading.Thread(target=self._poll, name='readiness', daemon=True)
+        self.thread.start()
+
+    def created(self, path):
+        """Start tracking new file (duplicate events are coalesced)."""
+        with self.cond:
+            if path not in self.pending:
+                self.pending[path] = Pending(time.monotonic(), self.quiet)
+                self.cond.notify()
+
+    def tracking(self, path):
+        """Whether file is being held until it is complete."""
+        with self.cond:
+            return path in self.pending
+
+    def modified(self, path):
+        """File still being written, restart its quiet period if tracked."""
+        with self.cond:
+            if path in self.pending:
+                self.pending[path].next_check = time.monotonic()
+                self.cond.notify()
+
+    def closed(self, path):
+        """Writer closed file, so pass it on now if tracked."""
+        with self.cond:
+            tracked = self.pending.pop(path, None)
+        if tracked and file_state(path):
+            self._ready(path)
+
+    def stop(self):
+        """Stop polling (files still pending are dropped)."""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+        self.thread.join()
+
+    def _ready(self, path):
+        try:
+            self.on_ready(path)
+        except Exception:  # pylint: disable=broad-except
+            utils.logger.info('Error passing on "%s"', path, exc_info=True)
+
+    def _due(self):
+        """Wait for next poll time and return paths that are now ready."""
+        with self.cond:
+            while not self.stopping:
+                now = time.monotonic()
+                ready = []
+                for path, pending in list(self.pending.items()):
+                    if pending.next_check <= now:
+                        result = pending.check(path, now)
+                        if result is not False:  # ready or vanished
+                            del self.pending[path]
+                            if result:
+                                ready.append(path)
+                if ready:
+                    return ready
+                next_check = min((x.next_check for x in self.pending.values()), default=None)
+                self.cond.wait(None if next_check is None else max(next_check - now, 0))
+            return []
+
+    def _poll(self):
+        """Polling thread loop."""
+        while ready := self._due():
+            for path in ready:
+                self._ready(path)
@@ -0,0 +1,202 @@
+"""
+Extract fields from fixed width records with code generated for the layout.
+
+Fixed length client files (eg Charlevoix) have 18KB records of which about
+a hundred fields are wanted.  Slicing and stripping each field in a loop
+over the layout costs an index, a slice, a strip and a loop step per field
+per record.  compile_layout checks a layout (fields like those in
+ancillaries/charlevoix_fields: (name, start, end, length)) and generates a
+function doing the slices & strips in one list display, eg
+
+    def extract(row):
+        return [row[0:25].strip(), row[74:94].strip(), ...]
+
+compile_columns does the same for delimited records (columns by index).
+Compiled functions are cached per layout, so transforms can compile their
+layout when imported.  tests/x_bench_fixed_width.py shows the speedup.
+
+With NumPy installed (optional, FM_FIXED_ENGINE=python to not use it),
+iter_fixed_records reads the file CHUNK_RECORDS records at a time into a
+records x record length byte array, selects records (eg not paperless) with
+one mask and takes each field as a column slice, so there is no per record
+slicing in Python.  Only records of printable ASCII all the same length can
+be read this way, otherwise (from the chunk that isn't) the records are read
+line by line with the compiled layout, giving the same fields.  Records can
+be read from a mapped file (see mapped_file) so chunks are arrays over the
+mapped pages and only the selected fields are copied & decoded.
+transforms/row_executor reads each worker's chunk of records the same way.
+"""
+
+
+import codecs
+import os
+from functools import cache
+
+from app_modules.mapped_file import BufferReader
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # pylint: disable=C0103:invalid-name
+
+
+NAME, START, END, LENGTH = range(4)  # layout field tuple items
+CHUNK_RECORDS = 512  # records read into array at a time (9MB of charlevoix)
+LINE_CHUNK = 1 << 20  # bytes read at a time when reading line by line
+ENGINE_ENV = 'FM_FIXED_ENGINE'
+
+
+class LayoutError(ValueError):
+    """Fixed width layout field is not valid."""
+
+
+def validate_layout(fields):
+    """Check fields are (name, start, end, length) with starts in order."""
+    previous_start = 0
+    for field in fields:
+        try:
+            name, start, end, length = field[:4]
+        except ValueError:
+            raise LayoutError(f'Field {field!r} is not (name, start, end, length)') from None
+        if not all(isinstance(x, int) for x in (start, end, length)):
+            raise LayoutError(f'Field "{name}" start, end & length must be integers')
+        if not 0 <= start < end or end - start != length:
+            raise LayoutError(f'Field "{name}" {start}-{end} does not have length {length}')
+        if start < previous_start:
+            raise LayoutError(f'Field "{name}" starts before the field preceding it')
+        previous_start = start
+    return fields
+
+
+def _generate(name, items):
+    """Function name(row) returning list display of items."""
+    source = f'def {name}(row):\n    return [{", ".join(items)}]\n'
+    namespace = {}
+    exec(compile(source, f'<{name}>', 'exec'), namespace)  # pylint: disable=W0122:exec-used
+    return namespace[name]
+
+
+@cache
+def _compile_spans(spans):
+    return _generate('extract', [f'row[{start}:{end}].strip()' for start, end in spans])
+
+
+def compile_layout(fields):
+    """Function returning stripped text of fields of fixed width record."""
+    validate_layout(fields)
+    return _compile_spans(tuple((field[START], field[END]) for field in fields))
+
+
+@cache
+def _compile_indexes(indexes):
+    select = _generate('select', [f'row[{idx}].strip()' for idx in indexes])
+    def select_columns(row):
+        try:
+            return select(row)
+        except IndexError:  # short row, only columns it has
+            return [row[idx].strip() for idx in indexes if idx < len(row)]
+    return select_columns
+
+
+def compile_columns(indexes):
+    """Function returning stripped columns (by index) of delimited record."""
+    if not all(isinstance(x, int) and x >= 0 for x in indexes) \
+            or any(x >= y for x, y in zip(indexes, indexes[1:])):
+        raise LayoutError('Column indexes must be integers from 0 in ascending order')
+    return _compile_indexes(tuple(indexes))
+
+
+def numpy_engine():
+    """NumPy used for fixed length records (installed & not turned off)."""
+    return np is not None and os.environ.get(ENGINE_ENV, 'numpy') != 'python'
+
+
+def _array_records(data, record_length, newline):
+    """Records of data as array (None if not all the same printable ASCII records)."""
+    stride = record_length + len(newline)
+    if len(data) % stride == record_length:  # last record without line end
+        data = b''.join((data, newline))
+    if len(data) % stride:
+        return None
+    records = np.frombuffer(data, np.uint8).reshape(-1, stride)
+    text = records[:, :record_length]
+    if not (records[:, record_length:] == np.frombuffer(newline, np.uint8)).all() \
+            or (text.size and (text.min() < 0x20 or text.max() > 0x7e)):
+        return None
+    return text
+
+
+@cache
+def _packed_layout(spans, record_length):
+    """Byte indexes of fields (spans) in record & extract for them packed together."""
+    indexes, packed, width = [], [], 0
+    for start, end in spans:
+        end = max(start, min(end, record_length))  # field may be beyond record
+        indexes.extend(range(start, end))
+        packed.append((width, width + end - start))
+        width += end - start
+    return np.array(indexes, np.intp), _compile_spans(tuple(packed)), width
+
+
+def _array_fields(records, spans, where):
+    """Stripped fields (spans) of records where (start, end, value) matches.
+
+    Each record's field bytes are packed together (one array index), decoded
+    once for all the records and the fields sliced from the packed text.
+    """
+    start, end, value = where
+    rows = np.flatnonzero((records[:, start:end] == np.frombuffer(value, np.uint8)).all(axis=1))
+    indexes, extract, width = _packed_layout(spans, records.shape[1])
+    text = records[rows[:, None], indexes].tobytes().decode('ascii')  # only fields copied
+    return [extract(text[idx:idx + width]) for idx in range(0, len(text), width)]
+
+
+def _line_fields(data, stream, newline, encoding, extract, where):
+    """Stripped fields of lines (data then rest of stream) where (start, end, value) matches."""
+    start, end, value = where
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = decoder.decode(data)
+    while True:
+        *lines, pending = pending.split(newline)
+        for row in lines:
+            if row and row[start:end] == value:
+                yield extract(row)
+        if not (data := stream.read(LINE_CHUNK)):
+            break
+        pending += decoder.decode(data)
+    pending += decoder.decode(b'', final=True)
+    if pending and pending[start:end] == value:
+        yield extract(pending)
+
+
+def iter_fixed_records(source, layout, where, encoding='utf8', use_numpy=None):  # pylint: disable=R0913:too-many-arguments
+    """Stripped fields (layout) of fixed length records in binary stream or view.
+
+    where is (field, value), only records with value in field are given.
+    Records are read into arrays if they can be (and use_numpy, default
+    numpy_engine()), otherwise line by line.  A view (eg mapped_file.map_path)
+    is read without copying it.
+    """
+    use_numpy = numpy_engine() if use_numpy is None else use_numpy and np is not None
+    stream = source if hasattr(source, 'read') else BufferReader(source)
+    extract = compile_layout(layout)
+    (_, start, end, *_), value = where
+    position = stream.tell() if stream.seekable() else None
+    data = stream.readline()  # first record gives record length
+    newline = b'\r\n' if data[-2:] == b'\r\n' else b'\n'
+    record_length = len(data) - len(newline)
+    if use_numpy and record_length > 0 and data[-len(newline):] == newline:
+        spans = tuple((field[START], field[END]) for field in layout)
+        chunk_size = CHUNK_RECORDS * len(data)
+        if position is None:
+            data = b''.join((data, stream.read(chunk_size - len(data))))
+        else:  # first chunk read again rather than joined (copied)
+            stream.seek(position)
+            data = stream.read(chunk_size)
+        while (records := _array_records(data, record_length, newline)) is not None:
+            yield from _array_fields(records, spans, (start, end, value.encode('ascii')))
+            if len(data) < chunk_size:
+                return
+            data = stream.read(chunk_size)
+    # rest read line by line
+    yield from _line_fields(data, stream, newline.decode(), encoding, extract, (start, end, value))
@@ -0,0 +1,139 @@
+"""
+Journal of dispatched jobs so resent files are not processed again.
+
+Clients often resend the same file and Dropbox conflict copies ("(1).zip")
+get dispatched too.  Successful jobs are recorded in an SQLite journal in
+the data root, keyed by:
+
+- a streamed SHA-256 hash of the dropped file's contents
+- the client name (from utilities.parse_filename_new)
+- the version of the code (hash of every source file under src/, as client
+  transforms share app_modules & transforms modules, eg money, fixed_width)
+
+Results of journaled jobs are copied into a cache directory, so when the
+same file turns up again the cached results are restored instead of
+running the job.
+"""
+
+
+import hashlib
+import json
+import shutil
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import app_modules.utilities as utils
+
+
+JOURNAL_DB = f'{utils.DATA_ROOT}job_journal.sqlite'
+CACHE_DIR = f'{utils.DATA_ROOT}job_cache/'
+SRC = Path(__file__).parents[1]  # source files hashed for code version
+
+
+@dataclass
+class JournalKey:
+    """What makes a job the same as one already processed."""
+    content_hash: str
+    client: str
+    version: str
+    outputs: list  # result file names written to watch directory
+
+
+def content_hash(abs_fname):
+    """Hash file contents without reading whole file into memory."""
+    with open(abs_fname, 'rb') as file:
+        return hashlib.file_digest(file, 'sha256').hexdigest()
+
+
+def output_names(program, cname, new_fname, file_type):
+    """Result files program writes for input (None if results not journaled)."""
+    match program:
+        case 'transforms/transform_file' if file_type == 'zip':
+            return [f'{utils.TRANS_PREFIX}{new_fname}']
+        case 'transforms/hlap_cnvrt' if cname == 'hlap':
+            out_file = f'{utils.TRANS_PREFIX}{new_fname}'
+            return [
+                out_file.replace('.', suffix).replace('TXT', 'csv').replace('txt', 'csv')
+                for suffix in ('_PRN.', '_PDF.')
+                ]
+    return None  # eg PDF indexing must always run to SFTP results
+
+
+def program_version(src=SRC):
+    """Hash names & contents of every source file under src.
+
+    Programs & client transforms use shared modules, so a change to any of
+    them (not only the program's & transform's own files) is a new version.
+    """
+    version = hashlib.sha256()
+    for source in sorted(Path(src).rglob('*.py')):
+        data = source.read_bytes()
+        version.update(f'{source.relative_to(src).as_posix()}\0{len(data)}\0'.encode())
+        version.update(data)
+    return version.hexdigest()
+
+
+class JobJournal:
+    """SQLite journal of processed files with cache of their results."""
+
+    def __init__(self, db=JOURNAL_DB, cache_dir=CACHE_DIR):
+        self.db = db
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.db)) as conn, conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                ' content_hash TEXT, client TEXT, version TEXT,'
+                ' program TEXT, file_name TEXT, cached TEXT, processed TEXT,'
+                ' PRIMARY KEY (content_hash, client, version))')
+
+    @staticmethod
+    def key(program, cname, fname, ftype, file_path):
+        """Journal key for job (None if program results are not journaled)."""
+        outputs = output_names(program, cname, fname, ftype)
+        if not outputs:
+            return None
+        return JournalKey(
+            content_hash(f'{file_path}{fname}'), cname, program_version(), outputs)
+
+    def lookup(self, key):
+        """Cached result files of job already processed (None if not processed)."""
+        with closing(sqlite3.connect(self.db)) as conn:
+            row = conn.execute(
+                'SELECT cached FROM jobs WHERE content_hash=? AND client=? AND version=?',
+                (key.content_hash, key.client, key.version)).fetchone()
+        if not row:
+            return None
+        cached = [Path(x) for x in json.loads(row[0])]
+        return cached if all(x.exists() for x in cached) else None
+
+    def restore(self, key, file_path):
+        """Copy cached results of already processed job into file_path."""
+        cached = self.lookup(key)
+        if not cached or len(cached) != len(key.outputs):
+            return False
+        for cache_file, out_name in zip(cached, key.outputs):
+            shutil.copyfile(cache_file, f'{file_path}{out_name}')
+        return True
+
+    def record(self, key, program, fname, file_path):
+        """Journal successful job, caching copy of its results."""
+        results = [Path(f'{file_path}{x}') for x in key.outputs]
+        if not all(x.exists() for x in results):
+            utils.logger.info('Results of "%s" not found, so not journaled', fname)
+            return
+        job_dir = self.cache_dir / f'{key.client}-{key.content_hash[:16]}-{key.version[:8]}'
+        job_dir.mkdir(exist_ok=True)
+        cached = []
+        for idx, result in enumerate(results):
+            cache_file = job_dir / f'{idx}{result.suffix}'
+            shutil.copyfile(result, cache_file)
+            cached.append(str(cache_file))
+        with closing(sqlite3.connect(self.db)) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key.content_hash, key.client, key.version, program, fname,
+                 json.dumps(cached), datetime.now().isoformat(timespec='seconds')))
@@ -0,0 +1,152 @@
+"""
+Resource usage of jobs run by the dispatcher.
+
+Each job run appends one tab separated line to METRICS_FILE in the data root:
+when it finished, client, program, file type, input size (bytes), records
+created, exit status, wall time, CPU user & system time (seconds) and peak
+resident memory (KiB).  The file is only ever appended to, so months of jobs
+can be aggregated by client, eg total CPU seconds:
+
+    awk -F'\\t' 'NR>1 {cpu[$2]+=$9+$10} END {for (c in cpu) print c, cpu[c]}'
+
+Jobs run as a new interpreter are measured from the child's rusage (os.wait4).
+Jobs run in a warm worker are measured inside the worker, with its peak RSS
+reset first (Linux /proc/self/clear_refs) so the peak is the job's own.
+Either way CPU includes the job's child processes that have been waited for,
+but not member or row worker processes (see transforms/transform_file &
+row_executor): these are started by the multiprocessing forkserver, so they
+are its children rather than the job's, and their CPU is in neither.
+
+Programs report the records they create with count_records().  Counts are
+passed back to the dispatcher through the file named by the RECORDS_ENV
+environment variable, so they work whether the program runs in a child
+process or a worker.
+"""
+
+
+import contextlib
+import csv
+import os
+import subprocess
+import threading
+import time
+from dataclasses import astuple, dataclass, fields
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import app_modules.utilities as utils
+
+
+METRICS_FILE = f'{utils.DATA_ROOT}job_metrics.tsv'
+RECORDS_ENV = 'FM_JOB_RECORDS'  # file records created by job are counted in
+LOCK = threading.Lock()  # executor threads share the metrics file
+
+
+@dataclass
+class Usage:
+    """Resources used by a job."""
+    wall: float = 0.0  # seconds
+    user: float = 0.0  # CPU seconds
+    system: float = 0.0  # CPU seconds
+    max_rss: int = 0  # KiB
+
+
+@dataclass
+class JobMetrics:  # pylint: disable=R0902:too-many-instance-attributes
+    """Line of metrics file."""
+    finished: str
+    client: str
+    program: str
+    file_type: str
+    input_bytes: int
+    records: int
+    status: int
+    wall: float
+    user: float
+    system: float
+    max_rss: int
+
+    def row(self):
+        """Values formatted for metrics file."""
+        return [f'{x:.3f}' if isinstance(x, float) else x for x in astuple(self)]
+
+
+def count_records(count):
+    """Report records created by job to the dispatcher (if dispatched)."""
+    records_file = os.environ.get(RECORDS_ENV)
+    if records_file and count:
+        with open(records_file, 'a', encoding='utf8') as file:
+            file.write(f'{count}\n')
+
+
+def read_records(records_file):
+    """Total records reported by job, removing the records file."""
+    try:
+        with open(records_file, encoding='utf8') as file:
+            total = sum(int(x) for x in file if x.strip())
+    except FileNotFoundError:
+        return 0
+    with contextlib.suppress(OSError):
+        os.remove(records_file)
+    return total
+
+
+def reset_peak_rss():
+    """Reset peak resident memory of this process (Linux only)."""
+    with contextlib.suppress(OSError), open('/proc/self/clear_refs', 'w', encoding='utf8') as refs:
+        refs.write('5')
+
+
+def peak_rss():
+    """Peak resident memory (KiB) of this process since last reset."""
+    with contextlib.suppress(OSError), open('/proc/self/status', encoding='utf8') as status:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+
+
+def cpu_times():
+    """User & system CPU seconds of this process and its waited for children."""
+    own, children = resource.getrusage(resource.RUSAGE_SELF), \
+        resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + children.ru_utime, own.ru_stime + children.ru_stime
+
+
+def measure(func, *args):
+    """Call func in this process, returning its result and resource usage."""
+    reset_peak_rss()
+    before = cpu_times() if resource else None
+    start = time.perf_counter()
+    result = func(*args)
+    wall = time.perf_counter() - start
+    if not before:
+        return result, Usage(wall)
+    after = cpu_times()
+    return result, Usage(wall, after[0] - before[0], after[1] - before[1], peak_rss())
+
+
+def run_child(command, env=None):
+    """Run command as child process, returning its exit status and resource usage."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, env=env)  # pylint: disable=R1732:consider-using-with
+    if not hasattr(os, 'wait4'):
+        return proc.wait(), Usage(time.perf_counter() - start)
+    _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)  # so Popen doesn't wait again
+    return proc.returncode, Usage(
+        time.perf_counter() - start, rusage.ru_utime, rusage.ru_stime, rusage.ru_maxrss)
+
+
+def record(metrics, metrics_file=METRICS_FILE):
+    """Append job metrics to metrics file (heading written when file is new)."""
+    Path(metrics_file).parent.mkdir(parents=True, exist_ok=True)
+    with LOCK, open(metrics_file, 'a', encoding='utf8', newline='') as file:
+        writer = csv.writer(file, delimiter='\t', lineterminator='\n')
+        if not file.tell():
+            writer.writerow(x.name for x in fields(JobMetrics))
+        writer.writerow(metrics.row())
@@ -0,0 +1,122 @@
+"""
+Bounded job queue between the directory watcher and the job executors.
+
+Jobs are queued with a key (the client name).  Executor threads take jobs
+from the queue so different clients are processed concurrently, but jobs
+with the same key are run one at a time in the order they were queued.
+
+Putting a job on a full queue blocks until an executor makes room, so a
+burst of files can't grow the queue without limit.  An item already waiting
+or being run is not queued again.
+"""
+
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import app_modules.utilities as utils
+
+
+@dataclass
+class Job:
+    """Item waiting to be processed."""
+    key: str
+    item: str
+    queued: float = field(default_factory=time.monotonic)
+
+
+class JobQueue:  # pylint: disable=R0902:too-many-instance-attributes
+    """Run queued jobs with handler, strictly in order for each key."""
+
+    def __init__(self, handler, executors=4, maxsize=100, on_wait=None):
+        """Start executor threads that call handler(item) for each job.
+
+        on_wait(seconds) is called with how long each job waited to be run.
+        """
+        self.handler = handler
+        self.on_wait = on_wait
+        self.maxsize = maxsize
+        self.lanes = {}  # key: deque of jobs (dict keeps lane arrival order)
+        self.busy = set()  # keys with a job being run
+        self.items = set()  # items waiting or being run
+        self.pending = 0
+        self.stopping = False
+        self.cond = threading.Condition()
+        self.threads = [
+            threading.Thread(target=self._work, name=f'executor-{idx}', daemon=True)
+            for idx in range(max(1, executors))
+            ]
+        for thread in self.threads:
+            thread.start()
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting to be run."""
+        return self.pending
+
+    @property
+    def active(self) -> int:
+        """Number of jobs being run."""
+        return len(self.busy)
+
+    def put(self, key, item):
+        """Queue item for key, waiting while the queue is full."""
+        with self.cond:
+            while self.pending >= self.maxsize:
+                self.cond.wait()
+            if item in self.items:
+                return
+            self.items.add(item)
+            self.lanes.setdefault(key, deque()).append(Job(key, item))
+            self.pending += 1
+            depth = self.pending
+            self.cond.notify_all()
+        utils.logger.info('Queued "%s" (%d waiting, %d running)', item, depth, self.active)
+
+    def join(self):
+        """Wait until every queued job has been run."""
+        with self.cond:
+            while self.pending or self.busy:
+                self.cond.wait()
+
+    def stop(self):
+        """Stop executors once running jobs finish (waiting jobs are dropped)."""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join()
+
+    def _next(self):
+        """Wait for first job whose key is not already being run."""
+        with self.cond:
+            while True:
+                if self.stopping:
+                    return None
+                for key, lane in self.lanes.items():
+                    if key not in self.busy:
+                        job = lane.popleft()
+                        if not lane:
+                            del self.lanes[key]
+                        self.busy.add(key)
+                        self.pending -= 1
+                        self.cond.notify_all()
+                        return job
+                self.cond.wait()
+
+    def _work(self):
+        """Executor thread loop."""
+        while job := self._next():
+            if self.on_wait:
+                self.on_wait(time.monotonic() - job.queued)
+            try:
+                self.handler(job.item)
+            except Exception:  # pylint: disable=broad-except
+                utils.logger.info('Error dispatching "%s"', job.item, exc_info=True)
+            finally:
+                with self.cond:
+                    self.busy.discard(job.key)
+                    self.items.discard(job.item)
+                    self.cond.notify_all()
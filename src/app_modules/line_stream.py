@@ -0,0 +1,73 @@
+"""
+Lines of a (zipped) file decoded lazily, a chunk at a time.
+
+transform_file used to give client transforms
+
+    byte_stream.read().decode(encoding).split('\\r\\n')
+
+which holds the compressed stream, the bytes, the decoded text and a list of
+every line in memory before the transform starts.  LineStream gives the same
+lines (including the '' after a final line end) while reading and decoding
+the file in CHUNK sized pieces, so only the lines being worked on are held.
+
+Lines are split on the file's line end: CRLF if the first line ends with
+CRLF, otherwise LF.  A lone LF within a CRLF file stays in its line (eg
+multi-line quoted CSV field) just as it did with split('\\r\\n').
+
+Transforms that need random access to the first few lines (eg
+source_text[0] to check the file layout) can still index a LineStream, only the
+lines up to the index are kept.  Iterating again starts from the beginning
+of the file again.
+
+Fixed length transforms can read the file's bytes instead (mapped into memory
+when it is stored uncompressed, see mapped_file.open_source).
+"""
+
+
+import codecs
+
+
+CHUNK = 1 << 20  # bytes read & decoded at a time
+CRLF = '\r\n'
+
+
+class LineStream:
+    """Re-iterable lines of file opened by opener() and decoded with encoding."""
+
+    def __init__(self, opener, encoding='utf8', chunk=CHUNK, mapper=None):
+        self.opener = opener  # returns new binary file object each call
+        self.mapper = mapper  # returns context giving mapped view of file (or None)
+        self.encoding = encoding
+        self.chunk = chunk
+        self.head = []  # first lines kept for indexing
+        self.newline = None  # line end once detected
+
+    def __iter__(self):
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        pending = ''
+        with self.opener() as stream:
+            while data := stream.read(self.chunk):
+                pending += decoder.decode(data)
+                if self.newline is None and '\n' in pending:
+                    line_end = pending.index('\n')
+                    self.newline = CRLF if pending[line_end - 1:line_end] == '\r' else '\n'
+                if self.newline:
+                    *lines, pending = pending.split(self.newline)
+                    yield from lines
+            pending += decoder.decode(b'', final=True)
+        if self.newline is None:  # no line end
+            yield pending
+        else:
+            yield from pending.split(self.newline)
+
+    def __getitem__(self, idx):
+        """Line by index, only reading lines up to it (slices read whole file)."""
+        if isinstance(idx, slice) or idx < 0:
+            return list(self)[idx]
+        if idx >= len(self.head):
+            self.head = []
+            for line in self:
+                self.head.append(line)
+                if len(self.head) > idx:
+                    break
+        return self.head[idx]
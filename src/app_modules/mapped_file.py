@@ -0,0 +1,155 @@
+"""
+Client files read through a memory map rather than file reads.
+
+Large text files (eg HLAP cycles, fixed length drops) were read through
+Python's file buffers and decoded whole or a line at a time.  A mapped file
+is read straight from the OS page cache: records are memoryview slices of it,
+nothing is copied until a record (or only the fields wanted from it, see
+fixed_width.iter_fixed_records) is decoded, and the pages are shared by both
+HLAP runs (paper & PDF) of the same file.
+
+- map_path gives a read only view of a file
+- map_member gives a view of a zipped file stored (not compressed) in its
+  zip file, None for compressed members which can only be read as a stream
+- iter_lines gives each line of a view as a memoryview, text_lines each
+  line decoded as a text file gives them (universal newlines)
+- open_source gives a transform's line_stream.LineStream file as a view if it
+  can be mapped, otherwise as a binary stream
+- BufferReader reads a view as a binary stream, read() giving zero-copy
+  slices, so code reading streams can read views too
+
+Views are only valid in the with block.  The map is closed at the end of the
+block, or once any slices still held are freed.
+"""
+
+
+import codecs
+import contextlib
+import mmap
+import re
+import struct
+import zipfile
+
+
+LOCAL_HEADER = struct.Struct('<4s22xHH')  # zip local file header (name & extra lengths)
+LOCAL_SIGNATURE = b'PK\x03\x04'
+LINE_END = re.compile(b'\n')
+TEXT_CHUNK = 1 << 20  # bytes decoded at a time by text_lines
+
+
+@contextlib.contextmanager
+def _mapped(file_obj, offset=0, size=None):
+    """View of size bytes (default rest) of open file from offset."""
+    try:
+        mapped = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:  # empty file can't be mapped
+        yield memoryview(b'')
+        return
+    view = memoryview(mapped)[offset:None if size is None else offset + size]
+    try:
+        yield view
+    finally:
+        view.release()
+        with contextlib.suppress(BufferError):  # slices held, closed when freed
+            mapped.close()
+
+
+@contextlib.contextmanager
+def map_path(path):
+    """Read only view of file at path."""
+    with open(path, 'rb') as file_obj, _mapped(file_obj) as view:
+        yield view
+
+
+@contextlib.contextmanager
+def map_member(in_zip, zipped_filename):
+    """View of zipped file's bytes if stored uncompressed in zip file on disk, else None."""
+    zinfo = in_zip.getinfo(zipped_filename)
+    if zinfo.compress_type != zipfile.ZIP_STORED or zinfo.flag_bits & 0x1 \
+            or not isinstance(in_zip.filename, str):  # compressed, encrypted or in memory
+        yield None
+        return
+    with open(in_zip.filename, 'rb') as file_obj:
+        file_obj.seek(zinfo.header_offset)
+        signature, name_length, extra_length = LOCAL_HEADER.unpack(
+            file_obj.read(LOCAL_HEADER.size))
+        if signature != LOCAL_SIGNATURE:
+            raise zipfile.BadZipFile(f'Bad local header for "{zipped_filename}"')
+        offset = zinfo.header_offset + LOCAL_HEADER.size + name_length + extra_length
+        with _mapped(file_obj, offset, zinfo.file_size) as view:
+            yield view
+
+
+def iter_lines(view, newline=b'\n', keepends=False):
+    """Lines of view as memoryview slices (no empty line after a final line end)."""
+    view = memoryview(view)
+    position = 0
+    for match in re.finditer(re.escape(newline), view):  # re searches buffers in place
+        yield view[position:match.end() if keepends else match.start()]
+        position = match.end()
+    if position < len(view):
+        yield view[position:]
+
+
+def _universal(text):
+    """Text with CRLF & lone CR line ends as LF."""
+    return text.replace('\r\n', '\n').replace('\r', '\n') if '\r' in text else text
+
+
+def text_lines(view, encoding='utf8'):
+    """Decoded lines of view ending '\\n' (CRLF & CR too) as text file readline gives them."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    for position in range(0, len(view), TEXT_CHUNK):
+        text = pending + decoder.decode(view[position:position + TEXT_CHUNK])
+        cut = len(text) - text.endswith('\r')  # CR may be first half of CRLF in next chunk
+        *lines, pending = _universal(text[:cut]).split('\n')
+        pending += text[cut:]
+        for line in lines:
+            yield line + '\n'
+    if pending := _universal(pending + decoder.decode(b'', final=True)):
+        yield pending
+
+
+@contextlib.contextmanager
+def open_source(source):
+    """Mapped view of LineStream's file if it can be mapped, otherwise binary stream."""
+    with source.mapper() if source.mapper else contextlib.nullcontext() as view:
+        if view is not None:
+            yield view
+            return
+    with source.opener() as stream:
+        yield stream
+
+
+class BufferReader:
+    """Binary stream reading a view, read() & readline() give memoryview slices."""
+
+    def __init__(self, view):
+        self.view = memoryview(view)
+        self.position = 0
+
+    def read(self, size=-1):
+        """Next size bytes (all the rest if size < 0)."""
+        start = self.position
+        self.position = len(self.view) if size is None or size < 0 \
+            else min(start + size, len(self.view))
+        return self.view[start:self.position]
+
+    def seekable(self):
+        """Views can be read from any position."""
+        return True
+
+    def seek(self, position):
+        """Move to position from start of view."""
+        self.position = min(max(position, 0), len(self.view))
+        return self.position
+
+    def tell(self):
+        """Position from start of view."""
+        return self.position
+
+    def readline(self):
+        """Next line including its line end."""
+        match = LINE_END.search(self.view, self.position)
+        return self.read(-1 if match is None else match.end() - self.position)
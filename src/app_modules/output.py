@@ -6,16 +6,19 @@ import csv
 import os
 import zipfile
 
+from app_modules.zip_compression import get_compression
+
 
 class Output():
     """
     Write output to tab delimited CSV file
     """
-    def __init__(self, filename, de_dup, zip_me, comma):
+    def __init__(self, filename, de_dup, zip_me, comma, compression=None):
         self.file_hndl = open(filename, 'w')
         self.filename = filename
         self.de_dup = de_dup
         self.zip_fn = filename.split('.')[0] + '.zip' if zip_me else None
+        self.compression = get_compression(compression)  # preset name for zip_me
         self.unique = set()
         self.csv_w = csv.writer(
             self.file_hndl,
@@ -48,5 +51,5 @@ class Output():
                 pass
             with zipfile.ZipFile(self.zip_fn, 'a') as zip_file:
                 filename = self.filename.split('/')[-1]
-                zip_file.write(self.filename, filename, zipfile.ZIP_DEFLATED)
+                zip_file.write(self.filename, filename, **self.compression.kwargs())
                 os.remove(self.filename)
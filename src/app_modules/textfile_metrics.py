@@ -0,0 +1,181 @@
+"""
+Counters and histograms written to a Prometheus text exposition file.
+
+node_exporter's textfile collector scrapes *.prom files from a directory, so
+the dispatcher can export throughput metrics without running a network
+service.  Registry.write() replaces the file atomically (written to a temp
+file in the same directory then renamed) so a scrape never sees a partly
+written file, and TextfileExporter writes it every few seconds.
+
+See https://prometheus.io/docs/instrumenting/exposition_formats/
+"""
+
+
+import math
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import app_modules.utilities as utils
+
+
+METRICS_FILE = f'{utils.DATA_ROOT}fm_dispatcher.prom'
+INTERVAL = 15  # seconds between writes of metrics file
+
+
+def escape(value):
+    """Escape label value for exposition format."""
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def format_value(value):
+    """Sample value as exposition format number."""
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def label_str(names, values):
+    """Render labels as {name="value",...} (empty if no labels)."""
+    pairs = ','.join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+    return f'{{{pairs}}}' if pairs else ''
+
+
+class Metric:  # pylint: disable=R0903:too-few-public-methods
+    """Named metric with a sample (or samples) for each set of label values."""
+    kind = 'untyped'
+
+    def __init__(self, name, doc, labels=(), lock=None):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self.lock = lock or threading.Lock()
+        self.values = {}  # label values: sample state
+
+    def lines(self):
+        """Exposition format lines for metric."""
+        lines = [f'# HELP {self.name} {self.doc}', f'# TYPE {self.name} {self.kind}']
+        with self.lock:
+            for values, state in sorted(self.values.items()):
+                lines.extend(self.samples(values, state))
+            if not self.labels and not self.values:
+                lines.extend(self.samples((), self.initial()))
+        return lines
+
+    def initial(self):
+        """Sample state before anything is recorded."""
+        return 0
+
+    def samples(self, values, state):
+        """Sample lines for one set of label values."""
+        return [f'{self.name}{label_str(self.labels, values)} {format_value(state)}']
+
+
+class Counter(Metric):
+    """Count that only goes up."""
+    kind = 'counter'
+
+    def inc(self, *values, amount=1):
+        """Add amount to count for label values."""
+        with self.lock:
+            self.values[values] = self.values.get(values, 0) + amount
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+    kind = 'histogram'
+
+    def __init__(self, name, doc, buckets, labels=(), lock=None):  # pylint: disable=R0913:too-many-arguments
+        super().__init__(name, doc, labels, lock)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def initial(self):
+        return [[0] * len(self.buckets), 0.0, 0]  # bucket counts, sum, count
+
+    def observe(self, value, *values):
+        """Record observation for label values."""
+        with self.lock:
+            state = self.values.setdefault(values, self.initial())
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self, values, state):
+        counts, total, count = state
+        lines = [
+            f'{self.name}_bucket{label_str(self.labels + ('le',), values + (format_value(float(bound)),))}'
+            f' {bucket_count}'
+            for bound, bucket_count in zip(self.buckets, counts)
+            ]
+        labels = label_str(self.labels, values)
+        lines.append(f'{self.name}_sum{labels} {format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class Registry:
+    """Metrics written together to one exposition file."""
+
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def counter(self, name, doc, labels=()):
+        """Register new counter."""
+        self.metrics.append(Counter(name, doc, labels, self.lock))
+        return self.metrics[-1]
+
+    def histogram(self, name, doc, buckets, labels=()):
+        """Register new histogram."""
+        self.metrics.append(Histogram(name, doc, buckets, labels, self.lock))
+        return self.metrics[-1]
+
+    def exposition(self):
+        """All metrics in exposition format."""
+        return ''.join(f'{line}\n' for metric in self.metrics for line in metric.lines())
+
+    def write(self, path=METRICS_FILE):
+        """Atomically replace metrics file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf8') as tmp:
+                tmp.write(self.exposition())
+            os.chmod(tmp_name, 0o644)  # readable by node_exporter
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.remove(tmp_name)
+            raise
+
+
+class TextfileExporter:
+    """Write registry metrics to file every interval seconds until stopped."""
+
+    def __init__(self, registry, path=METRICS_FILE, interval=INTERVAL):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._export, name='metrics', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop exporting, writing final metrics."""
+        self.stopped.set()
+        self.thread.join()
+
+    def _export(self):
+        """Exporter thread loop (writes once more when stopped)."""
+        while not self.stopped.wait(self.interval):
+            self._write()
+        self._write()
+
+    def _write(self):
+        try:
+            self.registry.write(self.path)
+        except OSError:
+            utils.logger.info('Error writing metrics to "%s"', self.path, exc_info=True)
@@ -5,6 +5,7 @@ import argparse
 import fnmatch as fnm
 import os
 import sys
+import tarfile
 import zipfile
 from datetime import date as dt
 from datetime import timedelta as td
@@ -13,6 +14,7 @@ from pathlib import Path
 import chardet
 import app_modules.file_locations as loctns
 from app_modules.app_logger import logger  #noqa F401, pylint: disable=W0611:unused-import
+from app_modules import zip_compression
 
 DATA_ROOT = loctns.DATA_ROOT
 FILE_PATH = loctns.FILE_PATH
@@ -38,22 +40,38 @@ TRANSLATE = {
 IGNORE = ['sorted', 'fxd', '.~lock', '.log', 'B47001', 'Zone.Identifier', '_.pdf']
 
 
-def archive_files(
-        files, path_to_archive=TEST_DATA, path_to_files=TEST_DATA, arch_name=None, mode='w'
+def archive_files(  # pylint: disable=R0913:too-many-arguments
+        files, path_to_archive=TEST_DATA, path_to_files=TEST_DATA, arch_name=None, mode='w',
+        compression=None, archive_format='zip'
         ):
     """
     Compress files to archive directory.
 
-    Using name of first file in list as archive name.
+    Using name of first file in list as archive name.  compression is a
+    zip_compression preset name, archive_format 'tar.zst' writes a zstd
+    compressed tar file instead of a zip file (Python 3.14+, mode 'w' only).
     """
     arch_name = arch_name or files[0].split('.')[0]
+    if archive_format == 'tar.zst':
+        if not zip_compression.ZSTD_AVAILABLE:
+            raise ValueError('tar.zst archives need Python 3.14 (compression.zstd)')
+        if mode != 'w':
+            raise ValueError(f'Cannot open tar.zst archive with mode "{mode}"')
+        arch_name = f'{path_to_archive}archive/{arch_name}.tar.zst'
+        with tarfile.open(arch_name, 'w:zst', level=zip_compression.ZSTD_LEVEL) as tar_file:
+            for filename in files:
+                target_file = f'{path_to_files}{filename}'
+                tar_file.add(target_file, filename)
+                os.remove(target_file)
+        return
+    if archive_format != 'zip':
+        raise ValueError(f'Unknown archive format "{archive_format}"')
+    compression = zip_compression.get_compression(compression)
     arch_name = f'{path_to_archive}archive/{arch_name}.zip'
     with zipfile.ZipFile(arch_name, mode) as zip_file:
         for filename in files:
             target_file = f'{path_to_files}{filename}'
-            zip_file.write(
-                target_file, filename,
-                compress_type=zipfile.ZIP_DEFLATED)
+            zip_file.write(target_file, filename, **compression.kwargs())
             os.remove(target_file)
 
 
@@ -0,0 +1,110 @@
+"""
+Warm pool of worker processes used by the dispatcher.
+
+Spawning a new Python interpreter for each dispatched file means chardet,
+pymupdf, utilities and the logger are imported again for every job.  Worker
+processes in this pool import the dispatchable programs once, when started,
+and then run jobs as plain function calls to each program's run() function.
+
+A job returns the same exit status the program would have given when run as
+a script, so dispatcher success/archive handling is unchanged, along with the
+resources the job used (see app_modules/job_metrics).
+
+Jobs in the pool run at the same time, so each worker's jobs use only the
+pool's share of the CPUs for their own worker processes (FM_ROW_WORKERS, see
+transforms/row_executor), rather than starting one per CPU each.
+"""
+
+
+import importlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import app_modules.job_metrics as metrics
+import app_modules.utilities as utils
+
+
+PROGRAMS = (  # programs dispatcher.select_program can choose
+    'transforms/transform_file',
+    'transforms/hlap_cnvrt',
+    'pdf_bill_indexing/hlap_pdf_idx',
+    'dupes_sorting/sort_multiples',
+)
+WARM = {}  # imported program modules of this worker process
+START_METHOD = 'forkserver'  # fork is unsafe once watcher threads are running
+ROW_WORKERS_ENV = 'FM_ROW_WORKERS'  # as transforms/row_executor.WORKERS_ENV
+
+
+def module_name(program: str) -> str:
+    """Convert program path (as used on command line) to module name."""
+    return program.replace('/', '.')
+
+
+def cpu_share(jobs: int) -> int:
+    """Worker processes each of jobs run at the same time may use."""
+    return max((os.cpu_count() or 1) // max(jobs, 1), 1)
+
+
+def init_worker(row_workers: int = 1) -> None:
+    """Import dispatchable programs so jobs don't pay the import cost."""
+    os.environ.setdefault(ROW_WORKERS_ENV, str(row_workers))  # unless set for dispatcher
+    for program in PROGRAMS:
+        try:
+            WARM[program] = importlib.import_module(module_name(program))
+        except Exception as err:  # pylint: disable=broad-except
+            # leave for run_job to report (eg missing credentials module)
+            utils.logger.debug('Could not preload "%s": %s', program, err)
+
+
+def call_program(program: str, cname: str, ftype: str, fname: str, watch_dir: str) -> int:
+    """Run program on file in this worker, returning program exit status."""
+    try:
+        module = WARM.get(program) or importlib.import_module(module_name(program))
+        WARM[program] = module
+        return module.run(*utils.nomalize_user_input(cname, fname, ftype, watch_dir)) or 0
+    except SystemExit as ex:
+        return ex.code if isinstance(ex.code, int) else 1
+    except Exception:  # pylint: disable=broad-except
+        utils.logger.info('Error running "%s"', program, exc_info=True)
+        return 1
+
+
+def run_job(program, cname, ftype, fname, watch_dir, records_file=None):  # pylint: disable=R0913:too-many-arguments
+    """Run program on file in this worker, returning exit status & resource usage."""
+    if records_file:
+        os.environ[metrics.RECORDS_ENV] = records_file
+    try:
+        return metrics.measure(call_program, program, cname, ftype, fname, watch_dir)
+    finally:
+        os.environ.pop(metrics.RECORDS_ENV, None)
+
+
+class WorkerPool:
+    """Process pool with dispatchable programs already imported."""
+
+    def __init__(self, workers=None):
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker,
+            initargs=(cpu_share(workers or os.cpu_count() or 1),),
+            mp_context=multiprocessing.get_context(START_METHOD))
+
+    def submit(self, program, cname, ftype, fname, watch_dir, records_file=None):  # pylint: disable=R0913:too-many-arguments
+        """Hand job to pool returning future for (exit status, resource usage)."""
+        return self.executor.submit(
+            run_job, program, cname, ftype, fname, watch_dir, records_file)
+
+    def run(self, program, cname, ftype, fname, watch_dir, records_file=None):  # pylint: disable=R0913:too-many-arguments
+        """Run job in pool and wait for (exit status, resource usage)."""
+        return self.submit(program, cname, ftype, fname, watch_dir, records_file).result()
+
+    def shutdown(self):
+        """Finish outstanding jobs and stop worker processes."""
+        self.executor.shutdown(wait=True)
+
+    # context manager methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
@@ -0,0 +1,174 @@
+"""
+Client XML parsed as it is read, one repeated element (eg account) at a time.
+
+transform_file gives XML transforms an XMLSource, the zipped file's bytes
+(re-opened each time it is read), so the parser reads the file's encoding
+declaration itself and the file is never decoded, split into lines and
+joined again.  Lists of text lines (eg in tests) can be given instead.
+
+Bill extracts are a few header elements (eg BillComments) followed by
+thousands of Accounts/Account elements.  Rather than building the whole
+document as one tree, the source is fed to XMLPullParser FEED_SIZE bytes (or
+characters) at a time and:
+
+- leading_elements gives the header elements found before the accounts
+- iter_elements gives each complete account, removing it from the tree once
+  the next one is read so memory does not grow with the number of accounts
+
+Paths are element tags below the document element, eg ('Accounts', 'Account')
+as ElementTree's findall('Accounts/Account').  Each function parses the
+source from the start, so text lines must be re-iterable (a list or
+line_stream.LineStream).  root_tag tells which kind of file it is (eg
+'BillExtract' bills or late pay notices) and parse_root builds the whole
+tree for transforms that need it.
+
+Parsing uses ElementTree unless FM_XML_BACKEND=lxml (if lxml is not
+installed a warning is logged and ElementTree used, so every transform still
+runs).
+lxml builds elements with the same find/findtext/iter/attrib interface used
+by the transforms (set to drop comments & processing instructions as
+ElementTree does), so transforms give the same output with either.
+tests/x_bench_xml_backends.py compares them (lxml was no faster overall on
+the test files, its elements are slower to use from Python).
+"""
+
+
+import io
+import os
+import xml.etree.ElementTree
+from functools import partial
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None  # pylint: disable=C0103:invalid-name
+
+
+FEED_SIZE = 1 << 16  # bytes/characters of source given to parser at a time
+BACKEND_ENV = 'FM_XML_BACKEND'
+BACKENDS = ('etree', 'lxml')
+LXML_OPTIONS = {'remove_comments': True, 'remove_pis': True, 'huge_tree': True}
+BACKEND = None  # name of backend in use
+et = None  # pylint: disable=C0103:invalid-name  # its etree module
+
+
+def use_backend(name=None):
+    """Parse with backend name (default FM_XML_BACKEND or etree), etree if lxml not installed."""
+    global BACKEND, et  # pylint: disable=W0603:global-statement
+    name = name or os.environ.get(BACKEND_ENV) or 'etree'
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown XML backend "{name}", use one of {BACKENDS}')
+    if name == 'lxml' and lxml_etree is None:
+        import app_modules.utilities as utils  # pylint: disable=C0415:import-outside-toplevel  # opens log file
+        utils.logger.warning('lxml XML backend is not installed, using etree')
+        name = 'etree'
+    BACKEND, et = name, lxml_etree if name == 'lxml' else xml.etree.ElementTree
+    return BACKEND
+
+
+def new_parser(pull=False):
+    """Backend's parser, pull parser reporting start & end events."""
+    options = LXML_OPTIONS if BACKEND == 'lxml' else {}
+    if pull:
+        return et.XMLPullParser(events=('start', 'end'), **options)
+    return et.XMLParser(**options)
+
+
+class XMLSource:
+    """Binary XML file opened (again) by opener() each time it is read."""
+
+    def __init__(self, opener):
+        self.opener = opener
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Source of XML document already in memory."""
+        return cls(partial(io.BytesIO, data))
+
+    def open(self):
+        """New binary file object for XML."""
+        return self.opener()
+
+
+def as_path(path):
+    """Tuple of tags for path given as 'Accounts/Account'."""
+    return tuple(path.split('/')) if isinstance(path, str) else tuple(path)
+
+
+def source_chunks(source):
+    """XMLSource bytes or text lines joined into FEED_SIZE pieces for parser."""
+    if isinstance(source, XMLSource):
+        with source.open() as stream:
+            while data := stream.read(FEED_SIZE):
+                yield data
+        return
+    pending, size = [], 0
+    for line in source:
+        pending.append(line)
+        size += len(line) + 1
+        if size >= FEED_SIZE:
+            yield '\n'.join(pending) + '\n'
+            pending, size = [], 0
+    yield '\n'.join(pending)
+
+
+def pull_events(source):
+    """Parse source yielding (event, element, path below document element)."""
+    parser = new_parser(pull=True)
+    path = []
+
+    def read_events():
+        for event, element in parser.read_events():
+            if event == 'start':
+                path.append(element.tag)
+            yield event, element, tuple(path[1:])
+            if event == 'end':
+                path.pop()
+
+    for data in source_chunks(source):
+        parser.feed(data)
+        yield from read_events()
+    parser.close()
+    yield from read_events()
+
+
+def root_tag(source):
+    """Tag of document element (only reading up to it)."""
+    for _, element, _ in pull_events(source):
+        return element.tag
+    return None
+
+
+def parse_root(source):
+    """Document element of whole tree."""
+    parser = new_parser()
+    for data in source_chunks(source):
+        parser.feed(data)
+    return parser.close()
+
+
+def leading_elements(source, path, before):
+    """Elements at path found before first element at path before starts."""
+    path, before = as_path(path), as_path(before)
+    found = []
+    for event, element, at in pull_events(source):
+        if event == 'end' and at == path:
+            found.append(element)
+        elif event == 'start' and at == before:
+            break
+    return found
+
+
+def iter_elements(source, path):
+    """Complete elements at path one at a time, removed once the next is read."""
+    path = as_path(path)
+    parent = None
+    for event, element, at in pull_events(source):
+        if event == 'start' and at == path[:-1]:
+            parent = element
+        elif event == 'end' and at == path:
+            yield element
+            del parent[:]  # processed elements (and anything before them)
+
+
+use_backend()
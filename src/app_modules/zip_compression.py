@@ -0,0 +1,74 @@
+"""
+Compression method & level used when writing zip files.
+
+Presets are chosen by name, per call (eg archive_files(compression='stored'))
+or per client with a COMPRESSION constant in the client's transform module
+(eg charlevoix's large fixed-length outputs use 'fast').  Call sites that are
+not given a preset use DEFAULT, which is zipfile's usual deflate level.
+
+- fast: deflate level 1, much quicker for little size increase
+- small: deflate level 9, slowest deflate for long kept files
+- stored: no compression, for local only intermediate files
+- bzip2/lzma: better ratios but much slower and not opened by every tool
+
+Long-term archives can also be written as .tar.zst with Python 3.14's
+compression.zstd (see utilities.archive_files); ZSTD_AVAILABLE tells if it
+can be used.  tests/x_bench_compression.py compares the options.
+"""
+
+
+import zipfile
+from dataclasses import dataclass
+
+try:
+    from compression import zstd  # Python 3.14+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstd = None  # pylint: disable=C0103:invalid-name
+    ZSTD_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class Compression:
+    """Zip compression method and level (None = method's default)."""
+    method: int = zipfile.ZIP_DEFLATED
+    level: int | None = None
+
+    def kwargs(self):
+        """Arguments for ZipFile.write/writestr."""
+        return {'compress_type': self.method, 'compresslevel': self.level}
+
+    def apply(self, zinfo):
+        """Set compression of zip entry (for ZipFile.open(zinfo, 'w'))."""
+        zinfo.compress_type = self.method
+        zinfo.compress_level = self.level
+        return zinfo
+
+
+PRESETS = {
+    'default': Compression(),
+    'fast': Compression(zipfile.ZIP_DEFLATED, 1),
+    'small': Compression(zipfile.ZIP_DEFLATED, 9),
+    'stored': Compression(zipfile.ZIP_STORED),
+    'bzip2': Compression(zipfile.ZIP_BZIP2, 9),
+    'lzma': Compression(zipfile.ZIP_LZMA),
+}
+DEFAULT = PRESETS['default']
+ZSTD_LEVEL = 10  # .tar.zst archive level (zstd default is 3, max 22)
+
+
+def get_compression(preset=None):
+    """Compression for preset name (or Compression given), default if None."""
+    if preset is None:
+        return DEFAULT
+    if isinstance(preset, Compression):
+        return preset
+    try:
+        return PRESETS[preset]
+    except KeyError:
+        raise ValueError(f'Unknown compression "{preset}", use one of {list(PRESETS)}') from None
+
+
+def client_compression(custom):
+    """Compression chosen by client transform module (COMPRESSION constant)."""
+    return get_compression(getattr(custom, 'COMPRESSION', None))
@@ -12,7 +12,7 @@ import operator
 import os
 import sys
 
-from sort_parameters import ORGS
+from dupes_sorting.sort_parameters import ORGS
 import app_modules.utilities as utils
 
 REGISTERS = {}
@@ -230,6 +230,7 @@ def main(file2sort, city_name):
     count = 0
     blank_lines = 0
 
+    REGISTERS.clear()  # may be a warm worker process that sorted before
     city_params = get_parameters(city_name)
     sorted_file, delim = prepare_input(file2sort, city_params)
     for line in sorted_file:
@@ -256,18 +257,21 @@ def main(file2sort, city_name):
     return 1
 
 
-if __name__ == '__main__':
-    CITY_NAME, FILE_NAME, FILE_TYPE, NEW_FNAME, FILE_PATH = utils.parse_user_input()
-    # print(f'{CITY_NAME=}, {FILE_NAME=}, {FILE_TYPE=}, {NEW_FNAME=}, {FILE_PATH=}'); exit()
-
-    ABS_FILENAME = FILE_NAME if FILE_NAME[0] == '/' else f'{utils.FILE_PATH}{FILE_NAME}'
+def run(city_name, file_name, file_type, new_fname, file_path):  # pylint: disable=W0613:unused-argument
+    """Sort given dupes file, returning exit status."""
+    # print(f'{city_name=}, {file_name=}, {file_type=}, {new_fname=}, {file_path=}'); exit()
+    abs_filename = file_name if file_name[0] == '/' else f'{file_path}{file_name}'
 
-    RESULT = 1
-    if CITY_NAME not in ORGS:
-        print_register_help(CITY_NAME)
-    elif not os.path.exists(ABS_FILENAME):
-        utils.logger.info('File "%s" not found.', ABS_FILENAME)
+    result = 1
+    if city_name not in ORGS:
+        print_register_help(city_name)
+    elif not os.path.exists(abs_filename):
+        utils.logger.info('File "%s" not found.', abs_filename)
     else:
-        RESULT = main(ABS_FILENAME, CITY_NAME)
+        result = main(abs_filename, city_name)
     utils.logger.info('*' * 80)
-    sys.exit(RESULT)
+    return result
+
+
+if __name__ == '__main__':
+    sys.exit(run(*utils.parse_user_input()))
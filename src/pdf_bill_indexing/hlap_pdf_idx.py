@@ -128,11 +128,15 @@ def main(input_fp, input_fn=None):
     utils.logger.info('Process completed.')
 
 
-if __name__ == '__main__':
-    CITY_NAME, FILE_NAME, FILE_TYPE, NEW_FNAME, FILE_PATH = utils.parse_user_input()
+def run(city_name, file_name, file_type, new_fname, file_path):  # pylint: disable=W0613:unused-argument
+    """Index given HLAP PDF bill file, returning exit status."""
     # must have source filename, fsmonitor usually supplies this
-    if FILE_NAME:
-        main(FILE_PATH, NEW_FNAME)
-        # put_files_to_sftp(FILE_NAME)
-    else:
-        sys.exit(1)
+    if not file_name:
+        return 1
+    main(file_path, new_fname)
+    # put_files_to_sftp(file_name)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(run(*utils.parse_user_input()))
@@ -6,8 +6,12 @@ Receives csv file handle (for transformed data) and source text to transform
 
 
 from decimal import Decimal as dec
-import csv
 import transforms.client_transforms.ancillaries.charlevoix_fields as fields
+from app_modules.fixed_width import compile_columns
+from transforms.row_executor import FixedRecords, transform_rows
+
+INPUT_KIND = 'fixed-length'
+COMPRESSION = 'fast'  # large outputs, see app_modules/zip_compression
 
 
 # define constants here for code brevity
@@ -27,9 +31,10 @@ START = fields.FIELD_START
 END = fields.FIELD_END
 
 
-def _convert_to_columns(row):
-    """Converts fixed length records to columns for processing."""
-    return [row[x[START]:x[END]].strip() for x in fields.SELECTED]
+# fixed length records' columns (read as arrays if NumPy installed, paperless bypassed)
+# or delimited records' columns for processing
+FIXED_RECORDS = FixedRecords(fields.SELECTED, (PAPERLESS, 'F'))
+_select_columns = compile_columns(fields.INCLUDE)
 
 
 def _massage_data_(row):
@@ -70,28 +75,26 @@ def _massage_data_(row):
     return row
 
 
+def _delimited_row(row):
+    """Output row of delimited record (None if paperless)."""
+    if row[fields.PAPERLESS] != 'F':
+        return None
+    return _massage_data_(_select_columns(row))
+
+
 def transform_data(csv_w, source_text):
     """Output required headings and columns (based on '*' being 1st char in heading)."""
     try:
-        csv_w.writerow(_massage_data_(fields.HEADINGS))
+        csv_w.writerow(_massage_data_(list(fields.HEADINGS)))  # copy, massaged in place
 
         # test for delimited record, otherwise fixed length records
+        # (rows transformed in worker processes for large files)
         if source_text[0].count(',')>1000 or source_text[0].count('\t')>1000:
-            records = csv.reader(source_text, delimiter='\t' if '\t' in source_text[0] else ',')
-            paperless_field = fields.PAPERLESS
+            count = transform_rows(
+                csv_w, source_text, _delimited_row,
+                {'delimiter': '\t' if '\t' in source_text[0] else ','})
         else:
-            records = source_text
-            paperless_field = fields.FIELDS[fields.PAPERLESS][START]
-
-        count = 0
-        for row in records:
-            if row and row[paperless_field] == 'F':  # bypass empty row & paperless
-                if paperless_field == fields.PAPERLESS:  # delimited file
-                    clean_row = [x.strip() for idx, x in enumerate(row) if idx in fields.INCLUDE]
-                else:
-                    clean_row = _convert_to_columns(row)
-                csv_w.writerow(_massage_data_(clean_row))
-                count += 1
+            count = transform_rows(csv_w, source_text, _massage_data_, fixed=FIXED_RECORDS)
     except Exception as err:
         raise err
 
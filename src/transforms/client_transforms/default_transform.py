@@ -6,6 +6,8 @@ Receives csv file handle (for transformed data) and source text to transform
 
 import csv
 
+INPUT_KIND = 'csv'
+
 
 def transform_data(csv_w, source_text):
     """Assumes a csv source that is written unchanged to output file."""
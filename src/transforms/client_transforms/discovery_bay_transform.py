@@ -5,10 +5,12 @@ Beware! Changes here may effect multiple clients.
 
 
 from datetime import datetime
-from app_modules import csv_io
+from app_modules import csv_io, xml_stream
 import transforms.client_transforms.tyler_tech_xml as ttx
 import transforms.client_transforms.ancillaries.discovery_bay_fields as dbf
 
+INPUT_KIND = 'xml'
+
 
 def add_global_messages(bill, source):
     """Add maximum of four BillComments from XML file to all records."""
@@ -138,7 +140,7 @@ def transform_data(csv_w, source_text):
     """Convert Roosevelt source XML into required format."""
     count = 0
     # if 'bill' in csv_w.name or 'usbx' in csv_w.name:
-    if 'BillExtract' in source_text[1]:
+    if xml_stream.root_tag(source_text) == 'BillExtract':
         # bills extraction
         source = ttx.SourceXML(
             source_text, dbf.bill_extract, active_only=dbf.ACTIVE_ONLY,
@@ -21,15 +21,20 @@ are more than ten services they will be missed, so if Draper adds services
 without telling us, there may be problems.
 
 That's all I can see at the moment.  It is possible is missed something.
+
+The XML is read one account at a time (app_modules/xml_stream), each
+account's child elements found in one pass over them.
 """
 
 
 import decimal as dec
 import itertools
-import xml.etree.ElementTree as et  # noqa (camelcase)
-from io import StringIO
 
 import transforms.client_transforms.ancillaries.draper_fields as df
+from app_modules import xml_stream
+from app_modules.money import format_cents, to_cents
+
+INPUT_KIND = 'xml'
 
 
 TESTING = False
@@ -60,16 +65,26 @@ def _get_billing_details(acc_rec):
     return billing_details
 
 
-def _get_consumption_history(bill):
+def _account_parts(bill):
+    """Account's child elements by tag (first of each tag) and its services."""
+    parts, services = {}, []
+    for child in bill:
+        if child.tag == 'Service':
+            services.append(child)
+        parts.setdefault(child.tag, child)
+    return parts, services
+
+
+def _get_consumption_history(services):
     """Build consumption history from XML data."""
     # get prior per usages (here to stay in scope with multi services)
     consumption_hist = None
-    service = bill.find('Service')
-    if service and service.attrib['Ty'] == 'Meter':
+    service = services[0] if services else None
+    if service is not None and len(service) and service.attrib['Ty'] == 'Meter':
         consumption_hist = service.find('Cons_hist')
 
-    if consumption_hist:
-        return _extract_consumption(consumption_hist, bill)
+    if consumption_hist is not None and len(consumption_hist):
+        return _extract_consumption(consumption_hist, service)
     return [''] * 3, None, 1, 13
 
 
@@ -103,7 +118,7 @@ def _get_service_details(service):
         for detail in details.iter('ServiceDetail'):
             detail_desc = detail.find('BillCodeDescription').text
             detail_amt = str_to_amt(detail.find('Amount').text)
-            if detail_desc not in df.COMBINE_SERVICES and detail_amt != 0.00:
+            if detail_desc not in df.COMBINE_SERVICES and detail_amt != 0:
                 service_details.extend([
                     detail_desc
                     .replace('/', ' / ')
@@ -117,7 +132,7 @@ def _get_service_details(service):
     return (service_no, combined_total, service_details)
 
 
-def _extract_consumption(consumption_hist, bill):
+def _extract_consumption(consumption_hist, service):
     period = int(consumption_hist.attrib['Cons_prd'].split('/')[0])
     cons_hist = [
         year.attrib[month]
@@ -128,7 +143,7 @@ def _extract_consumption(consumption_hist, bill):
     start = end - 12
 
     # output current meter reads / useage
-    curr_period = bill.find('Service').find('Serv_info').attrib
+    curr_period = service.find('Serv_info').attrib
     return [
         remove_leading_zeros(curr_period['Pr_read']),
         remove_leading_zeros(curr_period['Cr_read']),
@@ -138,7 +153,7 @@ def _extract_consumption(consumption_hist, bill):
 
 def _pack_equal_pay_reserve(out_rec, acc_data):
     _ = str_to_amt(acc_data['bill_detail']['Amp_resv_total'])
-    if _ != 0.00:
+    if _ != 0:
         out_rec.extend(['Equal Pay Reserve Amount', amount_to_str(_)])
     else:
         out_rec.extend(['']*2)
@@ -164,11 +179,11 @@ def _pack_prior_period_usages(out_rec, cons_hist, water_serv, start, end):
             out_rec.extend(['']*2)
 
 
-def _pack_service_charges(bill, out_rec, acc_data):
+def _pack_service_charges(parts, services, out_rec, acc_data):
     # output account service charges
     water_serv = False
     service_no = combined_total = 0
-    for service in bill.iter('Service'):
+    for service in services:
         if service.attrib['S_des'] == 'WATER':
             water_serv = True
         num_of_services, services_total, _ = _get_service_details(service)
@@ -184,20 +199,18 @@ def _pack_service_charges(bill, out_rec, acc_data):
     # standard charges
     for charge in df.std_charges:
         _ = str_to_amt(acc_data[charge[0]][charge[1]])
-        if _ != 0.00:
+        if _ != 0:
             out_rec.extend([charge[2], amount_to_str(_)])
             service_no += 1
 
     # extract contract charges
-    try:
-        contract = bill.find('Contracts/Contract').attrib
-        contract_amt = contract['Curr_bal']
-    except AttributeError:
-        contract_amt = '0'
+    contracts = parts.get('Contracts')
+    contract = None if contracts is None else contracts.find('Contract')
+    contract_amt = '0' if contract is None else contract.attrib['Curr_bal']
     if contract_amt != '0':
         out_rec.extend([
-            contract['Desc'].title(),
-            clean_amount(contract['Curr_bal'])
+            contract.attrib['Desc'].title(),
+            clean_amount(contract_amt)
             ])
         service_no += 1
 
@@ -209,7 +222,7 @@ def _pack_service_charges(bill, out_rec, acc_data):
 
 def _pack_shutoff_message(out_rec, acc_data):
     # if 'arrear' in 'Acct_Det' has non-zero value
-    if str_to_amt(acc_data['acct_detail']['arrear']) > 0.00:
+    if str_to_amt(acc_data['acct_detail']['arrear']) > 0:
         out_rec.extend(
             df.shutoff_message[line]
             for line in range(df.SHUTOFF_MSGS))
@@ -217,12 +230,12 @@ def _pack_shutoff_message(out_rec, acc_data):
         out_rec.append('')
 
 
-def _set_account_details(bill):
+def _set_account_details(bill, parts):
     """Return list of account details (number, address etc)."""
     return [('account', bill.attrib),
-            ('addr_info', bill.find('Address_info').attrib),
-            ('bill_detail', bill.find('Bill_det').attrib),
-            ('acct_detail', bill.find('Acct_det').attrib)]
+            ('addr_info', parts['Address_info'].attrib),
+            ('bill_detail', parts['Bill_det'].attrib),
+            ('acct_detail', parts['Acct_det'].attrib)]
 
 
 def _set_account_flags(out_rec, acc_data):
@@ -252,19 +265,14 @@ def _set_global_elements(message):
 
 
 def str_to_amt(amount):
-    """Convert strings to decimal amount."""
-    # if trailing sign shift minus sign for Decimal conversion
-    amount = f'-{amount[:-1]}' if amount[-1] == '-' else amount
-    return dec.Decimal(amount)
+    """Convert strings (maybe trailing minus sign) to amount in cents."""
+    return to_cents(amount)
 
 
 def amount_to_str(amount):
-    """Format decimal amount as output string."""
-    if TESTING:
-        neg_sign = '-' if amount < 0 else ' '  # needed for balance formulii
-    else:
-        neg_sign = df.NEG_SIGN if amount < 0 else ' ' * len(df.NEG_SIGN)
-    return f'{abs(dec.Decimal(amount)):0.2f}{neg_sign}'
+    """Format amount in cents as output string."""
+    # minus sign needed for balance formulii when testing
+    return format_cents(amount, '-' if TESTING else df.NEG_SIGN)
 
 
 def clean_amount(amount):
@@ -280,22 +288,22 @@ def remove_leading_zeros(number):
 
 def transform_data(csv_w, source_text):
     """Transform XML file into CSV file."""
-    bills = et.ElementTree(file=StringIO('\n'.join(source_text))).getroot()
     csv_w.writerow(_get_headings())
     line_no = 2 if TESTING else None  # used in formula for totals  noqa
-    acc_data = {'everyone': _set_global_elements(
-        bills.findall('BillComments/BillComment'))
+    acc_data = {'everyone': _set_global_elements(xml_stream.leading_elements(
+        source_text, 'BillComments/BillComment', 'Accounts'))
                }
 
     count = 0
-    for bill in bills.iterfind('Accounts/Account'):
-        acc_data |= _set_account_details(bill)
+    for bill in xml_stream.iter_elements(source_text, 'Accounts/Account'):
+        parts, services = _account_parts(bill)
+        acc_data |= _set_account_details(bill, parts)
         out_rec = _get_billing_details(acc_data)
 
-        history, cons_hist, start, end = _get_consumption_history(bill)
+        history, cons_hist, start, end = _get_consumption_history(services)
         out_rec.extend(history)
 
-        water_serv = _pack_service_charges(bill, out_rec, acc_data)
+        water_serv = _pack_service_charges(parts, services, out_rec, acc_data)
         _append_account_balance(out_rec, acc_data)
         _set_account_flags(out_rec, acc_data)
         _pack_prior_period_usages(out_rec, cons_hist, water_serv, start, end)
@@ -2,7 +2,13 @@
 
 
 import csv
-import decimal
+from functools import partial
+
+from app_modules.column_plan import BLANK, INTEGER, ZERO_TO_BLANK, compile_plan, merge_operations
+from app_modules.money import format_cents, to_cents
+from transforms.row_executor import transform_rows
+
+INPUT_KIND = 'csv'
 
 
 ACC_NUM = 0
@@ -35,50 +41,33 @@ METER_DATA_COLS = (
     )
 
 
-def blank_unused_cols(row):
-    """Modify column contents for unused cols."""
-    return ['' if i in COLS_TO_BLANK else x for i, x in enumerate(row)]
-
+# operations on each column after the row's own fields are set (one pass),
+# amounts of 0.00 (in any column) blanked
+_apply_column_plan = compile_plan(merge_operations(
+    (range(CURR_USAGE_COLS[0], CURR_USAGE_COLS[1] + 1), INTEGER),
+    (range(HIST_USAGE_COLS[0], HIST_USAGE_COLS[1] + 1), INTEGER),
+    (COLS_TO_BLANK, BLANK),
+    (METER_DATA_COLS, ZERO_TO_BLANK),  # zero meter read
+    ), blank_values=('0.00',))
 
-def blank_zero_amounts(row):
-    """Modify column contents for zero amounts."""
-    return ['' if x == '0.00' else x for x in row]
 
+def transform_row(row, col_count):
+    """Eagle Mtn source row (of file with col_count columns) in required format."""
+    if col_count > 209:
+        # skip extra cols in new file format (2021-03)
+        row = row[:52] + row[55:]
+    past_due_amt = to_cents(row[TOTAL_BAL]) - to_cents(row[CURR_BILL])
 
-def blank_zero_meters(row):
-    """Modify column contents for zero meter read."""
-    return ['' if i in METER_DATA_COLS and x == '0' else x
-            for i, x in enumerate(row)]
+    row[ACC_NUM] = f'{int(row[ACC_NUM]):06d}'  #.format(int(row[ACC_NUM]))
+    row[SEQ_NUM] = f'{int(row[SEQ_NUM]):03d}'  #.format(int(row[SEQ_NUM]))
+    row[PAY_AMT] = f'{row[PAY_AMT]}CR' if row[PAY_AMT] > '0' else ''
+    row[NEW_AMT_POS] = format_cents(max(past_due_amt, 0), '', pad=False)
+    return _apply_column_plan(row)
 
 
 def transform_data(csv_w, source_text):
     """Convert Eagle Mtn source CSV into required format."""
-    csv_r = csv.reader(source_text)
-    col_count = len(next(csv_r))  # read 1st record & count cols
-
-    csv_r = csv.reader(source_text)  # reset to beg of file to process file
-    count = 0
-    for row in csv_r:
-        if row:  # bypass empty list entry
-            if col_count > 209:
-                # skip extra cols in new file format (2021-03)
-                row = row[:52] + row[55:]
-            past_due_amt = decimal.Decimal(row[TOTAL_BAL])\
-                - decimal.Decimal(row[CURR_BILL])
-
-            row[ACC_NUM] = f'{int(row[ACC_NUM]):06d}'  #.format(int(row[ACC_NUM]))
-            row[SEQ_NUM] = f'{int(row[SEQ_NUM]):03d}'  #.format(int(row[SEQ_NUM]))
-            row[PAY_AMT] = f'{row[PAY_AMT]}CR' if row[PAY_AMT] > '0' else ''
-            row[NEW_AMT_POS] = f'{max(past_due_amt, 0):9.2f}'.strip()
-            for col in range(CURR_USAGE_COLS[0], CURR_USAGE_COLS[1] + 1):
-                if row[col]:
-                    row[col] = f'{int(float(row[col])):d}'  #.format(int(float(row[col])))
-            for col in range(HIST_USAGE_COLS[0], HIST_USAGE_COLS[1] + 1):
-                if row[col]:
-                    row[col] = f'{int(float(row[col])):d}'  #.format(int(float(row[col])))
-            row = blank_unused_cols(row)
-            row = blank_zero_amounts(row)
-            row = blank_zero_meters(row)
-            csv_w.writerow(row)
-            count += 1
-    return count
+    first_row = next(csv.reader([source_text[0]]))
+    col_count = len(first_row)  # read 1st record & count cols
+    # rows transformed in worker processes for large files
+    return transform_rows(csv_w, source_text, partial(transform_row, col_count=col_count), {})
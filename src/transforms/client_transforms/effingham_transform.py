@@ -6,11 +6,12 @@ Uses ElementTree xpath technique for cleaner code (compared to dict calls).
 """
 
 
-import xml.etree.ElementTree as et  # noqa (camelcase)
 from decimal import Decimal
-from io import StringIO
 
 import transforms.client_transforms.ancillaries.effingham_fields as ef
+from app_modules import xml_stream
+
+INPUT_KIND = 'xml'
 
 
 MAX_SERVS = 8
@@ -61,7 +62,7 @@ def account_meters(bill, out_rec):
             break
         ctext = charge.findtext
         meter = charge.find('METER_DETAIL')
-        if meter:
+        if meter is not None and len(meter):  # (element truth value deprecated)
             mtext = meter.findtext
             out_rec.extend([
                 mtext('MTR_NO'),
@@ -191,8 +192,7 @@ def transform_data(csv_w, source_text):
     """Transform XML file into CSV file."""
     count = 0
     try:
-        eff_accts = et.ElementTree(
-            file=StringIO('\n'.join(source_text))).getroot()
+        eff_accts = xml_stream.parse_root(source_text)
         bills = eff_accts.tag == 'MUNIS_BILL_PRINT_EXPORT'
         csv_w.writerow(ef.BILL_HEADINGS if bills else ef.DELQ_HEADINGS)
 
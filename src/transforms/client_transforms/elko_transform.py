@@ -6,10 +6,10 @@ Receives csv file handle (for transformed data) and source text to transform
 """
 
 
-import xml.etree.ElementTree as et
-from io import StringIO  # Py3
-
 import transforms.client_transforms.ancillaries.elko_fields as ef
+from app_modules import xml_stream
+
+INPUT_KIND = 'xml'
 
 
 def to_currency(number):
@@ -36,8 +36,7 @@ def get_headings():
 
 def transform_data(csv_w, source_text):
     """Transform XML file into CSV file."""
-    fname = StringIO('\n'.join(source_text))
-    bills = et.ElementTree(file=fname).getroot()
+    bills = xml_stream.parse_root(source_text)
     csv_w.writerow(get_headings())
 
     # get billing messages
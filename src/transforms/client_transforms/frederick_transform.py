@@ -1,10 +1,12 @@
 """Transform TylerTech XML for Frederick CO."""
 
 
-from app_modules import csv_io
+from app_modules import csv_io, xml_stream
 import transforms.client_transforms.tyler_tech_xml as ttx
 import transforms.client_transforms.ancillaries.frederick_fields as ff
 
+INPUT_KIND = 'xml'
+
 
 def add_global_messages(bill, source):
     """Add maximum of four BillComments from XML file to all records."""
@@ -103,7 +105,7 @@ def transform_data(csv_w, source_text):
     """Convert Frederick source XML into required format."""
     count = 0
     # if 'bill' in csv_w.name or 'usbx' in csv_w.name:
-    if 'BillExtract' in source_text[1]:
+    if xml_stream.root_tag(source_text) == 'BillExtract':
         # bills extraction
         source = ttx.SourceXML(
             source_text, ff.bill_extract, active_only=ff.ACTIVE_ONLY,
@@ -10,6 +10,8 @@ import app_modules.utilities as utils
 
 import transforms.client_transforms.ancillaries.lake_point_fields as lpf
 
+INPUT_KIND = 'multi-line csv'
+
 coln = utils.convert_col_letter_to_number
 MAX_TRANSACTIONS = 10
 SERV_COLS = len(lpf.BODY)
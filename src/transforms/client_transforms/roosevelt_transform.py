@@ -1,25 +1,17 @@
 """Transform TylerTech XML for Roosevelt UT."""
 
 
-import decimal as dec
-
-from app_modules import csv_io
+from app_modules import csv_io, xml_stream
+from app_modules.money import format_cents, to_cents
 from transforms.client_transforms import tyler_tech_xml as ttx
 from transforms.client_transforms.ancillaries import roosevelt_fields as rf
 
-
-def _fix_neg(amount):
-    return '-' + amount[:-1] if amount.endswith('-') else amount
+INPUT_KIND = 'xml'
 
 
-def _format_currency(value):
-    """Format extracted data into suitable currency field."""
-    value = str(value)
-    value = value[1:] + '-' if value.startswith('-') else value
-    value = value.replace('-', 'CR').lstrip('0')
-    value = ('0.00' if value == '.00'
-             else (f'0{value}' if value[0] == '.' else value))
-    return value
+def _format_currency(cents):
+    """Format amount in cents into suitable currency field."""
+    return format_cents(cents, 'CR', pad=False)
 
 
 def add_global_messages(bill, source):
@@ -87,14 +79,18 @@ def format_data(bill):
     return new_bill
 
 
+def _negative_zero(amount):
+    """Check if amount is zero written with a minus (eg '00000000.00-')."""
+    return '-' in amount and not to_cents(amount)
+
+
 def post_processing(bill):
     """Calculate and record Past Due amount."""
-    bill['past_due_amt'] = (_format_currency(
-        dec.Decimal(_fix_neg(bill['prevbalamt'])) +
-        dec.Decimal(_fix_neg(bill['curperamt'])) +
-        dec.Decimal(_fix_neg(bill['adj_amt'])) +
-        dec.Decimal(_fix_neg(bill['pen_amt']))
-    ))
+    amounts = [bill['prevbalamt'], bill['curperamt'], bill['adj_amt'], bill['pen_amt']]
+    cents = sum(map(to_cents, amounts))
+    # Decimal sum of only negative zeros kept the minus, clients get '0.00CR' as they did
+    bill['past_due_amt'] = '0.00CR' if all(map(_negative_zero, amounts)) \
+        else _format_currency(cents)
     return bill
 
 
@@ -141,7 +137,7 @@ def transform_data(csv_w, source_text):
     """Convert Roosevelt source XML into required format."""
     count = 0
     # if 'bill' in csv_w.name or 'usbx' in csv_w.name:
-    if 'BillExtract' in source_text[1]:
+    if xml_stream.root_tag(source_text) == 'BillExtract':
         # bills extraction
         source = ttx.SourceXML(
             source_text, rf.bill_extract, active_only=rf.ACTIVE_ONLY,
@@ -3,15 +3,67 @@ Read 'Tyler Tech Software' XML file to conversion to CSV.
 
 Tyler Tech absolutely inflexible on XML output.  Using module
 approach in case future citites change to Tyler Tech.
+
+The XML is parsed as it is read (app_modules/xml_stream) rather than built
+into one tree, so memory use does not grow with the number of accounts.
+BillComments (before the accounts) are read when SourceXML is created,
+traverse_xml then parses the source again building one account at a time
+and clearing each once its data is extracted.
+
+Each element's data is found with an ExtractPlan, the xml_extract field map
+compiled to lookups by attribute name and (cached per) element tag, so only
+the attributes an element has are checked against the map.
 """
 
-import xml.etree.ElementTree as et  # noqa
-from io import StringIO
+from functools import cache
+
+from app_modules import xml_stream
 
 
 months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
 CONS_KEY = 'Cons_hist'
+REVERSED_MONTHS = months[::-1]
+
+
+class ExtractPlan:
+    """xml_extract field map compiled to lookups by attribute and tag."""
+
+    def __init__(self, fields):
+        self.fields = fields  # (attrib_req, csv_col) in xml_extract order
+        self.by_attrib = {attrib_req: idx for idx, (attrib_req, _) in enumerate(fields)}
+        self.by_tag = {}
+
+    def tag_fields(self, tag):
+        """Indexes of fields found in tag (non-attribute data), cached per tag."""
+        try:
+            return self.by_tag[tag]
+        except KeyError:
+            found = self.by_tag[tag] = tuple(
+                idx for idx, (attrib_req, _) in enumerate(self.fields) if attrib_req in tag)
+            return found
+
+    def matches(self, element):
+        """(csv_col, attrib_req, data) for element in xml_extract order."""
+        attribs = element.attrib
+        by_attrib = self.by_attrib
+        found = [by_attrib[name] for name in attribs if name in by_attrib]
+        tag_fields = self.tag_fields(element.tag)
+        if tag_fields:
+            found.extend(idx for idx in tag_fields if self.fields[idx][0] not in attribs)
+            found.sort()
+        elif len(found) > 1:
+            found.sort()
+        for idx in found:
+            attrib_req, csv_col = self.fields[idx]
+            data = attribs[attrib_req] if attrib_req in attribs else element.text
+            yield csv_col, attrib_req, data
+
+
+@cache
+def compile_extract(fields):
+    """ExtractPlan for xml_extract items (compiled once per field map)."""
+    return ExtractPlan(fields)
 
 
 class SourceXML:  # pylint: disable=R0902:too-many-instance-attributes
@@ -28,17 +80,16 @@ class SourceXML:  # pylint: disable=R0902:too-many-instance-attributes
                 ):
         """Init source XML text."""
         self.xml_extract = xml_extract
+        self.plan = compile_extract(tuple(xml_extract.items()))
         self.active_only = active_only
         self.delinqent_accts = delinqent_accts
         self.zero_balance = zero_balance
         self.root = root
+        self.root_path = xml_stream.as_path(root)  # below document element
+        self.source_text = source_text  # lines, read again by traverse_xml
         self.cons_hist = []
         self.csv_cols = {}
-        self.bills = et.ElementTree(
-            file=StringIO('\n'.join(source_text))).getroot()
         self.comments = self.get_global_comments()
-        self.accounts = et.ElementTree(
-            file=StringIO('\n'.join(source_text))).findall(root)
 
     def _pack_data(self, csv_col, attrib_req, data):
         if csv_col.endswith('?'):
@@ -58,36 +109,23 @@ class SourceXML:  # pylint: disable=R0902:too-many-instance-attributes
         """Extract required data from element attributes."""
         if element.tag == 'Year':
             # get consumption history (multi year & perhaps multi meter)
-            for month in months:
-                self.cons_hist.insert(0, element.attrib[month])
-        else:
             attribs = element.attrib
-            for attrib_req, csv_col in self.xml_extract.items():
-                if attrib_req in attribs:
-                    self._pack_data(
-                        csv_col, attrib_req, element.attrib[attrib_req])
-                elif attrib_req in element.tag:
-                    # extract non-attribute data
-                    self._pack_data(csv_col, attrib_req, element.text)
-
-    def get_children(self, parent):
-        """Recursive traversal of XML tree."""
-        for child in parent:
-            self.extract_data(child)
-            self.get_children(child)
+            self.cons_hist[:0] = [attribs[month] for month in REVERSED_MONTHS]
+        else:
+            for csv_col, attrib_req, data in self.plan.matches(element):
+                self._pack_data(csv_col, attrib_req, data)
 
     def get_global_comments(self):
         """Extract file comments and separate multi-line comments."""
-        tmp = [comment.text or '' for comment
-               in self.bills.findall('BillComments/BillComment')]
         comments = []
-        for message in tmp:
-            comments.extend(iter(message.split('\n')))
+        for comment in xml_stream.leading_elements(
+                self.source_text, 'BillComments/BillComment', self.root_path[:1]):
+            comments.extend(iter((comment.text or '').split('\n')))
         return comments
 
     def traverse_xml(self):
         """Traverse XML source extracting data."""
-        for account in self.accounts:
+        for account in xml_stream.iter_elements(self.source_text, self.root_path):
             active_codes = ['Active', 'New', 'Disconnect', 'Suspend']
             if self.delinqent_accts:
                 active_codes.append('Disconnect')
@@ -98,8 +136,8 @@ class SourceXML:  # pylint: disable=R0902:too-many-instance-attributes
                 continue
             self.cons_hist = []
             self.csv_cols = {}
-            self.extract_data(account)  # first element before children
-            self.get_children(account)
+            for element in account.iter():  # account then its descendants
+                self.extract_data(element)
 
             # for bills only - skip zero balance accts, if requested
             if 'Drft_dt' in self.xml_extract \
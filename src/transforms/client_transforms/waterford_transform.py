@@ -8,10 +8,12 @@ Started with unknown number of meters, services etc.
 """
 
 import csv
-import decimal as dec
 
+from app_modules.money import format_cents, to_cents
 from transforms.client_transforms.ancillaries import waterford_fields as wf
 
+INPUT_KIND = 'multi-line csv'
+
 
 class Record():
     """Build and release constructed record from multi-line inputs."""
@@ -32,10 +34,7 @@ class Record():
     @staticmethod
     def cnvt_amount(amount):
         """Convert amounts to decimal format."""
-        amount = dec.Decimal(amount.replace(',', '') or '0')
-        neg_sign = wf.NEG_SIGN if amount < 0 else ' ' * len(wf.NEG_SIGN)
-        # return '{:0,.2f}{}'.format(abs(dec.Decimal(amount)), neg_sign)
-        return f'{abs(dec.Decimal(amount)):0,.2f}{neg_sign}'
+        return format_cents(to_cents(amount), wf.NEG_SIGN, thousands=True)
 
 
     def reset(self):
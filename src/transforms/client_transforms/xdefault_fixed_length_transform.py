@@ -4,6 +4,8 @@ A default implementation of a custom function for transform.py.
 Receives csv file handle (for transformed data) and source text to transform.
 """
 
+INPUT_KIND = 'fixed-length'
+
 
 def transform_data(csv_w, source):
     """Assumes text source that is written unchanged to output file."""
@@ -5,6 +5,9 @@ Receives csv file handle (for transformed data) and source text to transform
 """
 
 import transforms.client_transforms.ancillaries.xfixed_length_fields as fields
+from transforms.row_executor import FixedRecords, transform_rows
+
+INPUT_KIND = 'fixed-length'
 
 
 # # define constants here for code brevity & clarity
@@ -22,9 +25,8 @@ HIST_END = fields.HIST_END_COL
 PAPERLESS = fields.FIELDS[fields.PAPERLESS]
 
 
-def _convert_to_columns(row_in):
-    """Converts fixed length records to columns for processing."""
-    return [row_in[x[START]:x[END]].strip() for x in fields.INCLUDE]
+# fixed length records' columns (read as arrays if NumPy installed, paperless bypassed)
+FIXED_RECORDS = FixedRecords(fields.INCLUDE, (PAPERLESS, 'F'))
 
 
 def _massage_data_(row_in):
@@ -66,15 +68,9 @@ def _massage_data_(row_in):
 def transform_data(csv_w, source_text):
     """Output required headings and columns (based on '*' being 1st char in heading)."""
     try:
-        csv_w.writerow(_massage_data_(fields.HEADINGS))
-        count = 0
-        for row in source_text:
-            # bypass empty row & paperless
-            if row and row[PAPERLESS[START]:PAPERLESS[END]] == 'F':
-                if not isinstance(row, list):
-                    row = _convert_to_columns(row)
-                csv_w.writerow(_massage_data_(row))
-                count += 1
+        csv_w.writerow(_massage_data_(list(fields.HEADINGS)))  # copy, massaged in place
+        # rows transformed in worker processes for large files
+        count = transform_rows(csv_w, source_text, _massage_data_, fixed=FIXED_RECORDS)
     except Exception as err:
         raise err
 
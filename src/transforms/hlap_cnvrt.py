@@ -9,8 +9,11 @@ statements see hlp_pdf_idx).  Both options used each job run.
 
 import csv
 import os
+import sys
 from src.transforms.client_transforms.hlap_transform import Account
 import src.app_modules.utilities as utils
+from src.app_modules.mapped_file import map_path, text_lines
+from src.app_modules.job_metrics import count_records
 
 
 DEBUG = False
@@ -21,8 +24,9 @@ EOR_REQUIRED = True
 def transform_data(dest_file, src_file, print_all):
     """Extract data from individual lines of input file."""
     total_bills = printed_bills = deleted_bills = 0
-    with open(src_file, encoding='utf8') as hpl_file:
-        line = hpl_file.readline()
+    with map_path(src_file) as hpl_data:
+        lines = text_lines(hpl_data)
+        line = next(lines, '')
         account = Account(line, BUDGET_BILLING, EOR_REQUIRED)
         if line.startswith('CYCCTL'):
             account.unpack_cycle(line)
@@ -46,7 +50,7 @@ def transform_data(dest_file, src_file, print_all):
                 }
 
             while line:
-                line = hpl_file.readline()
+                line = next(lines, '')
                 line_type = line[:4].strip()
                 xmethod[line_type](line)
                 if line_type == 'ACTT':  # last line of account XML record
@@ -66,21 +70,26 @@ def transform_data(dest_file, src_file, print_all):
         utils.logger.info('Total bills: %d', total_bills)
         utils.logger.info('Printed: %d', printed_bills)
         utils.logger.info('Not printed: %d', deleted_bills)
+        count_records(printed_bills)
 
 
-if __name__ == '__main__':
-    CITY_NAME, FILE_NAME, FILE_TYPE, NEW_FNAME, FILE_PATH = utils.parse_user_input()
-    # print(f'{CITY_NAME=}, {FILE_NAME=}, {FILE_TYPE=}, {NEW_FNAME=}, {FILE_PATH=}'); exit()
-
-    IN_FILE_NAME = f'{FILE_PATH}{NEW_FNAME}'
-    OUT_FILE_NAME = f'{FILE_PATH}{utils.TRANS_PREFIX}{NEW_FNAME}'
-    # print(f'{IN_FILE_NAME=}, {OUT_FILE_NAME=}'); exit()
+def run(city_name, file_name, file_type, new_fname, file_path):  # pylint: disable=W0613:unused-argument
+    """Convert HLAP text file to paper and PDF print files, returning exit status."""
+    in_file_name = f'{file_path}{new_fname}'
+    out_file_name = f'{file_path}{utils.TRANS_PREFIX}{new_fname}'
+    # print(f'{in_file_name=}, {out_file_name=}'); exit()
 
-    if os.path.exists(IN_FILE_NAME):
+    if os.path.exists(in_file_name):
         # convert to paper print file then PDF print file
         transform_data(
-            OUT_FILE_NAME.replace('.', '_PRN.'), IN_FILE_NAME, False)
+            out_file_name.replace('.', '_PRN.'), in_file_name, False)
         transform_data(
-            OUT_FILE_NAME.replace('.', '_PDF.'), IN_FILE_NAME, True)
+            out_file_name.replace('.', '_PDF.'), in_file_name, True)
     else:
-        utils.logger.info('Could not find file "%s"', IN_FILE_NAME)
+        utils.logger.info('Could not find file "%s"', in_file_name)
+    return 0
+
+
+if __name__ == '__main__':
+    # print(f'{utils.parse_user_input()=}'); exit()
+    sys.exit(run(*utils.parse_user_input()))
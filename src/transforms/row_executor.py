@@ -0,0 +1,163 @@
+"""
+Transform a client file's rows in worker processes, a chunk of lines at a time.
+
+Record per line clients (eg charlevoix fixed length & TSV, xfixed, Eagle
+Mountain) transform each row on its own, but transform_data ran them one
+after another on one CPU.  A transform opts in by giving transform_rows a
+pure row function: module level (or a functools.partial of one) so workers
+can import it, taking a parsed row and returning the output row (None to
+leave the row out).
+
+The zipped file's bytes are read CHUNK_SIZE at a time, cut after the last line
+end so each chunk is whole lines, and sent to worker processes that decode,
+split, parse (csv.reader if csv format parameters are given) and transform
+their chunk's rows.  Results are written in input order as they are ready,
+with at most two chunks per worker in progress, so output is the same as
+transforming the rows in turn and memory does not grow with the file.
+
+Files of one chunk (or lists of lines, eg in tests) are transformed in this
+process, as is everything when FM_ROW_WORKERS=1 (transform_file sets it in
+its own worker processes which already use the CPUs) and the dispatcher sets
+it to each job's share of the CPUs when running jobs at the same time (see
+app_modules/worker_pool.cpu_share), otherwise one worker per CPU.  Rows must
+be one per line: a quoted CSV field spanning line ends could be cut between
+chunks.  Empty rows are skipped, as every transform did.
+
+Fixed length clients give FixedRecords (layout & which records wanted)
+rather than parsing lines in the row function, which is then given each
+wanted record's fields.  Records are read with fixed_width.iter_fixed_records,
+as NumPy arrays if numpy_engine() (otherwise line by line), whether in this
+process (from the mapped file) or in workers (each worker's chunk), so the
+NumPy engine is used with any number of workers.  The engine is chosen here
+once per file and given to the workers, which may have been started with
+another FM_FIXED_ENGINE.
+"""
+
+
+import csv
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+
+from app_modules.fixed_width import iter_fixed_records, numpy_engine
+from app_modules.line_stream import CRLF, LineStream
+from app_modules.mapped_file import open_source
+
+
+CHUNK_SIZE = 4 << 20  # bytes of lines transformed by a worker at a time
+WORKERS_ENV = 'FM_ROW_WORKERS'  # worker processes (default one per CPU)
+START_METHOD = 'forkserver'  # as app_modules/worker_pool (which imports utilities)
+
+
+@dataclass(frozen=True)
+class FixedRecords:
+    """Fixed length records' fields (layout) where (field, value) matches."""
+    layout: list  # fields (name, start, end, length) as fixed_width.compile_layout
+    where: tuple  # (field, value) of records wanted
+    use_numpy: bool = None  # default numpy_engine() when file transformed
+
+    def fields(self, source, encoding):
+        """Fields of wanted records in binary stream or view."""
+        return iter_fixed_records(source, self.layout, self.where, encoding, self.use_numpy)
+
+
+def worker_count():
+    """Worker processes to use (1 = transform in this process)."""
+    try:
+        return max(int(os.environ[WORKERS_ENV]), 1)
+    except (KeyError, ValueError):
+        return os.cpu_count() or 1
+
+
+def _transformed(rows, row_function):
+    """Output rows of non empty rows."""
+    for row in rows:
+        if row and (out := row_function(row)) is not None:
+            yield out
+
+
+def transform_chunk(row_function, data, encoding, newline, csv_format=None, fixed=None):  # pylint: disable=R0913:too-many-arguments
+    """Output rows of non empty rows (or fixed records) of chunk of lines (bytes)."""
+    if fixed is not None:
+        return list(_transformed(fixed.fields(data, encoding), row_function))
+    lines = data.decode(encoding).split(newline)
+    rows = csv.reader(lines, **csv_format) if csv_format is not None else lines
+    return list(_transformed(rows, row_function))
+
+
+def line_chunks(source_text, chunk_size):
+    """Chunks of whole lines of LineStream's file as bytes (and line end)."""
+    pending = b''
+    newline = None
+    with source_text.opener() as stream:
+        while data := stream.read(chunk_size):
+            pending += data
+            if newline is None and b'\n' in pending:
+                line_end = pending.index(b'\n')
+                newline = CRLF if pending[line_end - 1:line_end] == b'\r' else '\n'
+            cut = pending.rfind(newline.encode()) if newline else -1
+            if cut >= 0:
+                yield pending[:cut], newline
+                pending = pending[cut + len(newline):]
+    yield pending, newline or '\n'
+
+
+def _in_process(source_text, row_function, csv_format, fixed):
+    """Output rows of source transformed in this process."""
+    if fixed is None:
+        rows = csv.reader(source_text, **csv_format) if csv_format is not None else source_text
+        yield from _transformed(rows, row_function)
+    elif isinstance(source_text, LineStream):
+        with open_source(source_text) as records:  # mapped if file is stored
+            yield from _transformed(fixed.fields(records, source_text.encoding), row_function)
+    else:  # list of lines
+        records = '\n'.join(source_text).encode('utf8')
+        yield from _transformed(fixed.fields(records, 'utf8'), row_function)
+
+
+def _in_workers(chunks, row_function, encoding, csv_format, fixed, workers):  # pylint: disable=R0913:too-many-arguments
+    """Output rows of chunks transformed by worker processes, in chunk order."""
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(START_METHOD)) as executor:
+        pending = []
+        for data, newline in chunks:
+            pending.append(executor.submit(
+                transform_chunk, row_function, data, encoding, newline, csv_format, fixed))
+            if len(pending) >= 2 * workers:
+                yield from pending.pop(0).result()  # re-raises transform error
+        for future in pending:
+            yield from future.result()
+
+
+def transform_rows(csv_w, source_text, row_function, csv_format=None, fixed=None):  # pylint: disable=R0913:too-many-arguments
+    """Write row_function(row) of each non empty row of source, returning rows written.
+
+    csv_format is csv.reader parameters (eg {'delimiter': '\\t'}) if rows are
+    CSV, fixed is FixedRecords if rows are fixed length records' fields,
+    otherwise rows are the lines of text.
+    """
+    if fixed is not None and fixed.use_numpy is None:
+        fixed = replace(fixed, use_numpy=numpy_engine())
+    workers = worker_count()
+    if not isinstance(source_text, LineStream) or workers < 2:
+        rows = _in_process(source_text, row_function, csv_format, fixed)
+    else:
+        chunks = line_chunks(source_text, CHUNK_SIZE)
+        first = next(chunks)
+        second = next(chunks, None)
+        if second is None:  # file of one chunk
+            data, newline = first
+            rows = transform_chunk(
+                row_function, data, source_text.encoding, newline, csv_format, fixed)
+        else:
+            rows = _in_workers(
+                itertools.chain([first, second], chunks), row_function,
+                source_text.encoding, csv_format, fixed, workers)
+    count = 0
+    for row in rows:
+        csv_w.writerow(row)
+        count += 1
+    return count
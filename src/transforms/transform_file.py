@@ -1,23 +1,56 @@
 """
 Read and modify csv files within zip file and return modified zip file.
 
-Used by any city that has <city_name>_transform.py script.  As of May 2016:
+Used by any city that has <city_name>_transform.py script (found using
+transforms/transform_registry).  As of May 2016:
 Draper (we get two zip files, unzip, add XML suffix, zip to one to process)
 Eagle Mountain
 Elko
+
+Zip files with several large files (eg Frederick water, non-water & shutoffs)
+have their files transformed at the same time by worker processes.  Results
+are added to the result zip file, and their log records logged (still
+showing where in the transform they were logged, with any traceback), in the
+original file order so results and log are the same as converting one at a
+time.  Record per line transforms can also spread one large file's rows over
+worker processes (see row_executor), except within these member workers.
+Either way a job uses at most FM_ROW_WORKERS worker processes (its share of
+the CPUs when the dispatcher runs jobs at the same time).
 """
 
 
 import contextlib
 import csv
 import importlib
+import io
+import logging
+import multiprocessing
 import os
 import sys
+import time
 import zipfile
-
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
 import app_modules.utilities as utils
+from app_modules.app_logger import set_caller
+from app_modules.deflated_zip import DeflatedMember, DeflatedWriter, append_deflated
+from app_modules.job_metrics import count_records
+from app_modules.line_stream import LineStream
+from app_modules.mapped_file import map_member
+from app_modules.xml_stream import XMLSource
+from app_modules.zip_compression import DEFAULT, client_compression
+from app_modules.worker_pool import START_METHOD
+from transforms import row_executor
+from transforms.transform_registry import REGISTRY
+
+
+# zipped files are transformed at the same time in worker processes when
+# there is more than one (and more than one CPU) and together they are at
+# least this size (smaller files convert quicker than workers can be started)
+PARALLEL_MIN = 8 << 20
 
 
 
@@ -36,83 +69,193 @@ def remove_surplus_file(filename):
         os.remove(filename)
 
 
-def process_files(in_zip, out_zip, custom, file_path):
-    """Process files within zipped file and write to another zip file."""
-    for zipped_filename in in_zip.namelist():
-        utils.logger.debug('*' * 80)
-        utils.logger.info('Working on "%s"', zipped_filename)
-        byte_stream = in_zip.open(zipped_filename)
+def result_zipinfo(mod_filename, compression=DEFAULT):
+    """Zip entry for transformed data written straight into result zip file."""
+    zinfo = compression.apply(zipfile.ZipInfo(mod_filename, time.localtime()[:6]))
+    zinfo.external_attr = 0o644 << 16  # rw-r--r-- as if written from a file
+    return zinfo
+
+
+def result_filename(zipped_filename):
+    """Name of result for zipped file (make sure it has csv extension)."""
+    zipped_result_filename = f'{Path(zipped_filename).stem}'
+    return f'fxd {zipped_result_filename}.csv'.lower()
+
+
+def member_source(in_zip, zipped_filename, custom):
+    """Encoding and source of zipped file as transform reads it.
+
+    XML transforms are given the zipped file's bytes to parse (the parser
+    reads its encoding declaration), others its lines decoded as read (or
+    its bytes mapped into memory if stored uncompressed).
+    """
+    with in_zip.open(zipped_filename) as byte_stream:
         file_encoding = find_encoding (byte_stream) if zipped_filename.endswith('.xml') else 'utf8'
-        source_text = byte_stream.read().decode(file_encoding).split('\r\n')
-        # make sure new filename has csv extension
-        zipped_result_filename = f'{Path(zipped_filename).stem}'
-        mod_filename = f'fxd {zipped_result_filename}.csv'.lower()
-        tmp_workfile_name = f'{file_path}{mod_filename}'
-        fh_tmp_file = open(tmp_workfile_name, 'w', encoding=file_encoding)
-
-        with fh_tmp_file as csv_out:
-            # because Freedom Mailing output will always be a csv file
-            try:
-                use_csv_dict = custom.ttx
-            except AttributeError:
-                use_csv_dict = False
-            if use_csv_dict:
-                csv_w = fh_tmp_file
-            else:
-                csv_w = csv.writer(
-                    csv_out,
-                    # quoting=csv.QUOTE_ALL,
-                    delimiter='\t',
-                    lineterminator='\n'
-                    )
-            try:
-                count = custom.transform_data(csv_w, source_text)
-            except Exception as err:
-                raise err
-
-        out_zip.write(  # compress transformed data into new zip file
-            tmp_workfile_name, mod_filename, zipfile.ZIP_DEFLATED
+    opener = partial(in_zip.open, zipped_filename)
+    if getattr(custom, 'INPUT_KIND', None) == 'xml':
+        return file_encoding, XMLSource(opener)
+    return file_encoding, LineStream(
+        opener, file_encoding, mapper=partial(map_member, in_zip, zipped_filename))
+
+
+def transform_member(custom, csv_out, source_text):
+    """Transform source into result file, returning number of records created."""
+    # because Freedom Mailing output will always be a csv file
+    try:
+        use_csv_dict = custom.ttx
+    except AttributeError:
+        use_csv_dict = False
+    if use_csv_dict:
+        csv_w = csv_out
+    else:
+        csv_w = csv.writer(
+            csv_out,
+            # quoting=csv.QUOTE_ALL,
+            delimiter='\t',
+            lineterminator='\n'
             )
-        utils.logger.info('Converted "%s"', zipped_filename)
-        if count:
-            utils.logger.info('Created %s CSV data records', count)
-        remove_surplus_file(tmp_workfile_name)
+    try:
+        count = custom.transform_data(csv_w, source_text)
+    except Exception as err:
+        raise err
+    return count
 
 
-if __name__ == '__main__':
-    CITY_NAME, FILE_NAME, FILE_TYPE, NEW_FNAME, FILE_PATH = utils.parse_user_input()
-    # print(f'{CITY_NAME=}, {FILE_NAME=}, {FILE_TYPE=}, {NEW_FNAME=}, {FILE_PATH=}'); exit()
+def log_converted(zipped_filename, count):
+    """Log zipped file conversion (and report records created)."""
+    utils.logger.info('Converted "%s"', zipped_filename)
+    if count:
+        utils.logger.info('Created %s CSV data records', count)
+        count_records(count)
 
-    if 'nothing using partname' in NEW_FNAME:
-        utils.logger.info('%s in %s', NEW_FNAME, FILE_PATH)
-        sys.exit(1)
 
+@dataclass
+class MemberResult:
+    """Zipped file transformed by worker process."""
+    member: DeflatedMember
+    count: int
+    records: list  # LogRecords logged by transform
+    printed: str  # transform's stdout
+
+
+class CapturedLog(logging.Handler):
+    """Keep worker's log records to be logged in order by parent process."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        set_caller(record)  # where logged in worker, not where handled in parent
+        record.msg, record.args = record.getMessage(), None  # args may not pickle
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+def transform_member_worker(zip_name, zipped_filename, module_name, level=None):
+    """Transform zipped file in worker process, returning deflated result."""
+    custom = importlib.import_module(module_name)
+    os.environ[row_executor.WORKERS_ENV] = '1'  # members already use the CPUs
+    root_logger = logging.getLogger()
+    handlers, root_logger.handlers = root_logger.handlers, [CapturedLog()]
+    printed = io.StringIO()
     try:
-        CUSTOM = importlib.import_module(f'{utils.TRANSFORM_MODULES}{CITY_NAME}_transform')
-    except ModuleNotFoundError:
-        utils.logger.info('No "%s" transform module', CITY_NAME)
-        sys.exit(1)
+        with zipfile.ZipFile(zip_name) as in_zip, contextlib.redirect_stdout(printed):
+            file_encoding, source_text = member_source(in_zip, zipped_filename, custom)
+            deflated = DeflatedWriter() if level is None else DeflatedWriter(level)
+            with io.TextIOWrapper(io.BufferedWriter(deflated), encoding=file_encoding) as csv_out:
+                count = transform_member(custom, csv_out, source_text)
+        return MemberResult(
+            deflated.member(), count, root_logger.handlers[0].records, printed.getvalue())
+    finally:
+        root_logger.handlers = handlers
+
+
+def process_files_parallel(in_zip, out_zip, custom, workers, compression=DEFAULT):
+    """Process zipped files in worker processes, adding results in zipped order."""
+    names = in_zip.namelist()
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(START_METHOD)) as executor:
+        futures = [
+            executor.submit(
+                transform_member_worker, in_zip.filename, name, custom.__name__, compression.level)
+            for name in names
+            ]
+        for zipped_filename, future in zip(names, futures):
+            utils.logger.debug('*' * 80)
+            utils.logger.info('Working on "%s"', zipped_filename)
+            result = future.result()  # re-raises transform error
+            for record in result.records:
+                utils.logger.handle(record)
+            print(result.printed, end='')
+            append_deflated(
+                out_zip, result_zipinfo(result_filename(zipped_filename), compression),
+                result.member)
+            log_converted(zipped_filename, result.count)
+
+
+def process_files(in_zip, out_zip, custom, compression=DEFAULT):
+    """Process files within zipped file and write to another zip file."""
+    members = in_zip.infolist()
+    workers = min(len(members), row_executor.worker_count())  # job's share of the CPUs
+    if workers > 1 and sum(x.file_size for x in members) >= PARALLEL_MIN \
+            and compression.method == zipfile.ZIP_DEFLATED:  # workers only deflate
+        process_files_parallel(in_zip, out_zip, custom, workers, compression)
+        return
+    for zipped_filename in in_zip.namelist():
+        utils.logger.debug('*' * 80)
+        utils.logger.info('Working on "%s"', zipped_filename)
+        file_encoding, source_text = member_source(in_zip, zipped_filename, custom)
+        # compress transformed data straight into new zip file (no work file)
+        zinfo = result_zipinfo(result_filename(zipped_filename), compression)
+        with out_zip.open(zinfo, 'w') as zipped_result, \
+                io.TextIOWrapper(zipped_result, encoding=file_encoding) as csv_out:
+            count = transform_member(custom, csv_out, source_text)
+        log_converted(zipped_filename, count)
+
 
-    if FILE_TYPE != 'zip':
+def run(city_name, file_name, file_type, new_fname, file_path):
+    """Transform given client file, returning program exit status."""
+    if 'nothing using partname' in new_fname:
+        utils.logger.info('%s in %s', new_fname, file_path)
+        return 1
+
+    custom = REGISTRY.load(city_name)
+    if not custom:
+        utils.logger.info('No "%s" transform module', city_name)
+        return 1
+
+    compression = client_compression(custom)
+    if file_type != 'zip':
         # file not a zip file so compress using new filename from original filename
-        ZIP_NAME = f'{FILE_PATH}{NEW_FNAME.split(".", maxsplit=1)[0]}.zip'
-        with zipfile.ZipFile(ZIP_NAME, 'w') as zip_file:
-            zip_file.write(f'{FILE_PATH}{FILE_NAME}', NEW_FNAME,
-                compress_type=zipfile.ZIP_DEFLATED)
-        utils.logger.info('Compressed %s for processing', NEW_FNAME)
+        zip_name = f'{file_path}{new_fname.split(".", maxsplit=1)[0]}.zip'
+        with zipfile.ZipFile(zip_name, 'w') as zip_file:
+            zip_file.write(f'{file_path}{file_name}', new_fname, **compression.kwargs())
+        utils.logger.info('Compressed %s for processing', new_fname)
     else:
-        OUT_ZIP_NAME = FILE_PATH + utils.TRANS_PREFIX + NEW_FNAME
-        remove_surplus_file(OUT_ZIP_NAME)  # previously converted file
+        out_zip_name = file_path + utils.TRANS_PREFIX + new_fname
+        remove_surplus_file(out_zip_name)  # previously converted file
         try:
-            with zipfile.ZipFile(f'{FILE_PATH}{FILE_NAME}', 'r') as IN_ZIP, \
-                    zipfile.ZipFile(OUT_ZIP_NAME, 'a') as OUT_ZIP:
-                process_files(IN_ZIP, OUT_ZIP, CUSTOM, FILE_PATH)
-            tmp = OUT_ZIP_NAME.split('/')[-1]
+            with zipfile.ZipFile(f'{file_path}{file_name}', 'r') as in_zip, \
+                    zipfile.ZipFile(out_zip_name, 'a') as out_zip:
+                process_files(in_zip, out_zip, custom, compression)
+            tmp = out_zip_name.split('/')[-1]
             utils.logger.info('Compressed results to "%s"', tmp)
         except zipfile.BadZipFile:
-            utils.logger.info('"%s" is not a ZIP file', NEW_FNAME)
+            utils.logger.info('"%s" is not a ZIP file', new_fname)
+            return 1
         except Exception as ex:  # pylint: disable=broad-except
             if type(ex).__name__ == 'SAXParseException':
-                utils.logger.info('"%s" does not contain an XML file.', NEW_FNAME)
+                utils.logger.info('"%s" does not contain an XML file.', new_fname)
             else:
                 utils.logger.info('Error processing file!', exc_info=True)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    # print(f'{utils.parse_user_input()=}'); exit()
+    sys.exit(run(*utils.parse_user_input()))
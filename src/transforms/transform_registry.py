@@ -0,0 +1,162 @@
+"""
+Registry of client transform modules used by transform_file.
+
+The client_transforms package is scanned once (parsing source, not importing
+it) for <client>_transform.py modules with a transform_data entry point.
+Each module declares the kind of file it transforms with INPUT_KIND, one of
+INPUT_KINDS.  A module that only wildcard imports another transform (eg
+discovery is a tyler_tech clone) gets that transform's input kind.
+
+Modules are imported when first needed and cached, so a long running worker
+only pays the import cost once.  A cached module (and its ancillaries
+fields module) is reloaded when its source file's mtime changes, so edited
+transforms are picked up without restarting the dispatcher.  A client not
+found in the registry causes a rescan if a transform has been added since.
+"""
+
+
+import ast
+import importlib
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import app_modules.utilities as utils
+
+
+CLIENT_TRANSFORMS = Path(__file__).parent / 'client_transforms'
+SUFFIX = '_transform.py'
+ENTRY_POINT = 'transform_data'
+INPUT_KINDS = ('xml', 'fixed-length', 'csv', 'multi-line csv')
+
+
+def mtime(path):
+    """Modification time of file (None if missing)."""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+@dataclass
+class TransformPlugin:
+    """Client transform module found by scanning its source."""
+    client: str
+    path: Path
+    input_kind: str
+    package: str = utils.TRANSFORM_MODULES
+    module: object = None
+    loaded: tuple = ()  # source mtimes when module was imported
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def module_name(self):
+        """Name used to import transform module."""
+        return f'{self.package}{self.client}_transform'
+
+    @property
+    def fields_name(self):
+        """Name of transform's ancillaries fields module."""
+        return f'{self.package}ancillaries.{self.client}_fields'
+
+    def sources(self):
+        """Source files transform module is loaded from."""
+        return (self.path, self.path.parent / 'ancillaries' / f'{self.client}_fields.py')
+
+    def load(self):
+        """Import transform module, reloading it if its source has changed."""
+        with self.lock:
+            mtimes = tuple(mtime(x) for x in self.sources())
+            if self.module is None:
+                self.module = importlib.import_module(self.module_name)
+            elif mtimes != self.loaded:
+                utils.logger.debug('Reloading changed "%s" transform', self.client)
+                if self.fields_name in sys.modules:
+                    importlib.reload(sys.modules[self.fields_name])
+                self.module = importlib.reload(self.module)
+            self.loaded = mtimes
+            return self.module
+
+    @property
+    def transform_data(self):
+        """Transform entry point of (loaded) module."""
+        return getattr(self.load(), ENTRY_POINT)
+
+
+def scan_source(path):
+    """Input kind, entry point flag and wildcard imported module of transform source."""
+    input_kind, entry_point, star_import = None, False, None
+    for node in ast.parse(path.read_bytes(), str(path)).body:
+        match node:
+            case ast.Assign(targets=[ast.Name(id='INPUT_KIND')], value=ast.Constant(value=kind)):
+                input_kind = kind
+            case ast.FunctionDef(name=name) if name == ENTRY_POINT:
+                entry_point = True
+            case ast.ImportFrom(module=module, names=[ast.alias(name='*')]) \
+                    if module and module.endswith('_transform'):
+                star_import = module.rsplit('.', 1)[-1].removesuffix('_transform')
+    return input_kind, entry_point, star_import
+
+
+class TransformRegistry:
+    """Client transforms by client name."""
+
+    def __init__(self, directory=CLIENT_TRANSFORMS, package=utils.TRANSFORM_MODULES):
+        self.directory = Path(directory)
+        self.package = package
+        self.plugins = {}
+        self.scanned = None  # directory mtime when last scanned
+        self.lock = threading.Lock()
+
+    def scan(self):
+        """Find client transforms in directory."""
+        found, clones = {}, {}
+        for path in sorted(self.directory.glob(f'*{SUFFIX}')):
+            client = path.name.removesuffix(SUFFIX)
+            try:
+                input_kind, entry_point, star_import = scan_source(path)
+            except SyntaxError:
+                utils.logger.info('Could not scan "%s" transform', client, exc_info=True)
+                continue
+            if entry_point:
+                if input_kind not in INPUT_KINDS:
+                    utils.logger.debug('"%s" transform has no valid INPUT_KIND', client)
+                found[client] = TransformPlugin(client, path, input_kind, self.package)
+            elif star_import:
+                clones[client] = (path, input_kind, star_import)
+        for client, (path, input_kind, original) in clones.items():
+            if original in found:
+                found[client] = TransformPlugin(
+                    client, path, input_kind or found[original].input_kind, self.package)
+        with self.lock:
+            for client, plugin in found.items():  # keep modules already loaded
+                if client in self.plugins and self.plugins[client].path == plugin.path:
+                    plugin = self.plugins[client]
+                found[client] = plugin
+            self.plugins = found
+            self.scanned = mtime(self.directory)
+
+    def get(self, client):
+        """Transform plugin for client (None if client has no transform)."""
+        if self.scanned is None:
+            self.scan()
+        plugin = self.plugins.get(client)
+        if plugin is None and mtime(self.directory) != self.scanned:
+            self.scan()  # transform may have been added since last scan
+            plugin = self.plugins.get(client)
+        return plugin
+
+    def load(self, client):
+        """Transform module for client (None if client has no transform)."""
+        plugin = self.get(client)
+        return plugin.load() if plugin else None
+
+    def input_kinds(self):
+        """Input kind of each client transform."""
+        if self.scanned is None:
+            self.scan()
+        return {client: plugin.input_kind for client, plugin in self.plugins.items()}
+
+
+REGISTRY = TransformRegistry()
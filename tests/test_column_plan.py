@@ -0,0 +1,58 @@
+"""Test per column operations compiled into one pass over CSV rows."""
+
+
+import pytest
+
+from app_modules.column_plan import (
+    BLANK, INTEGER, MONEY, ZERO_TO_BLANK, compile_plan, merge_operations)
+
+
+BLANK_COLS = (1, 3)
+INTEGER_COLS = (4, 5, 6)
+METER_COLS = (5, 6, 7)
+
+
+def passes(row):
+    """Column operations as Eagle Mountain did them, a pass each."""
+    row = [f'{int(float(x)):d}' if i in INTEGER_COLS and x else x for i, x in enumerate(row)]
+    row = ['' if i in BLANK_COLS else x for i, x in enumerate(row)]
+    row = ['' if x == '0.00' else x for x in row]
+    return ['' if i in METER_COLS and x == '0' else x for i, x in enumerate(row)]
+
+
+@pytest.mark.parametrize('row', [
+    ['a', 'b', '0.00', 'd', '1.0', '0.0', '', '0', '0.00', 'x'],
+    ['0', '0.00', '0.00', '0', '', '12.7', '0', '00', 'z', ''],
+    ['a', 'b', '0.00', 'd', '3'],  # short row
+    [],
+    ])
+def test_same_as_passes(row):
+    """One pass gives the same row as the separate passes."""
+    plan = compile_plan(merge_operations(
+        (INTEGER_COLS, INTEGER),
+        (BLANK_COLS, BLANK),
+        (METER_COLS, ZERO_TO_BLANK),
+        ), blank_values=('0.00',))
+    assert plan(list(row)) == passes(list(row))
+
+
+def test_operations():
+    """Each operation on its own, in the order given when several."""
+    plan = compile_plan({0: BLANK, 1: ZERO_TO_BLANK, 2: INTEGER, 3: MONEY, 4: (INTEGER, ZERO_TO_BLANK)})
+    assert plan(['x', '0', '12.9', '1,234.5', '0.4']) == ['', '', '12', '1234.50', '']
+    assert plan(['x', '00', '', '-3', '1']) == ['', '00', '', '-3.00', '1']
+    assert plan(['x', '0', '', '', '', 'extra']) == ['', '', '', '', '', 'extra']
+
+
+def test_merge_order():
+    """Columns in several groups get the operations in group order."""
+    assert merge_operations(((1, 2), INTEGER), ((2, 3), ZERO_TO_BLANK)) \
+        == {1: (INTEGER,), 2: (INTEGER, ZERO_TO_BLANK), 3: (ZERO_TO_BLANK,)}
+
+
+def test_unknown_operation():
+    """Unknown operations found when plan is made."""
+    with pytest.raises(ValueError):
+        compile_plan({0: 'round'})
+    with pytest.raises(ValueError):
+        merge_operations(((0,), 'round'))
@@ -0,0 +1,34 @@
+"""Test zip members deflated in one place and added to a zip file in another."""
+
+
+import zipfile
+
+import pytest
+
+from app_modules import deflated_zip
+from app_modules.deflated_zip import DeflatedWriter, append_deflated
+from app_modules.zip_compression import PRESETS
+
+
+DATA = b'acct\tname\tamount\n' + b''.join(
+    f'{idx}\tcustomer {idx}\t{idx * 1.25:.2f}\n'.encode() for idx in range(2000))
+
+
+@pytest.mark.parametrize('checked', [True, False])
+@pytest.mark.parametrize('preset', PRESETS)
+def test_append_deflated(tmp_path, monkeypatch, preset, checked):
+    """Appended members (between others) pass testzip with every preset, with or without internals."""
+    if not checked:  # eg a Python version append_deflated wasn't checked against
+        monkeypatch.setattr(deflated_zip, 'INTERNALS_CHECKED', ())
+    compression = PRESETS[preset]
+    deflated = DeflatedWriter() if compression.level is None else DeflatedWriter(compression.level)
+    deflated.write(DATA)
+    zip_name = tmp_path / 'results.zip'
+    with zipfile.ZipFile(zip_name, 'w') as out_zip:
+        out_zip.writestr('first.csv', DATA[:100], **compression.kwargs())
+        append_deflated(out_zip, compression.apply(zipfile.ZipInfo('appended.csv')), deflated.member())
+        out_zip.writestr('last.csv', DATA[-100:], **compression.kwargs())
+    with zipfile.ZipFile(zip_name) as in_zip:
+        assert in_zip.testzip() is None
+        assert in_zip.getinfo('appended.csv').compress_type == zipfile.ZIP_DEFLATED
+        assert [in_zip.read(x) for x in in_zip.namelist()] == [DATA[:100], DATA, DATA[-100:]]
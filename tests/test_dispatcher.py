@@ -0,0 +1,129 @@
+"""Test dispatcher catching up on files and dispatching them."""
+
+
+import os
+import shutil
+import time
+from functools import partial
+from pathlib import Path
+
+from watchdog.events import FileCreatedEvent
+
+import dispatcher
+from app_modules import job_metrics
+from app_modules.file_claims import CLAIMS_DIR, FileClaims
+from app_modules.job_queue import JobQueue
+from app_modules.worker_pool import ROW_WORKERS_ENV, WorkerPool, cpu_share
+
+
+TRANSFORM_DATA = Path('tests/data/transform_data')
+
+
+def test_catch_up(tmp_path, monkeypatch):
+    """Files waiting are dispatched once each, whichever way they are seen."""
+    dispatched = []
+    handler = dispatcher.MyHandler(JobQueue(dispatched.append, executors=1))
+    handler.readiness.quiet = 0.3
+
+    def late_event(path):  # created event of file caught up on arrives while it is processed
+        dispatched.append(path)
+        if path.endswith('old.zip'):
+            handler.on_created(FileCreatedEvent(path))
+    handler.jobs.handler = late_event
+
+    hour_ago = time.time() - 3600
+    for name in ('old.zip', 'landed.zip', 'claimed.zip', 'fxd old.zip', 'new.zip'):
+        (tmp_path / name).write_bytes(b'bills')
+        if name != 'new.zip':
+            os.utime(tmp_path / name, (hour_ago, hour_ago))
+    handler.on_created(FileCreatedEvent(str(tmp_path / 'landed.zip')))  # during scan
+
+    is_file = Path.is_file
+    def claimed_after_listing(path):  # by another dispatcher sharing directory
+        found = is_file(path)
+        if path.name == 'claimed.zip':
+            path.unlink()
+        return found
+    monkeypatch.setattr(Path, 'is_file', claimed_after_listing)
+
+    dispatcher.catch_up(tmp_path, handler)
+    time.sleep(1)  # readiness of landed & new files
+    handler.readiness.stop()
+    handler.jobs.join()
+    handler.jobs.stop()
+    assert sorted(dispatched) == [str(tmp_path / x) for x in ('landed.zip', 'new.zip', 'old.zip')]
+
+
+def test_claimed_dispatch(tmp_path, monkeypatch):
+    """Shared watch directory's file processed in claim, results returned & claim released."""
+    watch_dir = tmp_path / 'watch'
+    watch_dir.mkdir()
+    (watch_dir / 'elko.zip').write_bytes(b'bills')
+    (watch_dir / 'draper.zip').write_bytes(b'bills')
+    claims = FileClaims(watch_dir, name='host1-1')
+    other = FileClaims(watch_dir, name='host2-1')
+    monkeypatch.setattr(dispatcher, 'WATCH_ME', f'{watch_dir}/')
+    monkeypatch.setattr(dispatcher, 'CLAIMS', claims)
+    processed = []
+
+    def process_file(cname, fname, ftype, file_path):
+        processed.append((cname, fname, ftype, file_path))
+        assert (Path(file_path) / fname).read_bytes() == b'bills'  # claimed, not in watch dir
+        assert not (watch_dir / fname).exists()
+        (Path(file_path) / f'fxd {fname}').write_bytes(b'results')
+        return 0
+    monkeypatch.setattr(dispatcher, 'process_file', process_file)
+
+    assert other.claim('draper.zip')  # claimed by dispatcher on another host
+    dispatcher.dispatch_file(f'{watch_dir}/draper.zip')
+    dispatcher.dispatch_file(f'{watch_dir}/elko.zip')
+    claims.stop()
+    other.stop()
+
+    assert processed == [('elko', 'elko.zip', 'zip', f'{claims.instance}/elko.zip/')]
+    assert sorted(x.name for x in watch_dir.iterdir()) == [CLAIMS_DIR, 'fxd elko.zip']
+    assert (watch_dir / 'fxd elko.zip').read_bytes() == b'results'
+    assert not (tmp_path / 'archive').exists()
+
+
+def test_batch(tmp_path, monkeypatch, capsys):
+    """Directory of files processed in pool, renamed as when watched, failure in exit status."""
+    batch_dir = tmp_path / 'batch'
+    batch_dir.mkdir()
+    for name in ('elko.zip', 'lake_point 2025.07.01.zip'):
+        shutil.copyfile(TRANSFORM_DATA / name, batch_dir / name)
+    (batch_dir / 'nowhere bills.zip').write_bytes(b'not a zip')
+    (batch_dir / 'fxd old.zip').write_bytes(b'results of earlier run')  # ignored
+    (batch_dir / '.hidden').write_bytes(b'')
+    monkeypatch.setattr(job_metrics, 'record', partial(
+        job_metrics.record, metrics_file=tmp_path / 'job_metrics.tsv'))
+    assert [x.name for x in dispatcher.batch_files(str(batch_dir))] \
+        == ['elko.zip', 'lake_point 2025.07.01.zip', 'nowhere bills.zip']
+
+    with WorkerPool(1) as pool:
+        monkeypatch.setattr(dispatcher, 'POOL', pool)
+        status = dispatcher.dispatch_batch(str(batch_dir))
+
+    assert status == 1  # nowhere bills failed
+    summary = capsys.readouterr().out.splitlines()
+    assert [x.split()[-3] for x in summary[1:-1]] == ['ok', 'ok', 'FAILED']
+    assert summary[1].startswith('elko.zip ')
+    assert summary[2].startswith('lake_point 2025_07_01.zip ')  # renamed, as dispatch_file does
+    assert summary[-1].startswith('3 files, 1 failed,')
+    assert sorted(x.name for x in batch_dir.iterdir()) == [
+        '.hidden', 'elko.zip', 'fxd elko.zip', 'fxd lake_point 2025_07_01.zip', 'fxd old.zip',
+        'lake_point 2025_07_01.zip', 'nowhere bills.zip']  # files left in place
+
+
+def test_child_env(monkeypatch):
+    """Programs run at the same time get their records file & share of the CPUs."""
+    monkeypatch.delenv(ROW_WORKERS_ENV, raising=False)
+    monkeypatch.setattr(dispatcher, 'EXECUTORS', 4)
+    env = dispatcher.child_env('records.txt')
+    assert env[job_metrics.RECORDS_ENV] == 'records.txt'
+    assert env[ROW_WORKERS_ENV] == str(cpu_share(4))
+    monkeypatch.setenv(ROW_WORKERS_ENV, '3')  # set for dispatcher
+    assert dispatcher.child_env('records.txt')[ROW_WORKERS_ENV] == '3'
+    monkeypatch.delenv(ROW_WORKERS_ENV)
+    monkeypatch.setattr(dispatcher, 'EXECUTORS', 1)
+    assert ROW_WORKERS_ENV not in dispatcher.child_env('records.txt')
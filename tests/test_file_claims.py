@@ -0,0 +1,46 @@
+"""Test claiming files in a watch directory shared by several dispatchers."""
+
+
+import os
+import time
+
+from app_modules.file_claims import CLAIMS_DIR, LEASE_FILE, FileClaims
+
+
+def test_only_one_claim(tmp_path):
+    """File can only be claimed by one dispatcher and results are returned."""
+    (tmp_path / 'elko.zip').write_text('bills', encoding='utf8')
+    first = FileClaims(tmp_path, name='host1-1')
+    second = FileClaims(tmp_path, name='host2-1')
+    claim = first.claim('elko.zip')
+    assert claim and second.claim('elko.zip') is None
+    assert not (tmp_path / 'elko.zip').exists()
+
+    (claim.directory / 'fxd elko.zip').write_text('results', encoding='utf8')
+    (claim.directory / 'elko.zip').unlink()  # processed successfully
+    claim.release()
+    assert sorted(x.name for x in tmp_path.iterdir()) == [CLAIMS_DIR, 'fxd elko.zip']
+    first.stop()
+    second.stop()
+    assert not list((tmp_path / CLAIMS_DIR).iterdir())
+
+
+def test_stale_claims_recovered(tmp_path):
+    """Files claimed by dispatcher that stopped renewing its lease are returned."""
+    (tmp_path / 'draper water.zip').write_text('bills', encoding='utf8')
+    crashed = FileClaims(tmp_path, name='host1-1')
+    claim = crashed.claim('draper water.zip')
+    (claim.directory / 'fxd draper water.zip').write_text('partial', encoding='utf8')
+    crashed.stopped.set()  # lease no longer renewed
+    crashed.thread.join()
+    stale = time.time() - 600
+    os.utime(crashed.instance / LEASE_FILE, (stale, stale))
+
+    recovered = []
+    survivor = FileClaims(tmp_path, lease=300, on_recovered=recovered.append, name='host2-1')
+    survivor.recover_stale()
+    survivor.stop()
+    assert recovered == [str(tmp_path / 'draper water.zip')]
+    assert (tmp_path / 'draper water.zip').read_text(encoding='utf8') == 'bills'
+    assert not (tmp_path / 'fxd draper water.zip').exists()  # partial results dropped
+    assert not list((tmp_path / CLAIMS_DIR).iterdir())
@@ -0,0 +1,50 @@
+"""Test detection of completely written files in watched directory."""
+
+
+import threading
+import time
+
+from app_modules.file_readiness import ReadinessTracker
+
+
+def test_ready_once_quiet(tmp_path):
+    """File passed on once, after it stops changing."""
+    ready = []
+    tracker = ReadinessTracker(ready.append, quiet=0.2)
+    path = tmp_path / 'elko.zip'
+    path.write_bytes(b'part')
+    for _ in range(3):  # duplicate events are coalesced
+        tracker.created(str(path))
+    time.sleep(0.1)
+    path.write_bytes(b'part and the rest')
+    tracker.modified(str(path))
+    time.sleep(0.1)
+    assert not ready  # still being written
+    time.sleep(0.5)
+    tracker.stop()
+    assert ready == [str(path)]
+
+
+def test_closed_is_ready_now(tmp_path):
+    """Close-write event passes file on without waiting for quiet period."""
+    event = threading.Event()
+    tracker = ReadinessTracker(lambda path: event.set(), quiet=60)
+    path = tmp_path / 'draper water.zip'
+    path.write_bytes(b'complete')
+    tracker.created(str(path))
+    tracker.closed(str(path))
+    assert event.wait(1)
+    tracker.stop()
+
+
+def test_vanished_file_dropped(tmp_path):
+    """File removed before it was complete is not passed on."""
+    ready = []
+    tracker = ReadinessTracker(ready.append, quiet=0.2)
+    path = tmp_path / 'waterford.zip'
+    path.write_bytes(b'partial')
+    tracker.created(str(path))
+    path.unlink()
+    time.sleep(0.5)
+    tracker.stop()
+    assert not ready
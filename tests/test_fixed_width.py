@@ -0,0 +1,90 @@
+"""Test fields extracted by code generated for fixed width layouts."""
+
+
+import io
+import zipfile
+from functools import partial
+
+import pytest
+
+import transforms.client_transforms.ancillaries.charlevoix_fields as charlevoix
+import transforms.client_transforms.ancillaries.xfixed_length_fields as xfixed
+import app_modules.fixed_width as fixed_width
+from app_modules.fixed_width import LayoutError, compile_columns, compile_layout, iter_fixed_records
+from app_modules.line_stream import LineStream
+
+
+FIXED_LENGTH = 'tests/data/transform_data/charlevoix fixed_length.zip'
+
+
+@pytest.mark.parametrize('layout', [charlevoix.SELECTED, xfixed.INCLUDE])
+def test_same_fields(layout):
+    """Fields same as slicing each field in turn, layout compiled once."""
+    extract = compile_layout(layout)
+    assert compile_layout(list(layout)) is extract
+    with zipfile.ZipFile(FIXED_LENGTH) as in_zip:
+        for row in LineStream(partial(in_zip.open, in_zip.namelist()[0])):
+            assert extract(row) == [row[x[1]:x[2]].strip() for x in layout]
+
+
+def test_columns():
+    """Delimited columns selected (only those short rows have)."""
+    select = compile_columns(charlevoix.INCLUDE)
+    row = [f' {idx} ' for idx in range(len(charlevoix.FIELDS))]
+    for size in (len(row), 100, 0):
+        expected = [x.strip() for idx, x in enumerate(row[:size]) if idx in charlevoix.INCLUDE]
+        assert select(row[:size]) == expected
+
+
+@pytest.mark.parametrize('layout', [
+    [('Account', 0, 25, 20)],  # wrong length
+    [('Account', 25, 0, -25)],
+    [('Account', 0, '25', 25)],
+    [('Account', 25, 50, 25), ('Parcel', 0, 25, 25)],  # out of order
+    [('Account', 0)],
+    ])
+def test_invalid_layout(layout):
+    """Layout mistakes found when compiled."""
+    with pytest.raises(LayoutError):
+        compile_layout(layout)
+
+
+def fixed_length_bytes():
+    """Bytes of fixed length test file."""
+    with zipfile.ZipFile(FIXED_LENGTH) as in_zip:
+        return in_zip.read(in_zip.namelist()[0])
+
+
+def python_records(data, layout):
+    """Fields of records that aren't paperless, read line by line."""
+    extract = compile_layout(layout)
+    return [extract(x) for x in data.decode('utf8').split('\r\n') if x and x[709] == 'F']
+
+
+@pytest.mark.skipif(fixed_width.np is None, reason='NumPy not installed')
+@pytest.mark.parametrize('layout', [charlevoix.SELECTED, xfixed.INCLUDE])
+@pytest.mark.parametrize('chunk_records', [fixed_width.CHUNK_RECORDS, 7, 1])
+def test_array_records(monkeypatch, layout, chunk_records):
+    """Records read as arrays (in chunks) give the same fields."""
+    monkeypatch.setattr(fixed_width, 'CHUNK_RECORDS', chunk_records)
+    data = fixed_length_bytes()
+    where = (charlevoix.FIELDS[charlevoix.PAPERLESS], 'F')
+    expected = python_records(data, layout)
+    for source in (data, data + b'\r\n', data.replace(b'\r\n', b'\n')):
+        assert list(iter_fixed_records(io.BytesIO(source), layout, where)) == expected
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python'])
+@pytest.mark.parametrize('record', [50, 0])
+def test_line_records(monkeypatch, engine, record):
+    """Non-ASCII or short records (from the chunk they are in) read by line."""
+    monkeypatch.setenv(fixed_width.ENGINE_ENV, engine)
+    monkeypatch.setattr(fixed_width, 'CHUNK_RECORDS', 16)
+    data = fixed_length_bytes()
+    rows = data.split(b'\r\n')
+    rows[record] = rows[record][:5000] + 'Montréal'.encode() + rows[record][5008:]
+    rows[-1] = rows[-1][:1000]  # short last record, is paperless
+    data = b'\r\n'.join(rows)
+    where = (charlevoix.FIELDS[charlevoix.PAPERLESS], 'F')
+    assert list(iter_fixed_records(io.BytesIO(data), charlevoix.SELECTED, where)) \
+        == python_records(data, charlevoix.SELECTED)
@@ -0,0 +1,75 @@
+"""Test journal of dispatched jobs and restoring cached results of resent files."""
+
+
+import hashlib
+
+from app_modules import job_journal
+from app_modules.job_journal import JobJournal, output_names, program_version
+
+
+TRANSFORM = 'transforms/transform_file'
+
+
+def test_output_names():
+    """Result files of journaled programs, None for programs always run."""
+    assert output_names(TRANSFORM, 'elko', 'elko.zip', 'zip') == ['fxd elko.zip']
+    assert output_names(TRANSFORM, 'elko', 'elko.csv', 'csv') is None
+    assert output_names('transforms/hlap_cnvrt', 'hlap', 'hlap Jan 25.TXT', 'TXT') \
+        == ['fxd hlap Jan 25_PRN.csv', 'fxd hlap Jan 25_PDF.csv']
+    assert output_names('transforms/hlap_cnvrt', 'elko', 'elko.TXT', 'TXT') is None
+    assert output_names('pdf_bill_indexing/hlap_pdf_idx', 'hlap', 'hlap.pdf', 'pdf') is None
+
+
+def test_key(tmp_path):
+    """Key is file content, client & code version, None if not journaled."""
+    (tmp_path / 'elko.zip').write_bytes(b'bills')
+    key = JobJournal.key(TRANSFORM, 'elko', 'elko.zip', 'zip', f'{tmp_path}/')
+    assert key.content_hash == hashlib.sha256(b'bills').hexdigest()
+    assert (key.client, key.version, key.outputs) == ('elko', program_version(), ['fxd elko.zip'])
+    assert JobJournal.key(TRANSFORM, 'elko', 'elko.csv', 'csv', f'{tmp_path}/') is None
+
+
+def test_program_version(tmp_path):
+    """Change to any source file (eg a shared module) is a new version."""
+    (tmp_path / 'transforms').mkdir()
+    (tmp_path / 'app_modules').mkdir()
+    (tmp_path / 'transforms' / 'transform_file.py').write_text('run()', encoding='utf8')
+    (tmp_path / 'app_modules' / 'money.py').write_text('CENTS = 100', encoding='utf8')
+    version = program_version(tmp_path)
+    assert program_version(tmp_path) == version
+    (tmp_path / 'app_modules' / 'money.py').write_text('CENTS = 100  # fixed', encoding='utf8')
+    assert program_version(tmp_path) != version
+
+
+def record_job(tmp_path, journal, content=b'bills'):
+    """Key of elko job processed & journaled in tmp_path."""
+    (tmp_path / 'elko.zip').write_bytes(content)
+    key = JobJournal.key(TRANSFORM, 'elko', 'elko.zip', 'zip', f'{tmp_path}/')
+    (tmp_path / 'fxd elko.zip').write_bytes(b'results')
+    journal.record(key, TRANSFORM, 'elko.zip', f'{tmp_path}/')
+    (tmp_path / 'fxd elko.zip').unlink()  # results sent on
+    return key
+
+
+def test_record_restore(tmp_path):
+    """Results of resent file restored from cache, new file not found."""
+    journal = JobJournal(db=tmp_path / 'journal.sqlite', cache_dir=tmp_path / 'cache')
+    key = record_job(tmp_path, journal)
+    assert journal.restore(key, f'{tmp_path}/')
+    assert (tmp_path / 'fxd elko.zip').read_bytes() == b'results'
+
+    (tmp_path / 'elko.zip').write_bytes(b'new bills')
+    new_key = JobJournal.key(TRANSFORM, 'elko', 'elko.zip', 'zip', f'{tmp_path}/')
+    assert journal.lookup(new_key) is None
+    assert not journal.restore(new_key, f'{tmp_path}/')
+
+
+def test_new_version_misses(tmp_path, monkeypatch):
+    """Resent file is processed again once the code has changed."""
+    journal = JobJournal(db=tmp_path / 'journal.sqlite', cache_dir=tmp_path / 'cache')
+    key = record_job(tmp_path, journal)
+    monkeypatch.setattr(job_journal, 'program_version', lambda: 'fixed')
+    new_key = JobJournal.key(TRANSFORM, 'elko', 'elko.zip', 'zip', f'{tmp_path}/')
+    assert new_key.content_hash == key.content_hash and new_key.version != key.version
+    assert not journal.restore(new_key, f'{tmp_path}/')
+    assert not (tmp_path / 'fxd elko.zip').exists()
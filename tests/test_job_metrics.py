@@ -0,0 +1,48 @@
+"""Test dispatcher job resource accounting."""
+
+
+import sys
+
+import app_modules.job_metrics as metrics
+
+
+def test_records_counted(tmp_path, monkeypatch):
+    """Records reported by a job are totalled and the records file removed."""
+    records_file = tmp_path / 'records'
+    monkeypatch.setenv(metrics.RECORDS_ENV, str(records_file))
+    metrics.count_records(12)
+    metrics.count_records(0)
+    metrics.count_records(30)
+    assert metrics.read_records(records_file) == 42
+    assert not records_file.exists()
+
+
+def test_child_usage():
+    """Child process CPU and peak memory come from its rusage."""
+    status, usage = metrics.run_child(
+        [sys.executable, '-c', 'import sys; sum(range(3_000_000)); sys.exit(3)'])
+    assert status == 3
+    assert usage.wall >= usage.user > 0
+    assert usage.max_rss > 0
+
+
+def test_measure_children():
+    """Job's CPU includes its child processes, as os.wait4 does."""
+    (status, child), usage = metrics.measure(
+        metrics.run_child, [sys.executable, '-c', 'sum(range(3_000_000))'])
+    assert status == 0
+    assert usage.user >= child.user > 0 and usage.system >= child.system
+
+
+def test_metrics_file(tmp_path):
+    """Metrics are appended to file with heading written once."""
+    metrics_file = tmp_path / 'job_metrics.tsv'
+    result, usage = metrics.measure(sum, range(1000))
+    for _ in range(2):
+        metrics.record(metrics.JobMetrics(
+            '2026-10-18T09:00:00', 'elko', 'transforms/transform_file', 'zip', 1024,
+            result, 0, usage.wall, usage.user, usage.system, usage.max_rss), metrics_file)
+    lines = [x.split('\t') for x in metrics_file.read_text(encoding='utf8').splitlines()]
+    assert len(lines) == 3
+    assert lines[0][:3] == ['finished', 'client', 'program']
+    assert lines[1][1] == 'elko' and lines[1][5] == '499500'
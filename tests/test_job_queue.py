@@ -0,0 +1,52 @@
+"""Test dispatcher job queue ordering and concurrency."""
+
+
+import threading
+import time
+
+from app_modules.job_queue import JobQueue
+
+
+def test_same_client_in_order():
+    """Jobs for one client run one at a time in queued order."""
+    done = []
+    running = []
+
+    def handler(item):
+        running.append(item)
+        assert len(running) == 1  # never two jobs for same client at once
+        time.sleep(0.01)
+        done.append(item)
+        running.remove(item)
+
+    jobs = JobQueue(handler, executors=4)
+    for idx in range(10):
+        jobs.put('draper', idx)
+    jobs.join()
+    jobs.stop()
+    assert done == list(range(10))
+
+
+def test_clients_run_concurrently():
+    """Jobs for different clients are processed at the same time."""
+    barrier = threading.Barrier(3, timeout=5)
+    jobs = JobQueue(lambda item: barrier.wait(), executors=3)
+    for cname in ('draper', 'elko', 'roosevelt'):
+        jobs.put(cname, f'{cname}.zip')
+    jobs.join()  # would time out (broken barrier) if run one after another
+    jobs.stop()
+    assert not barrier.broken
+
+
+def test_queue_depth():
+    """Queue depth counts jobs waiting to be run."""
+    release = threading.Event()
+    jobs = JobQueue(lambda item: release.wait(5), executors=1)
+    for idx in range(3):
+        jobs.put('elko', idx)
+    time.sleep(0.1)
+    assert jobs.depth == 2 and jobs.active == 1
+    release.set()
+    jobs.join()
+    jobs.stop()
+    assert jobs.depth == 0
@@ -0,0 +1,54 @@
+"""Test lazily decoded lines give same lines as reading whole file."""
+
+
+import io
+import zipfile
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from app_modules.line_stream import LineStream
+
+
+TEST_DATA = Path('tests/data/transform_data')
+SAMPLES = [
+    'a,b\r\nc,d\r\n',
+    'a,b\r\nc,"multi\nline"\r\ne,f',  # lone LF stays in CRLF line
+    '<?xml?>\n<Root>\n</Root>\n',
+    'no line end',
+    '',
+    'café\r\nüber\r\n' * 50,  # multi-byte chars split across chunks
+    ]
+
+
+@pytest.mark.parametrize('text', SAMPLES)
+@pytest.mark.parametrize('chunk', [1, 2, 3, 7, 1 << 20])
+def test_same_lines(text, chunk):
+    """Lines match splitting whole decoded file on its line end."""
+    data = text.encode('utf8')
+    lines = LineStream(partial(io.BytesIO, data), 'utf8', chunk)
+    newline = '\r\n' if '\r\n' in text else '\n'
+    assert list(lines) == text.split(newline)
+    assert list(lines) == text.split(newline)  # can be read again
+
+
+def test_indexing():
+    """Leading lines can be indexed without reading whole file."""
+    lines = LineStream(partial(io.BytesIO, b'<?xml?>\r\n<BillExtract>\r\n<Accounts/>'), chunk=4)
+    assert 'BillExtract' in lines[1]
+    assert lines.head == ['<?xml?>', '<BillExtract>']
+    assert lines[0] == '<?xml?>' and lines[-1] == '<Accounts/>'
+
+
+def test_zip_members():
+    """Zipped client files give the lines transform_file used to give them."""
+    for zip_name in ('roosevelt.zip', 'charlevoix fixed_length.zip', 'elko.zip'):
+        with zipfile.ZipFile(TEST_DATA / zip_name) as in_zip:
+            for member in in_zip.namelist():
+                expected = in_zip.read(member).decode('utf8').split('\r\n')
+                lines = list(LineStream(partial(in_zip.open, member)))
+                if len(expected) == 1:  # LF only file was not split before
+                    assert '\n'.join(lines) == expected[0]
+                else:
+                    assert lines == expected
@@ -0,0 +1,104 @@
+"""Test client files read through memory maps."""
+
+
+import io
+import zipfile
+from functools import partial
+
+import pytest
+
+import transforms.client_transforms.ancillaries.charlevoix_fields as charlevoix
+from app_modules import mapped_file
+from app_modules.fixed_width import iter_fixed_records
+from app_modules.line_stream import LineStream
+from app_modules.mapped_file import (
+    BufferReader, iter_lines, map_member, map_path, open_source, text_lines)
+
+
+FIXED_LENGTH = 'tests/data/transform_data/charlevoix fixed_length.zip'
+HLAP = 'tests/data/archive/hlap Jan 25 CYCLE 2.TXT'
+
+
+def test_text_lines():
+    """Lines same as text file readline gives."""
+    with open(HLAP, encoding='utf8') as hlap_file:
+        expected = list(iter(hlap_file.readline, ''))
+    with map_path(HLAP) as view:
+        assert list(text_lines(view)) == expected
+        assert [bytes(x) for x in iter_lines(view, keepends=True)] \
+            == [x.encode() for x in expected]
+
+
+@pytest.mark.parametrize('data, lines', [
+    (b'ab\r\ncd\r\n\r\n\xc3\xa9', ['ab\n', 'cd\n', '\n', 'é']),
+    (b'ab\ncd\n', ['ab\n', 'cd\n']),
+    (b'ab\rcd\r\rxy\r', ['ab\n', 'cd\n', '\n', 'xy\n']),
+    (b'ab\r\ncd\ref', ['ab\n', 'cd\n', 'ef']),
+    (b'', []),
+    ])
+def test_line_ends(tmp_path, data, lines):
+    """CRLF & CR lines end with LF, empty file has no lines."""
+    (tmp_path / 'data.txt').write_bytes(data)
+    with map_path(tmp_path / 'data.txt') as view:
+        assert list(text_lines(view)) == lines
+        assert b''.join(iter_lines(view, keepends=True)) == data
+
+
+@pytest.mark.parametrize('newline', ['\r', '\r\n', '\n'])
+def test_chunked_line_ends(tmp_path, monkeypatch, newline):
+    """Lines as text file gives them when line ends are cut between chunks."""
+    monkeypatch.setattr(mapped_file, 'TEXT_CHUNK', 4)
+    text = newline.join(['abc', '', 'de', 'f', 'ghijk', 'é', '']) + 'end'
+    (tmp_path / 'data.txt').write_bytes(text.encode())
+    with open(tmp_path / 'data.txt', encoding='utf8') as text_file:
+        expected = list(iter(text_file.readline, ''))
+    with map_path(tmp_path / 'data.txt') as view:
+        assert list(text_lines(view)) == expected
+
+
+@pytest.fixture(name='zip_name')
+def fixture_zip_name(tmp_path):
+    """Zip file with fixed length records stored and deflated."""
+    with zipfile.ZipFile(FIXED_LENGTH) as in_zip:
+        data = in_zip.read(in_zip.namelist()[0])
+    zip_name = str(tmp_path / 'records.zip')
+    with zipfile.ZipFile(zip_name, 'w') as out_zip:
+        out_zip.writestr('deflated.txt', data, zipfile.ZIP_DEFLATED)
+        out_zip.writestr('stored ü.txt', data, zipfile.ZIP_STORED)
+    return zip_name
+
+
+def test_map_member(zip_name):
+    """Only stored zipped file mapped, view is its bytes."""
+    with zipfile.ZipFile(zip_name) as in_zip:
+        with map_member(in_zip, 'deflated.txt') as view:
+            assert view is None
+        with map_member(in_zip, 'stored ü.txt') as view:
+            assert view == in_zip.read('deflated.txt')
+
+
+@pytest.mark.parametrize('name', ['deflated.txt', 'stored ü.txt'])
+def test_open_source(zip_name, name):
+    """Transforms read same records whether file is mapped or not."""
+    where = (charlevoix.FIELDS[charlevoix.PAPERLESS], 'F')
+    with zipfile.ZipFile(zip_name) as in_zip:
+        source = LineStream(
+            partial(in_zip.open, name), mapper=partial(map_member, in_zip, name))
+        with open_source(source) as records:
+            assert hasattr(records, 'read') == (name == 'deflated.txt')
+            rows = list(iter_fixed_records(records, charlevoix.SELECTED, where))
+        with in_zip.open(name) as stream:
+            assert rows == list(iter_fixed_records(
+                io.BytesIO(stream.read()), charlevoix.SELECTED, where))
+    assert len(rows) == 180
+
+
+def test_buffer_reader():
+    """Reads and lines of view as binary stream gives them."""
+    data = b'first\nsecond\r\n\nlast'
+    reader, stream = BufferReader(data), io.BytesIO(data)
+    assert bytes(reader.readline()) == stream.readline()
+    assert bytes(reader.read(3)) == stream.read(3)
+    for _ in range(3):
+        assert bytes(reader.readline()) == stream.readline()
+    assert bytes(reader.read()) == stream.read() == b''
@@ -0,0 +1,90 @@
+"""Test integer cents amounts match the Decimal formatting they replaced."""
+
+
+import decimal as dec
+
+import pytest
+
+from app_modules.money import format_cents, to_cents
+from transforms.client_transforms import roosevelt_transform as roosevelt
+
+
+def draper_clean_amount(amount):
+    """Draper's str_to_amt & amount_to_str using Decimal."""
+    amount = dec.Decimal(f'-{amount[:-1]}' if amount[-1] == '-' else amount)
+    neg_sign = 'CR' if amount < 0 else '  '
+    return f'{abs(dec.Decimal(amount)):0.2f}{neg_sign}'
+
+
+def waterford_cnvt_amount(amount):
+    """Waterford's Record.cnvt_amount using Decimal."""
+    amount = dec.Decimal(amount.replace(',', '') or '0')
+    neg_sign = 'CR' if amount < 0 else '  '
+    return f'{abs(dec.Decimal(amount)):0,.2f}{neg_sign}'
+
+
+def roosevelt_format_currency(*amounts):
+    """Roosevelt's past due amount using Decimal."""
+    first, *rest = (dec.Decimal('-' + x[:-1] if x.endswith('-') else x) for x in amounts)
+    value = str(sum(rest, first))  # not sum from int 0, which drops sign of negative zeros
+    value = value[1:] + '-' if value.startswith('-') else value
+    value = value.replace('-', 'CR').lstrip('0')
+    return '0.00' if value == '.00' else (f'0{value}' if value[0] == '.' else value)
+
+
+def amount_strings(cents):
+    """Ways clients write amount of cents."""
+    whole, frac = divmod(abs(cents), 100)
+    minus = '-' if cents < 0 else ''
+    yield f'{minus}{whole}.{frac:02}'
+    yield f'{whole:011}.{frac:02}{minus}'  # Tyler Tech / Draper XML
+    yield f'{minus}{whole:,}.{frac:02}'
+    if not frac:
+        yield f'{minus}{whole}'
+    if not frac % 10:
+        yield f'{minus}{whole}.{frac // 10}'
+    if not whole:
+        yield f'{minus}.{frac:02}'
+
+
+CENTS = [*range(-10_000, 10_001), *range(-10**9, 10**9, 999_983)]
+
+
+def test_to_cents():
+    """Every way of writing amounts gives its cents."""
+    for cents in CENTS:
+        for amount in amount_strings(cents):
+            assert to_cents(amount) == cents, amount
+
+
+def test_same_as_decimal():
+    """Draper, Waterford & Roosevelt amounts formatted as Decimal did."""
+    for cents in CENTS:
+        for amount in amount_strings(cents):
+            if ',' not in amount:
+                assert format_cents(to_cents(amount)) == draper_clean_amount(amount)
+            if not amount.endswith('-'):
+                assert format_cents(to_cents(amount), thousands=True) == waterford_cnvt_amount(amount)
+        tyler = f'{abs(cents) // 100:011}.{abs(cents) % 100:02}{"-" if cents < 0 else ""}'
+        parts = (tyler, '00000001.00', '00000002.50-', '00000000.00')
+        assert format_cents(sum(map(to_cents, parts)), pad=False) == roosevelt_format_currency(*parts)
+
+
+@pytest.mark.parametrize('parts', [
+    ('00000000.00-', '00000000.00-', '-0.00', '00000000.00-'),  # only negative zeros
+    ('00000000.00-', '00000000.00', '00000000.00-', '00000000.00-'),
+    ('00000001.00-', '00000001.00', '00000000.00-', '00000000.00-'),
+    ('00000012.34', '00000002.50-', '00000000.00', '00000000.00-'),
+    ('00000000.00', '00000002.50-', '00000000.00', '00000000.00'),
+    ])
+def test_roosevelt_past_due(parts):
+    """Roosevelt past due amounts as Decimal gave them, including a negative zero sum."""
+    bill = dict(zip(('prevbalamt', 'curperamt', 'adj_amt', 'pen_amt'), parts))
+    assert roosevelt.post_processing(bill)['past_due_amt'] == roosevelt_format_currency(*parts)
+
+
+@pytest.mark.parametrize('amount, cents', [
+    ('', 0), ('0', 0), ('.', 0), ('1.005', 100), ('1.015', 102), ('-2.5E1', -2500), (' 3.10 ', 310)])
+def test_unusual_amounts(amount, cents):
+    """Unusual amounts rounded to cents as Decimal 0.2f formatting rounds."""
+    assert to_cents(amount) == cents
@@ -0,0 +1,101 @@
+"""Test zipped files transformed in parallel give the same results in order."""
+
+
+import logging
+import pickle
+import zipfile
+from pathlib import Path
+
+import app_modules.utilities as utils
+from transforms import row_executor, transform_file
+from transforms.transform_registry import REGISTRY
+
+
+TEST_DATA = Path('tests/data/transform_data')
+
+
+def transform(zip_name, client, out_name):
+    """Transform test zip file returning result member names & contents."""
+    with zipfile.ZipFile(zip_name) as in_zip, \
+            zipfile.ZipFile(out_name, 'w') as out_zip:
+        transform_file.process_files(in_zip, out_zip, REGISTRY.load(client))
+    with zipfile.ZipFile(out_name) as out_zip:
+        assert out_zip.testzip() is None  # CRCs of appended members are right
+        return [(x, out_zip.read(x)) for x in out_zip.namelist()]
+
+
+def test_parallel_same_as_sequential(tmp_path, monkeypatch):
+    """Members transformed by workers match converting them one at a time."""
+    frederick = tmp_path / 'frederick.zip'  # as if all sent in one zip file
+    with zipfile.ZipFile(frederick, 'w', zipfile.ZIP_DEFLATED) as all_zip:
+        for part in ('water', 'non water', 'shutoffs'):
+            with zipfile.ZipFile(TEST_DATA / f'frederick {part}.zip') as part_zip:
+                for name in part_zip.namelist():
+                    all_zip.writestr(name, part_zip.read(name))
+    for zip_name, client in ((TEST_DATA / 'elko.zip', 'elko'), (frederick, 'frederick')):
+        sequential = transform(zip_name, client, tmp_path / 'sequential.zip')
+        monkeypatch.setattr(transform_file, 'PARALLEL_MIN', 0)
+        monkeypatch.setattr(transform_file.os, 'cpu_count', lambda: 4)
+        parallel = transform(zip_name, client, tmp_path / 'parallel.zip')
+        monkeypatch.undo()
+        assert parallel == sequential
+
+
+def test_job_share(tmp_path, monkeypatch):
+    """Members transformed in turn when job's share of the CPUs is one."""
+    monkeypatch.setattr(transform_file, 'PARALLEL_MIN', 0)
+    monkeypatch.setattr(transform_file.os, 'cpu_count', lambda: 4)
+    monkeypatch.setenv(row_executor.WORKERS_ENV, '1')
+    pools = []
+    monkeypatch.setattr(transform_file, 'process_files_parallel', lambda *args: pools.append(args))
+    transform(TEST_DATA / 'elko.zip', 'elko', tmp_path / 'sequential.zip')
+    assert not pools
+    monkeypatch.setenv(row_executor.WORKERS_ENV, '2')
+    transform(TEST_DATA / 'elko.zip', 'elko', tmp_path / 'parallel.zip')
+    assert pools[0][3] == 2  # workers
+
+
+LOGGING_CLIENT = '''
+import app_modules.utilities as utils
+
+
+def transform_data(csv_w, source_text):
+    utils.logger.info('Read %d lines', len(list(source_text)))
+    try:
+        int('x')
+    except ValueError:
+        utils.logger.info('Bad amount', exc_info=True)
+    return 0
+'''
+
+
+class Captured(logging.Handler):
+    """Formatted records, as the log file handler formats them."""
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(type(utils.logger).CustomFormatter(
+            fmt='[%(caller_name)s:%(caller_lineno)d] %(message)s'))
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def test_worker_log_records(tmp_path, monkeypatch):
+    """Worker's log records logged by parent keep where they were logged & tracebacks."""
+    (tmp_path / 'logging_client.py').write_text(LOGGING_CLIENT, encoding='utf8')
+    monkeypatch.syspath_prepend(tmp_path)
+    zip_name = tmp_path / 'client.zip'
+    with zipfile.ZipFile(zip_name, 'w') as client_zip:
+        client_zip.writestr('bills.csv', 'one\ntwo')
+    result = transform_file.transform_member_worker(str(zip_name), 'bills.csv', 'logging_client')
+    records = pickle.loads(pickle.dumps(result.records))  # as sent from worker process
+
+    captured = Captured()
+    monkeypatch.setattr(utils.logger.logger, 'handlers', [captured])  # not to test log file
+    for record in records:
+        utils.logger.handle(record)
+    assert captured.lines[0] == '[logging_client:6] Read 2 lines'
+    assert captured.lines[1].startswith('[logging_client:10] Bad amount\nTraceback')
+    assert captured.lines[1].endswith("ValueError: invalid literal for int() with base 10: 'x'")
@@ -0,0 +1,149 @@
+"""Test rows of line per record clients transformed in worker processes."""
+
+
+import csv
+import io
+import zipfile
+from concurrent.futures import Future
+from functools import partial
+
+import pytest
+
+import transforms.client_transforms.charlevoix_transform as charlevoix
+import transforms.client_transforms.eagle_mtn_transform as eagle_mtn
+import transforms.row_executor as row_executor
+from app_modules import fixed_width
+from app_modules.line_stream import LineStream
+from transforms.row_executor import FixedRecords
+
+
+TRANSFORM_DATA = 'tests/data/transform_data/'
+LAYOUT = [('name', 0, 4, 4), ('amount', 4, 9, 5), ('paperless', 9, 10, 1)]
+RECORDS = b''.join(f'n{idx:03d}{idx:5d}{"FT"[idx % 3 == 0]}\n'.encode() for idx in range(300))
+ENGINES = [
+    'python',
+    pytest.param('numpy', marks=pytest.mark.skipif(fixed_width.np is None, reason='NumPy not installed')),
+    ]
+
+
+def transformed(custom, zip_name):
+    """Output of custom transform_data for zipped file, and rows written."""
+    output = io.StringIO()
+    with zipfile.ZipFile(TRANSFORM_DATA + zip_name) as in_zip:
+        name = in_zip.namelist()[0]
+        count = custom.transform_data(
+            csv.writer(output, delimiter='\t', lineterminator='\n'),
+            LineStream(partial(in_zip.open, name)))
+    return output.getvalue(), count
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('custom, zip_name', [
+    (charlevoix, 'charlevoix fixed_length.zip'),
+    (charlevoix, 'charlevoix tsv_eor.zip'),
+    (eagle_mtn, 'eagle_mtn.zip'),
+    ])
+def test_same_output(monkeypatch, custom, zip_name, engine):
+    """Output & count the same whether rows transformed in workers (with either engine) or not."""
+    monkeypatch.setenv(row_executor.WORKERS_ENV, '1')
+    monkeypatch.setenv('FM_FIXED_ENGINE', 'python')
+    expected = transformed(custom, zip_name)
+    monkeypatch.setenv('FM_FIXED_ENGINE', engine)
+    monkeypatch.setenv(row_executor.WORKERS_ENV, '2')
+    monkeypatch.setattr(row_executor, 'CHUNK_SIZE', 100_000)  # several chunks
+    assert transformed(custom, zip_name) == expected
+    assert expected[1] > 0
+
+
+@pytest.mark.parametrize('data', [
+    b'one\r\ntwo\r\nthree\r\n', b'one\ntwo\nthree', b'one', b'', b'one\r\ntwo\nlf\r\n'])
+@pytest.mark.parametrize('chunk_size', [1, 4, 100])
+def test_line_chunks(data, chunk_size):
+    """Chunks are whole lines, giving the lines LineStream does."""
+    source = LineStream(partial(io.BytesIO, data))
+    lines = []
+    for chunk, newline in row_executor.line_chunks(source, chunk_size):
+        lines.extend(chunk.decode().split(newline))
+    assert lines == list(source)
+
+
+def failing_row(row):
+    """Row function that fails on a bad row."""
+    if row == 'bad':
+        raise ValueError(row)
+    return [row]
+
+
+def test_worker_error(monkeypatch):
+    """Row function error in worker raised by transform_rows."""
+    monkeypatch.setenv(row_executor.WORKERS_ENV, '2')
+    monkeypatch.setattr(row_executor, 'CHUNK_SIZE', 8)
+    source = LineStream(partial(io.BytesIO, b'good\n' * 20 + b'bad\n' + b'good\n' * 20))
+    with pytest.raises(ValueError, match='bad'):
+        row_executor.transform_rows(csv.writer(io.StringIO()), source, failing_row)
+
+
+class InlineExecutor:
+    """ProcessPoolExecutor stand in running chunks in this process, to see how they are read."""
+
+    def __init__(self, max_workers, mp_context):
+        self.max_workers = max_workers
+        self.mp_context = mp_context
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, function, *args):
+        """Future of function's result."""
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+
+def fixed_transformed(fixed):
+    """Output & count of RECORDS' fields transformed with fixed."""
+    output = io.StringIO()
+    count = row_executor.transform_rows(
+        csv.writer(output, lineterminator='\n'), LineStream(partial(io.BytesIO, RECORDS)),
+        list, fixed=fixed)
+    return output.getvalue(), count
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_fixed_records(monkeypatch, engine, workers):
+    """Fixed length records' wanted fields are the same with either engine & any workers."""
+    monkeypatch.setenv('FM_FIXED_ENGINE', engine)
+    monkeypatch.setenv(row_executor.WORKERS_ENV, workers)
+    monkeypatch.setattr(row_executor, 'CHUNK_SIZE', 1000)  # several chunks
+    expected = ''.join(
+        f'n{idx:03d},{idx},F\n' for idx in range(300) if idx % 3)
+    assert fixed_transformed(FixedRecords(LAYOUT, (LAYOUT[2], 'F'))) == (expected, 200)
+
+
+@pytest.mark.skipif(fixed_width.np is None, reason='NumPy not installed')
+def test_numpy_in_workers(monkeypatch):
+    """With several workers each chunk's records are read as arrays.
+
+    Workers are given the engine chosen when the file is transformed (they
+    may have been started with another FM_FIXED_ENGINE).
+    """
+    monkeypatch.delenv('FM_FIXED_ENGINE', raising=False)
+    monkeypatch.setenv(row_executor.WORKERS_ENV, '2')
+    monkeypatch.setattr(row_executor, 'CHUNK_SIZE', 1000)
+    monkeypatch.setattr(row_executor, 'ProcessPoolExecutor', InlineExecutor)
+    assert fixed_width.numpy_engine() and row_executor.worker_count() > 1
+    array_chunks = []
+    array_fields = fixed_width._array_fields  # pylint: disable=W0212:protected-access
+    monkeypatch.setattr(fixed_width, '_array_fields', lambda *args: array_chunks.append(
+        len(args[0])) or array_fields(*args))
+    fixed = FixedRecords(LAYOUT, (LAYOUT[2], 'F'))
+    output = fixed_transformed(fixed)
+    assert sum(array_chunks) == 300 and len(array_chunks) > 1  # every chunk as arrays
+
+    array_chunks.clear()
+    assert fixed_transformed(FixedRecords(LAYOUT, fixed.where, use_numpy=False)) == output
+    assert not array_chunks
@@ -0,0 +1,39 @@
+"""Test Prometheus text file metrics exported by dispatcher."""
+
+
+from app_modules.textfile_metrics import Registry
+
+
+def test_exposition(tmp_path):
+    """Counters & histograms are written in text exposition format."""
+    stats = Registry()
+    seen = stats.counter('fm_seen_total', 'Files seen.')
+    jobs = stats.counter('fm_jobs_total', 'Jobs by program.', ('program',))
+    duration = stats.histogram('fm_duration_seconds', 'Job time.', (1, 5), ('client',))
+    seen.inc()
+    seen.inc()
+    jobs.inc('transforms/transform_file')
+    for secs in (0.5, 2, 9):
+        duration.observe(secs, 'elko')
+    metrics_file = tmp_path / 'fm.prom'
+    stats.write(metrics_file)
+    lines = metrics_file.read_text(encoding='utf8').splitlines()
+    assert lines[:3] == ['# HELP fm_seen_total Files seen.', '# TYPE fm_seen_total counter',
+                         'fm_seen_total 2']
+    assert 'fm_jobs_total{program="transforms/transform_file"} 1' in lines
+    assert lines[-5:] == [
+        'fm_duration_seconds_bucket{client="elko",le="1.0"} 1',
+        'fm_duration_seconds_bucket{client="elko",le="5.0"} 2',
+        'fm_duration_seconds_bucket{client="elko",le="+Inf"} 3',
+        'fm_duration_seconds_sum{client="elko"} 11.5',
+        'fm_duration_seconds_count{client="elko"} 3',
+        ]
+    assert [x.name for x in tmp_path.iterdir()] == ['fm.prom']  # no temp file left
+
+
+def test_label_escaping():
+    """Quotes and backslashes in label values are escaped."""
+    stats = Registry()
+    jobs = stats.counter('fm_jobs_total', 'Jobs.', ('file',))
+    jobs.inc('say "hi"\\')
+    assert 'fm_jobs_total{file="say \\"hi\\"\\\\"} 1' in stats.exposition()
@@ -0,0 +1,52 @@
+"""Test client transform registry discovery, lazy loading and reloading."""
+
+
+import os
+import sys
+
+from transforms.transform_registry import TransformRegistry
+
+
+def test_client_input_kinds():
+    """Transforms are found with their input kinds without importing them."""
+    registry = TransformRegistry()
+    kinds = registry.input_kinds()
+    assert kinds['elko'] == 'xml'
+    assert kinds['charlevoix'] == 'fixed-length'
+    assert kinds['eagle_mtn'] == 'csv'
+    assert kinds['waterford'] == 'multi-line csv'
+    assert kinds['discovery'] == 'xml'  # tyler_tech clone
+    assert 'hlap' not in kinds  # no transform_data, converted by hlap_cnvrt
+    assert registry.get('nowhere') is None
+
+
+def test_lazy_load_and_reload(tmp_path, monkeypatch):
+    """Module imported when first needed, then only reloaded when changed."""
+    package = tmp_path / 'fm_registry_test'
+    (package / 'ancillaries').mkdir(parents=True)
+    (package / '__init__.py').write_text('', encoding='utf8')
+    (package / 'ancillaries' / '__init__.py').write_text('', encoding='utf8')
+    source = package / 'alpha_transform.py'
+    source.write_text(
+        "INPUT_KIND = 'csv'\nVERSION = 1\ndef transform_data(csv_w, source_text):\n    return 0\n",
+        encoding='utf8')
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = TransformRegistry(package, 'fm_registry_test.')
+    assert registry.get('alpha').module is None
+    assert 'fm_registry_test.alpha_transform' not in sys.modules
+    module = registry.load('alpha')
+    assert module.VERSION == 1 and registry.load('alpha') is module
+
+    source.write_text(source.read_text(encoding='utf8').replace('1', '2'), encoding='utf8')
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert registry.load('alpha').VERSION == 2
+
+    (package / 'beta_transform.py').write_text(
+        "INPUT_KIND = 'xml'\ndef transform_data(csv_w, source_text):\n    return 0\n",
+        encoding='utf8')
+    stat = package.stat()
+    os.utime(package, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert registry.get('beta').input_kind == 'xml'  # found by rescan
+    assert registry.get('alpha').module.VERSION == 2  # loaded module kept
@@ -2,6 +2,10 @@
 
 # flake8: noqa: E501 Line to long
 
+import tracemalloc
+import xml.etree.ElementTree as et  # noqa
+
+from app_modules import xml_stream
 import transforms.client_transforms.tyler_tech_xml as ttx
 
 
@@ -77,3 +81,73 @@ https://www.frederickco.gov/ArchiveCenter/ViewFile/Item/1325</BillComment>
 
     assert len(comments) == 5
     assert not comments[2]
+
+
+class GeneratedBills:
+    """Re-iterable bill extract lines with number of accounts (never all in memory)."""
+
+    def __init__(self, accounts):
+        self.accounts = accounts
+
+    def __iter__(self):
+        yield '<?xml version="1.0"?>'
+        yield '<BillExtract>'
+        yield '<BillComments><BillComment>Thank you</BillComment></BillComments>'
+        yield '<Accounts>'
+        for number in range(self.accounts):
+            yield f'<Account No="{number:06}" Status="Active" Name="  Resident {number}  ">'
+            yield '<Meter Read="1234"/><Cons><Year ' + ' '.join(
+                f'{month}="{number % 97}"' for month in ttx.months) + '/></Cons>'
+            yield '</Account>'
+        yield '</Accounts>'
+        yield '</BillExtract>'
+
+
+def test_streamed_accounts(monkeypatch):
+    """Accounts extracted in order however source is fed to parser."""
+    extract = {'No': 'acct', 'Name': 'name', 'Read': 'read?'}
+    expected = list(ttx.SourceXML(GeneratedBills(50), extract).traverse_xml())
+    assert len(expected) == 50
+    assert expected[7] == {
+        'acct': '000007', 'name': 'Resident 7', 'read?': ['1234'], ttx.CONS_KEY: ['7'] * 12}
+    monkeypatch.setattr(xml_stream, 'FEED_SIZE', 10)
+    source = ttx.SourceXML(GeneratedBills(50), extract)
+    assert source.comments == ['Thank you']
+    assert list(source.traverse_xml()) == expected
+    assert list(source.traverse_xml()) == expected  # source read again
+
+
+def test_memory_flat():
+    """Peak memory does not grow with number of accounts."""
+    def peak(accounts):
+        source = ttx.SourceXML(GeneratedBills(accounts), {'No': 'acct'})
+        tracemalloc.start()
+        for _ in source.traverse_xml():
+            pass
+        size = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return size
+
+    assert peak(20_000) < 2 * peak(2_000)
+
+
+def test_extract_plan():
+    """Compiled plan finds attributes and tag text in field map order."""
+    plan = ttx.compile_extract((('Amount', 'amount_?'), ('Read', 'read'), ('Usage', 'usage?')))
+    element = et.fromstring('<Usage Read="12" Amount="3.50">40</Usage>')
+    assert list(plan.matches(element)) == [
+        ('amount_?', 'Amount', '3.50'), ('read', 'Read', '12'), ('usage?', 'Usage', '40')]
+    assert list(plan.matches(et.fromstring('<Meter Other="1"/>'))) == []
+
+
+def test_binary_source():
+    """Bytes parsed using their encoding declaration, same as text lines."""
+    lines = list(GeneratedBills(3))
+    lines[0] = '<?xml version="1.0" encoding="ISO-8859-1"?>'
+    lines[2] = '<BillComments><BillComment>Merci, café</BillComment></BillComments>'
+    source = xml_stream.XMLSource.from_bytes('\r\n'.join(lines).encode('latin-1'))
+    assert xml_stream.root_tag(source) == 'BillExtract'
+    binary = ttx.SourceXML(source, {'No': 'acct', 'Name': 'name'})
+    text = ttx.SourceXML(lines[1:], {'No': 'acct', 'Name': 'name'})
+    assert binary.comments == text.comments == ['Merci, café']
+    assert list(binary.traverse_xml()) == list(text.traverse_xml())
@@ -0,0 +1,101 @@
+"""Test warm worker processes running dispatched programs."""
+
+
+import os
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app_modules import job_metrics, worker_pool
+from app_modules.worker_pool import (
+    ROW_WORKERS_ENV, WorkerPool, call_program, cpu_share, init_worker, run_job)
+
+
+TEST_DATA = Path('tests/data')
+TRANSFORM = 'transforms/transform_file'
+
+
+def test_init_worker(monkeypatch):
+    """Programs imported once, ready to run."""
+    monkeypatch.setattr(worker_pool, 'WARM', {})
+    monkeypatch.setenv(ROW_WORKERS_ENV, '2')  # set for dispatcher
+    init_worker(3)
+    assert os.environ[ROW_WORKERS_ENV] == '2'
+    for program in (TRANSFORM, 'transforms/hlap_cnvrt', 'dupes_sorting/sort_multiples'):
+        assert callable(worker_pool.WARM[program].run)
+    monkeypatch.delenv(ROW_WORKERS_ENV)
+    init_worker(3)
+    assert os.environ[ROW_WORKERS_ENV] == '3'
+
+
+def test_cpu_share(monkeypatch):
+    """Jobs run at the same time share the CPUs, at least one worker each."""
+    monkeypatch.setattr(os, 'cpu_count', lambda: 8)
+    assert [cpu_share(x) for x in (1, 2, 3, 8, 16)] == [8, 4, 2, 1, 1]
+    monkeypatch.setattr(os, 'cpu_count', lambda: None)
+    assert cpu_share(4) == 1
+
+
+def test_pool_row_workers(monkeypatch):
+    """Jobs in pool use its share of the CPUs for their worker processes."""
+    monkeypatch.setattr(worker_pool, 'ProcessPoolExecutor', lambda **kwargs: kwargs)
+    monkeypatch.setattr(os, 'cpu_count', lambda: 8)
+    assert WorkerPool(2).executor['initargs'] == (4,)
+    assert WorkerPool().executor['initargs'] == (1,)  # one worker per CPU
+
+
+def failing(status):
+    """Program whose run() ends as status (exception raised if one given)."""
+    def run(*_):
+        if isinstance(status, BaseException):
+            raise status
+        return status
+    return SimpleNamespace(run=run)
+
+
+@pytest.mark.parametrize('status, expected', [
+    (None, 0), (2, 2), (SystemExit(3), 3), (SystemExit('no such city'), 1), (ValueError('bad'), 1)])
+def test_call_program(tmp_path, monkeypatch, status, expected):
+    """Program gives the exit status it would have given as a script."""
+    monkeypatch.setitem(worker_pool.WARM, 'failing', failing(status))
+    (tmp_path / 'elko.zip').write_bytes(b'bills')
+    assert call_program('failing', 'elko', 'zip', 'elko.zip', f'{tmp_path}/') == expected
+
+
+def test_run_job(tmp_path, monkeypatch):
+    """Failing job's status & resources used returned, records file only set for job."""
+    seen = []
+    def run(*_):
+        seen.append(os.environ.get(job_metrics.RECORDS_ENV))
+        raise SystemExit(4)
+    monkeypatch.setitem(worker_pool.WARM, 'failing', SimpleNamespace(run=run))
+    (tmp_path / 'elko.zip').write_bytes(b'bills')
+    status, usage = run_job('failing', 'elko', 'zip', 'elko.zip', f'{tmp_path}/', 'records.txt')
+    assert status == 4 and usage.wall >= 0
+    assert seen == ['records.txt'] and job_metrics.RECORDS_ENV not in os.environ
+
+
+def test_pool(tmp_path):
+    """Files run through each program's run() in a worker process."""
+    shutil.copyfile(TEST_DATA / 'transform_data' / 'elko.zip', tmp_path / 'elko.zip')
+    shutil.copyfile(TEST_DATA / 'archive' / 'hlap Jan 25 CYCLE 2.TXT', tmp_path / 'hlap Jan 25 CYCLE 2.TXT')
+    (tmp_path / 'nowhere.zip').write_bytes(b'not a zip')
+    records_file = tmp_path / 'records'
+    jobs = [
+        (TRANSFORM, 'elko', 'zip', 'elko.zip', str(records_file)),
+        (TRANSFORM, 'nowhere', 'zip', 'nowhere.zip', None),
+        ('transforms/hlap_cnvrt', 'hlap', 'TXT', 'hlap Jan 25 CYCLE 2.TXT', None),
+        ('dupes_sorting/sort_multiples', 'nowhere', 'csv', 'nowhere dupes.csv', None),
+        ]
+    with WorkerPool(1) as pool:
+        futures = [
+            pool.submit(program, cname, ftype, fname, f'{tmp_path}/', records)
+            for program, cname, ftype, fname, records in jobs
+            ]
+        statuses = [x.result()[0] for x in futures]
+    assert statuses == [0, 1, 0, 1]  # unknown client & unregistered dupes fail
+    assert job_metrics.read_records(str(records_file)) > 0
+    assert {'fxd elko.zip', 'fxd hlap Jan 25 CYCLE 2_PRN.csv', 'fxd hlap Jan 25 CYCLE 2_PDF.csv'} \
+        <= {x.name for x in tmp_path.iterdir()}
@@ -0,0 +1,65 @@
+"""Test XML read one element at a time with each available XML backend."""
+
+
+import importlib.util
+import logging
+import sys
+
+import pytest
+
+from app_modules import xml_stream
+
+
+XML = b'''<?xml version="1.0" encoding="ISO-8859-1"?>
+<!-- extract comment -->
+<BillExtract>
+<BillComments><BillComment>Caf\xe9 open</BillComment></BillComments>
+<Accounts>
+<Account No="1"><Service Ty="Meter"><?pi data?><Read>10</Read></Service></Account>
+<Account No="2"><!-- no service --></Account>
+</Accounts>
+</BillExtract>
+'''
+BACKENDS = [x for x in xml_stream.BACKENDS if x != 'lxml' or xml_stream.lxml_etree]
+
+
+@pytest.fixture(params=BACKENDS)
+def source(request):
+    """XML test bills parsed by each backend."""
+    previous = xml_stream.BACKEND
+    xml_stream.use_backend(request.param)
+    yield xml_stream.XMLSource.from_bytes(XML)
+    xml_stream.use_backend(previous)
+
+
+def test_elements(source):
+    """Same elements (without comments or processing instructions) from each backend."""
+    assert xml_stream.root_tag(source) == 'BillExtract'
+    comments = xml_stream.leading_elements(source, 'BillComments/BillComment', 'Accounts')
+    assert [x.text for x in comments] == ['Café open']
+    accounts = [
+        (x.attrib['No'], [(y.tag, dict(y.attrib), y.text) for y in x.iter()][1:])
+        for x in xml_stream.iter_elements(source, 'Accounts/Account')]
+    assert accounts == [
+        ('1', [('Service', {'Ty': 'Meter'}, None), ('Read', {}, '10')]), ('2', [])]
+    assert xml_stream.parse_root(source).findtext('Accounts/Account/Service/Read') == '10'
+
+
+def test_unknown_backend():
+    """Backend must be one of BACKENDS."""
+    with pytest.raises(ValueError):
+        xml_stream.use_backend('sax')
+
+
+def test_lxml_missing(monkeypatch, caplog):
+    """Without lxml, FM_XML_BACKEND=lxml logs a warning and parses with etree."""
+    monkeypatch.setitem(sys.modules, 'lxml', None)  # import lxml raises ImportError
+    monkeypatch.setenv(xml_stream.BACKEND_ENV, 'lxml')
+    spec = importlib.util.spec_from_file_location('xml_stream_no_lxml', xml_stream.__file__)
+    no_lxml = importlib.util.module_from_spec(spec)
+    with caplog.at_level(logging.WARNING):
+        spec.loader.exec_module(no_lxml)  # as transform_file importing it
+    assert no_lxml.lxml_etree is None and no_lxml.BACKEND == 'etree'
+    assert 'lxml XML backend is not installed' in caplog.text
+    assert no_lxml.parse_root(no_lxml.XMLSource.from_bytes(XML)).findtext(
+        'Accounts/Account/Service/Read') == '10'
@@ -0,0 +1,45 @@
+"""Test selecting zip compression presets for output archives."""
+
+
+import tarfile
+import types
+import zipfile
+
+import pytest
+
+import app_modules.utilities as utils
+from app_modules.zip_compression import PRESETS, ZSTD_AVAILABLE, client_compression, get_compression
+
+
+def test_presets():
+    """Presets by name, client module constant or default."""
+    assert get_compression() == get_compression('default') == client_compression(types.ModuleType('x'))
+    assert get_compression('fast').level == 1
+    assert client_compression(types.SimpleNamespace(COMPRESSION='stored')).method == zipfile.ZIP_STORED
+    with pytest.raises(ValueError):
+        get_compression('zip')
+
+
+@pytest.mark.parametrize('preset', list(PRESETS))
+def test_archive_files(tmp_path, preset):
+    """Archived files compressed as chosen and removed."""
+    (tmp_path / 'archive').mkdir()
+    (tmp_path / 'bills.csv').write_text('acct\tamount\n' * 100, encoding='utf8')
+    utils.archive_files(['bills.csv'], f'{tmp_path}/', f'{tmp_path}/', compression=preset)
+    with zipfile.ZipFile(tmp_path / 'archive' / 'bills.zip') as zip_file:
+        assert zip_file.getinfo('bills.csv').compress_type == PRESETS[preset].method
+        assert zip_file.read('bills.csv') == b'acct\tamount\n' * 100
+    assert not (tmp_path / 'bills.csv').exists()
+
+
+def test_archive_tar_zst(tmp_path):
+    """tar.zst archives need Python 3.14."""
+    (tmp_path / 'archive').mkdir()
+    (tmp_path / 'bills.csv').write_text('acct\tamount\n', encoding='utf8')
+    if not ZSTD_AVAILABLE:
+        with pytest.raises(ValueError):
+            utils.archive_files(['bills.csv'], f'{tmp_path}/', f'{tmp_path}/', archive_format='tar.zst')
+        return
+    utils.archive_files(['bills.csv'], f'{tmp_path}/', f'{tmp_path}/', archive_format='tar.zst')
+    with tarfile.open(tmp_path / 'archive' / 'bills.tar.zst') as tar_file:
+        assert tar_file.extractfile('bills.csv').read() == b'acct\tamount\n'
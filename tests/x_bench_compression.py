@@ -0,0 +1,80 @@
+"""
+Compare zip compression presets (and .tar.zst) on a transformed client file.
+
+Run from repo root:
+    FM_FILES=tests PYTHONPATH=.:src python tests/x_bench_compression.py [zip]
+Default input is charlevoix's fixed-length test file, transformed once and
+then compressed with each preset.
+"""
+
+
+import io
+import sys
+import tarfile
+import time
+import zipfile
+from pathlib import Path
+
+from app_modules import zip_compression
+from transforms import transform_file
+from transforms.transform_registry import REGISTRY
+
+
+SOURCE = Path(sys.argv[1] if len(sys.argv) > 1 else
+              'tests/data/transform_data/charlevoix fixed_length.zip')
+REPEAT = 3
+
+
+def transformed():
+    """Transformed contents of each zipped file in SOURCE."""
+    custom = REGISTRY.load(SOURCE.stem.split()[0])
+    results = io.BytesIO()
+    with zipfile.ZipFile(SOURCE) as in_zip, zipfile.ZipFile(results, 'w') as out_zip:
+        transform_file.process_files(in_zip, out_zip, custom)
+    with zipfile.ZipFile(results) as result_zip:
+        return {x: result_zip.read(x) for x in result_zip.namelist()}
+
+
+def timed(write):
+    """Best time of REPEAT writes and archive size."""
+    best = None
+    for _ in range(REPEAT):
+        archive = io.BytesIO()
+        start = time.perf_counter()
+        write(archive)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, archive.getbuffer().nbytes
+
+
+def zip_writer(data, compression):
+    def write(archive):
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            for name, content in data.items():
+                zip_file.writestr(name, content, **compression.kwargs())
+    return write
+
+
+def tar_zst_writer(data, level):
+    def write(archive):
+        with tarfile.open(fileobj=archive, mode='w:zst', level=level) as tar_file:
+            for name, content in data.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                tar_file.addfile(info, io.BytesIO(content))
+    return write
+
+
+if __name__ == '__main__':
+    data = transformed()
+    size = sum(len(x) for x in data.values())
+    print(f'{SOURCE.name}: {len(data)} file(s), {size:,} bytes transformed')
+    print(f'{"preset":<12}{"seconds":>10}{"bytes":>14}{"ratio":>8}')
+    rows = [(name, zip_writer(data, preset)) for name, preset in zip_compression.PRESETS.items()]
+    if zip_compression.ZSTD_AVAILABLE:
+        rows += [(f'tar.zst {x}', tar_zst_writer(data, x)) for x in (3, zip_compression.ZSTD_LEVEL)]
+    else:
+        print('(tar.zst needs Python 3.14)')
+    for name, write in rows:
+        seconds, archive_size = timed(write)
+        print(f'{name:<12}{seconds:>10.3f}{archive_size:>14,}{size / archive_size:>8.1f}')
@@ -0,0 +1,63 @@
+"""
+Time Eagle Mountain rows, compiled column plan against separate passes.
+
+Run from repo root:
+    PYTHONPATH=.:src python tests/x_bench_eagle_plan.py
+Uses the eagle_mtn test file.
+"""
+
+
+import csv
+import decimal
+import timeit
+import zipfile
+from functools import partial
+
+import transforms.client_transforms.eagle_mtn_transform as eagle_mtn
+from transforms.client_transforms.eagle_mtn_transform import (
+    ACC_NUM, COLS_TO_BLANK, CURR_BILL, CURR_USAGE_COLS, HIST_USAGE_COLS, METER_DATA_COLS,
+    NEW_AMT_POS, PAY_AMT, SEQ_NUM, TOTAL_BAL)
+
+
+SOURCE = 'tests/data/transform_data/eagle_mtn.zip'
+NUMBER = 20
+
+
+def passes_row(row, col_count):
+    """Row as it was transformed, Decimal amounts & a pass per operation."""
+    if col_count > 209:
+        row = row[:52] + row[55:]
+    past_due_amt = decimal.Decimal(row[TOTAL_BAL]) - decimal.Decimal(row[CURR_BILL])
+    row[ACC_NUM] = f'{int(row[ACC_NUM]):06d}'
+    row[SEQ_NUM] = f'{int(row[SEQ_NUM]):03d}'
+    row[PAY_AMT] = f'{row[PAY_AMT]}CR' if row[PAY_AMT] > '0' else ''
+    row[NEW_AMT_POS] = f'{max(past_due_amt, 0):9.2f}'.strip()
+    for col in range(CURR_USAGE_COLS[0], CURR_USAGE_COLS[1] + 1):
+        if row[col]:
+            row[col] = f'{int(float(row[col])):d}'
+    for col in range(HIST_USAGE_COLS[0], HIST_USAGE_COLS[1] + 1):
+        if row[col]:
+            row[col] = f'{int(float(row[col])):d}'
+    row = ['' if i in COLS_TO_BLANK else x for i, x in enumerate(row)]
+    row = ['' if x == '0.00' else x for x in row]
+    return ['' if i in METER_DATA_COLS and x == '0' else x for i, x in enumerate(row)]
+
+
+if __name__ == '__main__':
+    with zipfile.ZipFile(SOURCE) as in_zip:
+        lines = in_zip.read(in_zip.namelist()[0]).decode('utf8').split('\r\n')
+    rows = [x for x in csv.reader(lines) if x]
+    col_count = len(rows[0])
+    cases = {
+        'passes': partial(passes_row, col_count=col_count),
+        'plan': partial(eagle_mtn.transform_row, col_count=col_count),
+        }
+    assert [cases['passes'](list(x)) for x in rows] == [cases['plan'](list(x)) for x in rows]
+    print(f'{len(rows)} rows of {col_count} columns')
+    times = {
+        name: min(timeit.repeat(lambda f=function: [f(list(x)) for x in rows], number=NUMBER, repeat=5))
+        for name, function in cases.items()
+        }
+    for name, seconds in times.items():
+        print(f'{name:<7} {seconds * 1e6 / len(rows) / NUMBER:6.1f}us per row')
+    print(f'plan {times["passes"] / times["plan"]:.1f}x')
@@ -0,0 +1,43 @@
+"""
+Time reading fixed length records line by line against NumPy arrays.
+
+Run from repo root (NumPy installed):
+    PYTHONPATH=.:src python tests/x_bench_fixed_numpy.py
+Uses the charlevoix fixed_length test file's records repeated COPIES times.
+"""
+
+
+import io
+import os
+import timeit
+import zipfile
+
+import transforms.client_transforms.ancillaries.charlevoix_fields as fields
+import app_modules.fixed_width as fixed_width
+
+
+SOURCE = 'tests/data/transform_data/charlevoix fixed_length.zip'
+COPIES = 50
+WHERE = (fields.FIELDS[fields.PAPERLESS], 'F')
+
+
+def read_records(data, engine):
+    """Fields of records that aren't paperless read with engine."""
+    os.environ[fixed_width.ENGINE_ENV] = engine
+    return list(fixed_width.iter_fixed_records(io.BytesIO(data), fields.SELECTED, WHERE))
+
+
+if __name__ == '__main__':
+    with zipfile.ZipFile(SOURCE) as in_zip:
+        data = in_zip.read(in_zip.namelist()[0])
+    data = b'\r\n'.join([data] * COPIES)
+    records = data.count(b'\r\n') + 1
+    print(f'{records:,} records, {len(data) / 1e6:.0f}MB, {len(fields.SELECTED)} fields')
+    assert read_records(data, 'python') == read_records(data, 'numpy')
+    times = {
+        engine: min(timeit.repeat(lambda: read_records(data, engine), number=1, repeat=3))
+        for engine in ('python', 'numpy')
+        }
+    for engine, seconds in times.items():
+        print(f'{engine:<7} {seconds:6.2f}s {1e6 * seconds / records:7.1f}us per record')
+    print(f'numpy {times["python"] / times["numpy"]:.1f}x')
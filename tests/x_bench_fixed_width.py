@@ -0,0 +1,47 @@
+"""
+Time fixed width field extraction, generated extractor against field loop.
+
+Run from repo root:
+    PYTHONPATH=.:src python tests/x_bench_fixed_width.py
+Uses the charlevoix fixed_length test file (and a delimited copy of it).
+"""
+
+
+import timeit
+import zipfile
+
+import transforms.client_transforms.ancillaries.charlevoix_fields as fields
+from app_modules.fixed_width import compile_columns, compile_layout
+
+
+SOURCE = 'tests/data/transform_data/charlevoix fixed_length.zip'
+NUMBER = 20
+
+
+def loop_fields(row):
+    """Extraction as it was, slicing each selected field in turn."""
+    return [row[x[1]:x[2]].strip() for x in fields.SELECTED]
+
+
+def loop_columns(row):
+    """Delimited column selection as it was."""
+    return [x.strip() for idx, x in enumerate(row) if idx in fields.INCLUDE]
+
+
+if __name__ == '__main__':
+    with zipfile.ZipFile(SOURCE) as in_zip:
+        rows = [x for x in in_zip.read(in_zip.namelist()[0]).decode('utf8').split('\r\n') if x]
+    columns = [[row[x[1]:x[2]] for x in fields.FIELDS] for row in rows]
+    extract, select = compile_layout(fields.SELECTED), compile_columns(fields.INCLUDE)
+    cases = {
+        'fixed length': (loop_fields, extract, rows),
+        'delimited': (loop_columns, select, columns),
+    }
+    print(f'{len(rows)} records of {len(rows[0]):,} characters, {len(fields.SELECTED)} fields')
+    for name, (old, new, records) in cases.items():
+        assert [old(x) for x in records] == [new(x) for x in records]
+        old_time = min(timeit.repeat(lambda: [old(x) for x in records], number=NUMBER, repeat=5))
+        new_time = min(timeit.repeat(lambda: [new(x) for x in records], number=NUMBER, repeat=5))
+        per_record = 1e6 / len(records) / NUMBER
+        print(f'{name:<14} loop {old_time * per_record:7.1f}us  '
+              f'compiled {new_time * per_record:7.1f}us per record ({old_time / new_time:.1f}x)')
@@ -0,0 +1,70 @@
+"""
+Time & peak memory of reading fixed length records mapped or as streams.
+
+Run from repo root (NumPy installed for array reads):
+    PYTHONPATH=.:src python tests/x_bench_mapped_file.py
+Uses the charlevoix fixed_length test file's records repeated COPIES times,
+zipped stored (mapped) and deflated (streamed), and as LineStream lines.
+"""
+
+
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from functools import partial
+
+import transforms.client_transforms.ancillaries.charlevoix_fields as fields
+from app_modules.fixed_width import compile_layout, iter_fixed_records
+from app_modules.line_stream import LineStream
+from app_modules.mapped_file import map_member, open_source
+
+
+SOURCE = 'tests/data/transform_data/charlevoix fixed_length.zip'
+COPIES = 50
+PAPERLESS = fields.FIELDS[fields.PAPERLESS]
+
+
+def line_stream(in_zip, name):
+    """Records as charlevoix read them before, LineStream lines."""
+    extract = compile_layout(fields.SELECTED)
+    lines = LineStream(partial(in_zip.open, name))
+    return sum(1 for row in lines if row and row[PAPERLESS[1]] == 'F' and extract(row))
+
+
+def fixed_records(in_zip, name):
+    """Records read by iter_fixed_records, mapped if zipped file is stored."""
+    source = LineStream(partial(in_zip.open, name), mapper=partial(map_member, in_zip, name))
+    with open_source(source) as records:
+        return sum(1 for _ in iter_fixed_records(records, fields.SELECTED, (PAPERLESS, 'F')))
+
+
+def measure(read, zip_name, name):
+    """Seconds and peak traced MB (traced separately, tracing is slow) of reading zipped file."""
+    with zipfile.ZipFile(zip_name) as in_zip:
+        start = time.perf_counter()
+        count = read(in_zip, name)
+        seconds = time.perf_counter() - start
+        tracemalloc.start()
+        read(in_zip, name)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return count, seconds, peak / 1e6
+
+
+if __name__ == '__main__':
+    with zipfile.ZipFile(SOURCE) as in_zip:
+        data = b'\r\n'.join([in_zip.read(in_zip.namelist()[0])] * COPIES)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        zip_name = os.path.join(tmp_dir, 'records.zip')
+        with zipfile.ZipFile(zip_name, 'w') as out_zip:
+            out_zip.writestr('deflated.txt', data, zipfile.ZIP_DEFLATED, 1)
+            out_zip.writestr('stored.txt', data, zipfile.ZIP_STORED)
+        del data
+        print(f'{COPIES * 180:,} records of {len(fields.SELECTED)} fields')
+        for read in (line_stream, fixed_records):
+            for name in ('deflated.txt', 'stored.txt'):
+                count, seconds, peak = measure(read, zip_name, name)
+                print(f'{read.__name__:<14} {name:<13} {count:6,} selected '
+                      f'{seconds:6.2f}s  peak {peak:7.1f}MB')
@@ -0,0 +1,45 @@
+"""
+Time integer cents amounts against the Decimal conversions they replaced.
+
+Run from repo root:
+    PYTHONPATH=.:src:tests python tests/x_bench_money.py
+"""
+
+
+import timeit
+
+from app_modules.money import format_cents, to_cents
+from test_money import draper_clean_amount, roosevelt_format_currency, waterford_cnvt_amount
+
+
+AMOUNTS = [f'{x * 7919 % 10**8 // 100:011}.{x % 100:02}{"-" if x % 3 else ""}' for x in range(1000)]
+WATERFORD = [f'{x * 7919 % 10**7 / 100:,.2f}' for x in range(1000)]
+NUMBER = 20
+
+
+def cents_past_due():
+    for idx in range(0, len(AMOUNTS), 4):
+        format_cents(sum(map(to_cents, AMOUNTS[idx:idx + 4])), pad=False)
+
+
+def decimal_past_due():
+    for idx in range(0, len(AMOUNTS), 4):
+        roosevelt_format_currency(*AMOUNTS[idx:idx + 4])
+
+
+CASES = {
+    'draper clean_amount': (
+        lambda: [draper_clean_amount(x) for x in AMOUNTS],
+        lambda: [format_cents(to_cents(x)) for x in AMOUNTS]),
+    'waterford cnvt_amount': (
+        lambda: [waterford_cnvt_amount(x) for x in WATERFORD],
+        lambda: [format_cents(to_cents(x), thousands=True) for x in WATERFORD]),
+    'roosevelt past due': (decimal_past_due, cents_past_due),
+}
+
+
+if __name__ == '__main__':
+    for name, (with_decimal, with_cents) in CASES.items():
+        old = min(timeit.repeat(with_decimal, number=NUMBER, repeat=5))
+        new = min(timeit.repeat(with_cents, number=NUMBER, repeat=5))
+        print(f'{name:<24} Decimal {old * 1000:7.1f}ms  cents {new * 1000:7.1f}ms  ({old / new:.1f}x)')
@@ -0,0 +1,71 @@
+"""
+Time transforms with rows in worker processes against one process.
+
+Run from repo root:
+    PYTHONPATH=.:src python tests/x_bench_row_executor.py [workers]
+Uses the eagle_mtn and charlevoix test files' records repeated COPIES times
+(workers default to one per CPU, only faster with more than one CPU).
+"""
+
+
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from functools import partial
+
+import transforms.client_transforms.charlevoix_transform as charlevoix
+import transforms.client_transforms.eagle_mtn_transform as eagle_mtn
+import transforms.row_executor as row_executor
+from app_modules.line_stream import LineStream
+
+
+TRANSFORM_DATA = 'tests/data/transform_data/'
+COPIES = 20
+CASES = [
+    (eagle_mtn, 'eagle_mtn.zip'),
+    (charlevoix, 'charlevoix tsv_eor.zip'),
+    (charlevoix, 'charlevoix fixed_length.zip'),
+]
+
+
+def repeated(zip_name, tmp_dir):
+    """Zip file of test file's records repeated COPIES times."""
+    with zipfile.ZipFile(TRANSFORM_DATA + zip_name) as in_zip:
+        name = in_zip.namelist()[0]
+        data = in_zip.read(name)
+    newline = b'\r\n' if b'\r\n' in data else b'\n'
+    records = newline.join([data.rstrip(newline)] * COPIES)
+    repeated_name = os.path.join(tmp_dir, zip_name)
+    with zipfile.ZipFile(repeated_name, 'w', zipfile.ZIP_DEFLATED) as out_zip:
+        out_zip.writestr(name, records)
+    return repeated_name
+
+
+def run(custom, zip_name, workers):
+    """Seconds and output of transform with workers."""
+    os.environ[row_executor.WORKERS_ENV] = str(workers)
+    output = io.StringIO()
+    with zipfile.ZipFile(zip_name) as in_zip:
+        name = in_zip.namelist()[0]
+        start = time.perf_counter()
+        custom.transform_data(
+            csv.writer(output, delimiter='\t', lineterminator='\n'),
+            LineStream(partial(in_zip.open, name)))
+    return time.perf_counter() - start, output.getvalue()
+
+
+if __name__ == '__main__':
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    os.environ['FM_FIXED_ENGINE'] = 'python'
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for custom, zip_name in CASES:
+            repeated_name = repeated(zip_name, tmp_dir)
+            one_time, one_output = run(custom, repeated_name, 1)
+            many_time, many_output = run(custom, repeated_name, workers)
+            assert one_output == many_output
+            print(f'{zip_name:<28} 1 process {one_time:6.2f}s  '
+                  f'{workers} workers {many_time:6.2f}s ({one_time / many_time:.1f}x)')
@@ -0,0 +1,55 @@
+"""
+Time Tyler Tech XML extraction, compiled field plan against the old field loop.
+
+Run from repo root:
+    FM_FILES=tests PYTHONPATH=.:src python tests/x_bench_tyler_xml.py
+Times include parsing the XML.  Both ways must give the same data.
+"""
+
+
+import time
+import zipfile
+from functools import partial
+from pathlib import Path
+
+import transforms.client_transforms.ancillaries.roosevelt_fields as rf
+import transforms.client_transforms.tyler_tech_xml as ttx
+from app_modules.line_stream import LineStream
+
+
+SOURCE = Path('tests/data/transform_data/roosevelt.zip')
+
+
+class FieldLoopXML(ttx.SourceXML):
+    """Extraction as it was: every field map entry tested for every element."""
+
+    def extract_data(self, element):
+        if element.tag == 'Year':
+            for month in ttx.months:
+                self.cons_hist.insert(0, element.attrib[month])
+        else:
+            attribs = element.attrib
+            for attrib_req, csv_col in self.xml_extract.items():
+                if attrib_req in attribs:
+                    self._pack_data(csv_col, attrib_req, element.attrib[attrib_req])
+                elif attrib_req in element.tag:
+                    self._pack_data(csv_col, attrib_req, element.text)
+
+
+def timed(source_class, lines):
+    """Seconds to extract all bills and the bills extracted."""
+    start = time.perf_counter()
+    source = source_class(lines, rf.bill_extract, zero_balance=True)
+    bills = [dict(x) for x in source.traverse_xml()]
+    return time.perf_counter() - start, bills
+
+
+if __name__ == '__main__':
+    with zipfile.ZipFile(SOURCE) as in_zip:
+        for name in in_zip.namelist():
+            lines = list(LineStream(partial(in_zip.open, name)))
+            old_seconds, old_bills = timed(FieldLoopXML, lines)
+            new_seconds, new_bills = timed(ttx.SourceXML, lines)
+            assert new_bills == old_bills
+            print(f'{name}: {len(new_bills):,} bills, field loop {old_seconds:.2f}s, '
+                  f'compiled plan {new_seconds:.2f}s ({old_seconds / new_seconds:.1f}x)')
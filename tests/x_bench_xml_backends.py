@@ -0,0 +1,55 @@
+"""
+Records per second of each XML client transform with each XML backend.
+
+Run from repo root (lxml backend only timed if lxml is installed):
+    FM_FILES=tests PYTHONPATH=.:src python tests/x_bench_xml_backends.py
+Every backend must give the same output for each test file.
+"""
+
+
+import contextlib
+import csv
+import io
+import time
+import zipfile
+from pathlib import Path
+
+from app_modules import xml_stream
+from transforms import transform_file
+from transforms.transform_registry import REGISTRY
+
+
+TEST_DATA = Path('tests/data/transform_data')
+BACKENDS = [x for x in xml_stream.BACKENDS if x != 'lxml' or xml_stream.lxml_etree]
+
+
+def transform(custom, zip_path):
+    """Transformed output of zipped files, records created and seconds taken."""
+    output, records, seconds = io.StringIO(), 0, 0.0
+    with zipfile.ZipFile(zip_path) as in_zip, contextlib.redirect_stdout(io.StringIO()):
+        for name in in_zip.namelist():
+            _, source = transform_file.member_source(in_zip, name, custom)
+            csv_w = output if getattr(custom, 'ttx', False) else csv.writer(
+                output, delimiter='\t', lineterminator='\n')
+            start = time.perf_counter()
+            records += custom.transform_data(csv_w, source) or 0
+            seconds += time.perf_counter() - start
+    return output.getvalue(), records, seconds
+
+
+if __name__ == '__main__':
+    print(f'{"file":<28}{"records":>8}' + ''.join(f'{x + " rec/s":>14}' for x in BACKENDS))
+    for zip_path in sorted(TEST_DATA.glob('*.zip')):
+        client = zip_path.stem.split()[0]
+        if REGISTRY.input_kinds().get(client) != 'xml':
+            continue
+        custom = REGISTRY.load(client)
+        outputs, rates = set(), []
+        for backend in BACKENDS:
+            xml_stream.use_backend(backend)
+            output, records, seconds = min(
+                (transform(custom, zip_path) for _ in range(3)), key=lambda x: x[2])
+            outputs.add(output)
+            rates.append(records / seconds)
+        assert len(outputs) == 1, f'{zip_path.name} output differs between backends'
+        print(f'{zip_path.stem:<28}{records:>8,}' + ''.join(f'{x:>14,.0f}' for x in rates))